@@ -1,32 +1,30 @@
 from datetime import datetime, timedelta, timezone
-from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-import httpx
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from config import get_settings
-from database import get_db
-import models
+from database import get_db, get_async_db
+from cache import TTLCache
+from jwks import JWKSCache
+import models, schemas
 
 settings = get_settings()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 bearer_scheme = HTTPBearer()
 
+# Profile rows by user ID. Per process: after an account is deleted, other
+# workers may accept its tokens for up to user_cache_ttl seconds.
+_user_cache = TTLCache(maxsize=settings.user_cache_size, ttl=settings.user_cache_ttl)
+
 GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v3/certs"
 APPLE_CERTS_URL  = "https://appleid.apple.com/auth/keys"
+GOOGLE_ISSUERS   = ("accounts.google.com", "https://accounts.google.com")
+APPLE_ISSUER     = "https://appleid.apple.com"
 
-
-# ── Password ──────────────────────────────────────────────────────────────────
-
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
-
-
-def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+google_keys = JWKSCache(GOOGLE_CERTS_URL)
+apple_keys  = JWKSCache(APPLE_CERTS_URL)
 
 
 # ── JWT ───────────────────────────────────────────────────────────────────────
@@ -51,10 +49,64 @@ def decode_token(token: str) -> str:
 
 # ── Current user dependency ───────────────────────────────────────────────────
 
+def cache_user(user: models.User) -> dict:
+    profile = schemas.UserOut.model_validate(user).model_dump()
+    _user_cache.set(user.id, profile)
+    return profile
+
+
+def invalidate_user(user_id: str) -> None:
+    _user_cache.pop(user_id)
+
+
+def get_current_profile(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    db: Session = Depends(get_db),
+) -> dict:
+    """The caller's profile as a plain dict; served from cache when warm."""
+    user_id = decode_token(credentials.credentials)
+    profile = _user_cache.get(user_id)
+    if profile is None:
+        user = db.query(models.User).filter(models.User.id == user_id).first()
+        if not user:
+            raise HTTPException(status_code=401, detail="User not found")
+        profile = cache_user(user)
+    return profile
+
+
+def get_current_user_id(profile: dict = Depends(get_current_profile)) -> str:
+    """
+    Fast path for handlers that only need the caller's ID: no query once the
+    user is cached. (The session from get_db only checks out a connection
+    when a query actually runs.)
+    """
+    return profile["id"]
+
+
+async def get_current_profile_async(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> dict:
+    """get_current_profile for async-mode routers."""
+    user_id = decode_token(credentials.credentials)
+    profile = _user_cache.get(user_id)
+    if profile is None:
+        user = await db.get(models.User, user_id)
+        if not user:
+            raise HTTPException(status_code=401, detail="User not found")
+        profile = cache_user(user)
+    return profile
+
+
+async def get_current_user_id_async(profile: dict = Depends(get_current_profile_async)) -> str:
+    return profile["id"]
+
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
     db: Session = Depends(get_db),
 ) -> models.User:
+    """Full ORM row, for handlers that modify the user."""
     user_id = decode_token(credentials.credentials)
     user = db.query(models.User).filter(models.User.id == user_id).first()
     if not user:
@@ -64,51 +116,40 @@ def get_current_user(
 
 # ── Social token verification ─────────────────────────────────────────────────
 
+async def _verify_id_token(id_token: str, keys: JWKSCache, audience: str, issuers) -> dict:
+    """Check an RS256 ID token's signature against cached keys, then its claims."""
+    header = jwt.get_unverified_header(id_token)
+    key = await keys.get_key(header.get("kid"))
+    if key is None:
+        raise JWTError("Signing key not found")
+    payload = jwt.decode(
+        id_token,
+        key,
+        algorithms=["RS256"],
+        audience=audience,
+        options={"verify_at_hash": False},
+    )
+    if payload.get("iss") not in issuers:
+        raise JWTError("Invalid issuer")
+    return payload
+
+
 async def verify_google_token(id_token: str) -> dict:
-    """Verify a Google ID token and return the payload."""
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            "https://oauth2.googleapis.com/tokeninfo",
-            params={"id_token": id_token}
-        )
-    if resp.status_code != 200:
+    """Verify a Google ID token locally against Google's cached certs and return the payload."""
+    if not settings.google_client_id:
+        # Without an audience any Google-issued token, for any app, would pass
+        raise HTTPException(status_code=503, detail="Google sign-in is not configured")
+    try:
+        payload = await _verify_id_token(id_token, google_keys, settings.google_client_id, GOOGLE_ISSUERS)
+    except JWTError:
         raise HTTPException(status_code=401, detail="Invalid Google token")
-    data = resp.json()
-    if "error" in data:
-        raise HTTPException(status_code=401, detail=data.get("error_description", "Invalid Google token"))
-    return data   # contains: sub, email, name, picture
+    return payload   # contains: sub, email, name, picture
 
 
 async def verify_apple_token(id_token: str) -> dict:
-    """
-    Verify an Apple ID token.
-    Apple tokens are JWTs signed with Apple's public keys.
-    For a production app, fetch Apple's JWKS and verify the signature properly.
-    Here we decode without verification as a starting point —
-    replace with full JWKS verification before shipping.
-    """
+    """Verify an Apple ID token against Apple's cached JWKS and return the payload."""
     try:
-        # Decode header to get kid, then fetch Apple's public key
-        header = jwt.get_unverified_header(id_token)
-        async with httpx.AsyncClient() as client:
-            jwks_resp = await client.get(APPLE_CERTS_URL)
-        jwks = jwks_resp.json()
-
-        # Find matching key
-        key = next((k for k in jwks["keys"] if k["kid"] == header["kid"]), None)
-        if not key:
-            raise HTTPException(status_code=401, detail="Apple key not found")
-
-        from jose.backends import RSAKey
-        from jose import jwk
-        public_key = jwk.construct(key)
-
-        payload = jwt.decode(
-            id_token,
-            public_key,
-            algorithms=["RS256"],
-            audience="com.yourapp.vegfuel",   # ← replace with your Apple bundle ID
-        )
-        return payload   # contains: sub (Apple user ID), email
+        payload = await _verify_id_token(id_token, apple_keys, settings.apple_client_id, (APPLE_ISSUER,))
     except JWTError as e:
         raise HTTPException(status_code=401, detail=f"Invalid Apple token: {e}")
+    return payload   # contains: sub (Apple user ID), email
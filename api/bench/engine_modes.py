@@ -0,0 +1,139 @@
+"""
+Compare requests/sec for DB_MODE=sync and DB_MODE=async under the same load.
+
+Starts the API once per mode with uvicorn (same DATABASE_URL, one worker),
+seeds a throwaway user with a few days of logs and some mixtures, then
+drives a fixed mix of read and write endpoints from N concurrent clients
+for a fixed duration. From the api/ directory:
+
+    python -m bench.engine_modes --concurrency 64 --duration 20
+
+Async mode needs asyncpg (Postgres) or aiosqlite (SQLite) installed.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from datetime import date, timedelta
+
+import httpx
+
+MODES = ("sync", "async")
+
+
+def start_server(mode: str, port: int) -> subprocess.Popen:
+    env = {**os.environ, "DB_MODE": mode, "APP_ENV": "production"}
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+async def seed(client: httpx.AsyncClient) -> tuple[dict, list[str]]:
+    resp = await client.post("/auth/register", json={
+        "email": f"bench-{uuid.uuid4().hex[:12]}@example.com",
+        "password": "benchmark-password",
+    })
+    resp.raise_for_status()
+    headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+    days = [(date.today() - timedelta(days=i)).isoformat() for i in range(7)]
+    for day in days:
+        entries = [
+            {"ingredient_name": name, "amount": 100 + i, "display_amount": 100 + i, "unit": "g", "position": i}
+            for i, name in enumerate(["tofu", "lentils", "oats", "banana", "spinach", "almonds"])
+        ]
+        (await client.post("/logs/sync", headers=headers, json={"log_date": day, "entries": entries})).raise_for_status()
+    for i in range(20):
+        (await client.post("/mixtures/", headers=headers, json={
+            "name": f"bench mix {i}",
+            "yield_g": 500,
+            "per100g": {"cal": 150, "protein": 8, "carbs": 20, "fat": 4},
+            "ingredients": [{"name": "oats", "amount": 250}, {"name": "tofu", "amount": 250}],
+        })).raise_for_status()
+    return headers, days
+
+
+async def worker(client, headers, days, deadline, latencies, errors):
+    i = 0
+    while time.monotonic() < deadline:
+        day = days[i % len(days)]
+        kind = i % 4
+        start = time.perf_counter()
+        try:
+            if kind == 0:
+                resp = await client.get(f"/logs/{day}", headers=headers)
+            elif kind == 1:
+                resp = await client.get("/mixtures/", headers=headers)
+            elif kind == 2:
+                resp = await client.get("/logs", headers=headers, params={"from": days[-1], "to": days[0]})
+            else:
+                resp = await client.post("/logs/sync", headers=headers, json={"log_date": day, "entries": [
+                    {"ingredient_name": "tofu", "amount": 150, "display_amount": 150, "unit": "g", "position": 0},
+                ]})
+            if resp.status_code >= 400:
+                errors.append(resp.status_code)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+        latencies.append(time.perf_counter() - start)
+        i += 1
+
+
+async def run_mode(mode: str, port: int, concurrency: int, duration: float) -> dict:
+    server = start_server(mode, port)
+    try:
+        limits = httpx.Limits(max_connections=concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=30) as client:
+            await wait_ready(client)
+            headers, days = await seed(client)
+            latencies, errors = [], []
+            deadline = time.monotonic() + duration
+            await asyncio.gather(*(
+                worker(client, headers, days, deadline, latencies, errors) for _ in range(concurrency)
+            ))
+    finally:
+        server.terminate()
+        server.wait()
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "mode": mode,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": len(latencies) / duration,
+        "p50_ms": quantiles[49] * 1000,
+        "p95_ms": quantiles[94] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"{'mode':<6} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for mode in MODES:
+        r = asyncio.run(run_mode(mode, args.port, args.concurrency, args.duration))
+        print(f"{r['mode']:<6} {r['requests']:>9} {r['errors']:>7} {r['rps']:>9.1f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Synthetic accounts for benchmarks: years of food logs, hundreds of
+mixtures and custom ingredients per user, with daily rollups filled in.
+
+Rows are bulk-inserted straight into the tables (not through the API), and
+generated from a fixed random seed, so every run measures the same data.
+"""
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from sqlalchemy import insert
+
+from auth import create_access_token
+from database import SessionLocal
+from food_table import FOODS, MACRO_KEYS, MICRO_KEYS, NUTRIENT_KEYS
+from hashing import hash_password
+from nutrition import grouped_totals
+import models
+
+PASSWORD = "benchmark-password"
+BATCH    = 5000
+
+
+@dataclass
+class Account:
+    user_id: str
+    email: str
+    token: str
+    days: list[date]                  # logged days, newest first
+    mixture_ids: list[str] = field(default_factory=list)
+
+    @property
+    def headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+def _nutrition(rng: random.Random) -> dict:
+    return {key: round(rng.uniform(0, 400 if key == "cal" else 30), 1) for key in NUTRIENT_KEYS}
+
+
+def _insert(db, model, rows: list[dict]) -> None:
+    for i in range(0, len(rows), BATCH):
+        db.execute(insert(model), rows[i:i + BATCH])
+
+
+def seed_account(
+    db,
+    rng: random.Random,
+    password_hash: str,
+    years: float,
+    entries_per_day: int,
+    mixtures: int,
+    ingredients: int,
+) -> Account:
+    user_id = str(uuid.uuid4())
+    email = f"bench-{user_id[:12]}@example.com"
+    db.add(models.User(
+        id=user_id, email=email, display_name="bench", password_hash=password_hash, provider="email",
+        body_weight=70, goal_cal=2600, goal_protein=140, goal_carbs=320, goal_fat=80,
+    ))
+    db.flush()
+
+    ingredient_rows = [
+        {"id": str(uuid.uuid4()), "user_id": user_id, "name": f"custom food {i}", "nutrition": _nutrition(rng)}
+        for i in range(ingredients)
+    ]
+    builtins = list(FOODS)
+    mixture_rows = [
+        {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "name": f"mix {i}",
+            "yield_g": 600,
+            "yield_unit": "g",
+            "per100g": _nutrition(rng),
+            "ingredients": [
+                {"name": name, "amount": 150, "displayAmount": 150, "unit": "g"}
+                for name in rng.sample(builtins, 4)
+            ],
+        }
+        for i in range(mixtures)
+    ]
+    _insert(db, models.CustomIngredient, ingredient_rows)
+    _insert(db, models.Mixture, mixture_rows)
+
+    # Mostly built-in foods, some of the user's own, like a real log
+    names = builtins + [r["name"] for r in ingredient_rows] + [r["name"] for r in mixture_rows]
+    weights = [8] * len(builtins) + [1] * (len(names) - len(builtins))
+    today = date.today()
+    days = [today - timedelta(days=i) for i in range(int(years * 365))]
+    log_rows = []
+    for day in days:
+        for position, name in enumerate(rng.choices(names, weights, k=rng.randint(1, entries_per_day * 2 - 1))):
+            amount = float(rng.randint(20, 400))
+            log_rows.append({
+                "id": str(uuid.uuid4()), "user_id": user_id, "log_date": day, "ingredient_name": name,
+                "amount": amount, "display_amount": amount, "unit": "g", "position": position,
+            })
+    _insert(db, models.FoodLog, log_rows)
+
+    user_foods = {r["name"]: r["nutrition"] for r in ingredient_rows}
+    user_foods.update({r["name"]: r["per100g"] for r in mixture_rows})
+    totals = grouped_totals([(r["log_date"], r["ingredient_name"], r["amount"]) for r in log_rows], user_foods)
+    counts: dict[date, int] = {}
+    for r in log_rows:
+        counts[r["log_date"]] = counts.get(r["log_date"], 0) + 1
+    _insert(db, models.DailySummary, [
+        {
+            "user_id": user_id, "log_date": day, "entry_count": counts[day], "version": 1,
+            **{key: sums[key] for key in MACRO_KEYS},
+            "micros": {key: sums[key] for key in MICRO_KEYS},
+        }
+        for day, sums in totals.items()
+    ])
+
+    return Account(
+        user_id=user_id,
+        email=email,
+        token=create_access_token(user_id),
+        days=days,
+        mixture_ids=[r["id"] for r in mixture_rows],
+    )
+
+
+def seed(
+    users: int = 3,
+    years: float = 2,
+    entries_per_day: int = 6,
+    mixtures: int = 200,
+    ingredients: int = 100,
+    random_seed: int = 1,
+) -> list[Account]:
+    """Create `users` synthetic accounts in one transaction and return them."""
+    rng = random.Random(random_seed)
+    password_hash = hash_password(PASSWORD)     # bcrypt once, shared by every account
+    db = SessionLocal()
+    try:
+        accounts = [
+            seed_account(db, rng, password_hash, years, entries_per_day, mixtures, ingredients)
+            for _ in range(users)
+        ]
+        db.commit()
+        return accounts
+    finally:
+        db.close()
@@ -0,0 +1,109 @@
+"""
+Serialization cost per 1,000 mixtures: response-model path vs FAST_JSON.
+
+Builds 1,000 realistic mixture rows in memory (no database) and times the
+work each path does between the driver handing rows over and the response
+body being ready. Both paths start from the JSON column text as it arrives
+from the database.
+
+- model: the driver decodes each JSON column, FastAPI validates every row
+  through schemas.MixtureOut (from_attributes) and dumps it to JSON-able
+  python, then the stdlib encodes the body (what JSONResponse does).
+- fast: plain row dicts with the JSON columns spliced in as orjson.Fragment,
+  encoded once by orjson (what fastjson.ORJSONResponse does).
+
+From the api/ directory:
+
+    python -m bench.serialization --repeat 20
+"""
+import argparse
+import json
+import statistics
+import time
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import orjson
+from pydantic import TypeAdapter
+
+from food_table import FOODS, NUTRIENT_KEYS
+import schemas
+
+N = 1000
+
+
+def make_rows(n: int) -> list[dict]:
+    """Mixture rows with the JSON columns as stored text."""
+    names = list(FOODS)
+    now = datetime.now(timezone.utc)
+    rows = []
+    for i in range(n):
+        parts = [names[(i + k) % len(names)] for k in range(8)]
+        rows.append({
+            "id": str(uuid.uuid4()),
+            "name": f"mixture {i}",
+            "yield_g": 800.0,
+            "yield_unit": "g",
+            "per100g": json.dumps({key: round(10 + i % 7 + j * 0.37, 2) for j, key in enumerate(NUTRIENT_KEYS)}),
+            "ingredients": json.dumps([
+                {"name": name, "amount": 100.0, "displayAmount": 100, "unit": "g"} for name in parts
+            ]),
+            "created_at": now,
+        })
+    return rows
+
+
+def model_path(rows: list[dict], adapter: TypeAdapter) -> bytes:
+    objects = [
+        SimpleNamespace(**{**row, "per100g": json.loads(row["per100g"]), "ingredients": json.loads(row["ingredients"])})
+        for row in rows
+    ]
+    validated = adapter.validate_python(objects, from_attributes=True)
+    content = adapter.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def fast_path(rows: list[dict]) -> bytes:
+    content = [
+        {**row, "per100g": orjson.Fragment(row["per100g"]), "ingredients": orjson.Fragment(row["ingredients"])}
+        for row in rows
+    ]
+    return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+
+
+def timed(fn, repeat: int) -> list[float]:
+    fn()    # warm up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = make_rows(N)
+    adapter = TypeAdapter(list[schemas.MixtureOut])
+    # Same document either way, so the timings compare like with like
+    assert json.loads(model_path(rows, adapter)) == json.loads(fast_path(rows))
+
+    results = {
+        "model": timed(lambda: model_path(rows, adapter), args.repeat),
+        "fast": timed(lambda: fast_path(rows), args.repeat),
+    }
+    size = len(fast_path(rows))
+    print(f"{N} mixtures, {size / 1024:.0f} KiB body, {args.repeat} runs")
+    print(f"{'path':<6} {'median ms':>10} {'min ms':>8}")
+    for name, samples in results.items():
+        print(f"{name:<6} {statistics.median(samples) * 1000:>10.2f} {min(samples) * 1000:>8.2f}")
+    speedup = statistics.median(results["model"]) / statistics.median(results["fast"])
+    print(f"fast path is {speedup:.1f}x faster per {N} mixtures")
+
+
+if __name__ == "__main__":
+    main()
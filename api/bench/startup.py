@@ -0,0 +1,87 @@
+"""
+Measure cold-start time, to catch startup regressions.
+
+For each run this starts the API with uvicorn and records:
+
+- import: seconds to `import main` in a fresh interpreter
+- live:   seconds from spawn until GET /health answers 200
+- ready:  seconds from spawn until GET /ready answers 200 (database reachable)
+
+From the api/ directory:
+
+    python -m bench.startup --runs 5
+    python -m bench.startup --runs 5 --max-live 1.5     # exit 1 if slower
+
+Runs with APP_ENV=production by default, i.e. without create_all, as deployed.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+
+def import_time(env: dict) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import main"], env=env, check=True)
+    return time.perf_counter() - start
+
+
+def wait_for(client: httpx.Client, path: str, start: float, timeout: float) -> float:
+    while time.perf_counter() - start < timeout:
+        try:
+            if client.get(path).status_code == 200:
+                return time.perf_counter() - start
+        except httpx.TransportError:
+            pass
+        time.sleep(0.01)
+    raise RuntimeError(f"{path} not ready after {timeout}s")
+
+
+def server_times(env: dict, port: int, timeout: float) -> tuple[float, float]:
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1) as client:
+            live = wait_for(client, "/health", start, timeout)
+            ready = wait_for(client, "/ready", start, timeout)
+    finally:
+        server.terminate()
+        server.wait()
+    return live, ready
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--app-env", default="production")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--max-live", type=float, help="fail if median time to /health exceeds this")
+    args = parser.parse_args()
+
+    env = {**os.environ, "APP_ENV": args.app_env}
+    results = {"import": [], "live": [], "ready": []}
+    for _ in range(args.runs):
+        results["import"].append(import_time(env))
+        live, ready = server_times(env, args.port, args.timeout)
+        results["live"].append(live)
+        results["ready"].append(ready)
+
+    print(f"{'phase':<7} {'median s':>9} {'min s':>7} {'max s':>7}")
+    for phase, samples in results.items():
+        print(f"{phase:<7} {statistics.median(samples):>9.3f} {min(samples):>7.3f} {max(samples):>7.3f}")
+
+    if args.max_live is not None and statistics.median(results["live"]) > args.max_live:
+        print(f"median time to /health is over {args.max_live}s", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
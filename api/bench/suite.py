@@ -0,0 +1,437 @@
+"""
+Benchmark every router in-process and compare against a saved baseline.
+
+Seeds a throwaway database with synthetic accounts (see bench/seed.py),
+runs the app's lifespan and drives it through httpx's ASGI transport, so
+numbers reflect the handlers, database and serialization rather than a
+network stack. Two phases:
+
+- endpoints: each scenario alone, sequentially, for --iterations requests
+- load: a read-heavy mix of all scenarios from --concurrency clients for
+  --duration seconds
+
+Both report p50/p95/p99 latency and throughput. From the api/ directory:
+
+    python -m bench.suite --output bench-results.json
+    python -m bench.suite --database-url postgresql://localhost/vegfuel_bench \\
+        --baseline bench-baseline.json --tolerance 0.25
+
+With --baseline, the run exits 1 if any scenario's p95 is more than
+--tolerance (and --min-delta-ms) slower than in the baseline file.
+
+The database at --database-url gets tables created and accounts added to
+it; point it at a scratch database, never a real one. /foods/usda is left
+out because it calls USDA.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timezone
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+Scenario = Callable[[httpx.AsyncClient, "Context"], Awaitable[httpx.Response]]
+
+# Relative weight of each scenario in the load phase; reads dominate, as in the app
+LOAD_MIX = {
+    "bootstrap": 10, "logs.day": 20, "logs.range": 5, "logs.summary": 5, "mixtures.list": 10,
+    "ingredients.list": 5, "users.me": 10, "foods.search": 10, "logs.sync": 10, "logs.delta": 5,
+    "mixtures.create": 3, "sync.batch": 2,
+}
+
+# Statuses a scenario returns by design, counted as conflicts rather than errors:
+# concurrent deltas to the same day make all but one of them stale
+EXPECTED_STATUSES = {"logs.delta": {409}}
+
+
+class Context:
+    """Seeded accounts plus per-scenario state, rotated so requests spread over users."""
+
+    def __init__(self, accounts):
+        self.accounts = accounts
+        self.i = 0
+        self.versions: dict[str, int] = {}
+
+    def next(self):
+        self.i += 1
+        return self.accounts[self.i % len(self.accounts)]
+
+
+def _day(account, i: int) -> date:
+    """The i-th most recent seeded day, or the oldest one when fewer were seeded (small --years)."""
+    return account.days[min(i, len(account.days) - 1)]
+
+
+def _entries(n: int) -> list[dict]:
+    return [
+        {"ingredient_name": name, "amount": 100 + i, "display_amount": 100 + i, "unit": "g", "position": i}
+        for i, name in enumerate(["tofu", "lentils", "oats", "banana", "spinach", "almonds", "tempeh", "rice"][:n])
+    ]
+
+
+def _mixture(name: str) -> dict:
+    return {
+        "name": name,
+        "yield_g": 500,
+        "per100g": {"cal": 150, "protein": 8, "carbs": 20, "fat": 4},
+        "ingredients": [{"name": "oats", "amount": 250}, {"name": "tofu", "amount": 250}],
+    }
+
+
+# ── Scenarios ─────────────────────────────────────────────────────────────────
+
+async def auth_login(client, ctx):
+    from bench.seed import PASSWORD
+    return await client.post("/auth/login", json={"email": ctx.next().email, "password": PASSWORD})
+
+
+async def users_me(client, ctx):
+    return await client.get("/users/me", headers=ctx.next().headers)
+
+
+async def users_update(client, ctx):
+    return await client.patch("/users/me", headers=ctx.next().headers, json={"body_weight": 70 + ctx.i % 5})
+
+
+async def logs_day(client, ctx):
+    account = ctx.next()
+    return await client.get(f"/logs/{_day(account, ctx.i % 30)}", headers=account.headers)
+
+
+async def logs_day_totals(client, ctx):
+    account = ctx.next()
+    return await client.get(f"/logs/{_day(account, ctx.i % 30)}", headers=account.headers, params={"totals": "true"})
+
+
+async def logs_range(client, ctx):
+    account = ctx.next()
+    return await client.get("/logs", headers=account.headers,
+                            params={"from": _day(account, 30), "to": account.days[0]})
+
+
+async def logs_summary(client, ctx):
+    account = ctx.next()
+    return await client.get("/logs/summary", headers=account.headers,
+                            params={"from": _day(account, 364), "to": account.days[0]})
+
+
+async def logs_sync(client, ctx):
+    account = ctx.next()
+    return await client.post("/logs/sync", headers=account.headers,
+                             json={"log_date": _day(account, ctx.i % 7).isoformat(), "entries": _entries(6)})
+
+
+async def logs_delta(client, ctx):
+    account = ctx.next()
+    day = account.days[0].isoformat()
+    key = f"{account.user_id}/{day}"
+    if key not in ctx.versions:
+        ctx.versions[key] = (await client.get(f"/logs/{day}", headers=account.headers)).json()["version"] or 0
+    resp = await client.post("/logs/sync/delta", headers=account.headers, json={
+        "log_date": day,
+        "base_version": ctx.versions[key],
+        "upserts": [{**_entries(1)[0], "id": f"bench-{account.user_id}", "amount": 100 + ctx.i % 50}],
+    })
+    if resp.status_code == 200:
+        ctx.versions[key] = resp.json()["version"]
+    else:
+        ctx.versions.pop(key, None)     # another worker moved the day on; re-read next time
+    return resp
+
+
+async def logs_clear(client, ctx):
+    account = ctx.next()
+    return await client.delete(f"/logs/{account.days[-1]}", headers=account.headers)
+
+
+async def mixtures_list(client, ctx):
+    return await client.get("/mixtures/", headers=ctx.next().headers)
+
+
+async def mixtures_create(client, ctx):
+    return await client.post("/mixtures/", headers=ctx.next().headers, json=_mixture(f"bench mix {ctx.i % 10}"))
+
+
+async def mixtures_bulk(client, ctx):
+    return await client.post("/mixtures/bulk", headers=ctx.next().headers,
+                             json=[_mixture(f"bench mix {i}") for i in range(50)])
+
+
+async def mixtures_update(client, ctx):
+    account = ctx.next()
+    return await client.put(f"/mixtures/{account.mixture_ids[0]}", headers=account.headers,
+                            json=_mixture("mix 0"))
+
+
+async def ingredients_list(client, ctx):
+    return await client.get("/ingredients/", headers=ctx.next().headers)
+
+
+async def ingredients_create(client, ctx):
+    return await client.post("/ingredients/", headers=ctx.next().headers, json={
+        "name": f"bench food {ctx.i % 10}", "nutrition": {"cal": 120, "protein": 10},
+    })
+
+
+async def sync_batch(client, ctx):
+    account = ctx.next()
+    return await client.post("/sync/batch", headers=account.headers, json={
+        "logs": [{"log_date": day.isoformat(), "entries": _entries(4)} for day in account.days[7:14]],
+        "mixtures": [_mixture(f"bench mix {ctx.i % 10}")],
+    })
+
+
+async def bootstrap(client, ctx):
+    account = ctx.next()
+    return await client.get("/bootstrap", headers=account.headers,
+                            params={"date": account.days[0], "summary_days": 7})
+
+
+async def transfer_export(client, ctx):
+    return await client.get("/export", headers=ctx.next().headers)
+
+
+async def transfer_import(client, ctx):
+    account = ctx.next()
+    day = _day(account, len(account.days) - 2).isoformat()
+    body = "\n".join(json.dumps({"type": "log", "log_date": day, **entry}) for entry in _entries(8))
+    return await client.post("/import", headers=account.headers, content=body)
+
+
+async def foods_search(client, ctx):
+    return await client.get("/foods/search", headers=ctx.next().headers,
+                            params={"q": ("tof", "lentl", "mix 1", "oat", "custom")[ctx.i % 5]})
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "auth.login": auth_login,
+    "users.me": users_me,
+    "users.update": users_update,
+    "logs.day": logs_day,
+    "logs.day_totals": logs_day_totals,
+    "logs.range": logs_range,
+    "logs.summary": logs_summary,
+    "logs.sync": logs_sync,
+    "logs.delta": logs_delta,
+    "logs.clear": logs_clear,
+    "mixtures.list": mixtures_list,
+    "mixtures.create": mixtures_create,
+    "mixtures.bulk": mixtures_bulk,
+    "mixtures.update": mixtures_update,
+    "ingredients.list": ingredients_list,
+    "ingredients.create": ingredients_create,
+    "sync.batch": sync_batch,
+    "bootstrap": bootstrap,
+    "transfer.export": transfer_export,
+    "transfer.import": transfer_import,
+    "foods.search": foods_search,
+}
+
+
+# ── Measurement ───────────────────────────────────────────────────────────────
+
+def summarize(latencies: list[float], errors: int, conflicts: int, seconds: float) -> dict:
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "conflicts": conflicts,
+        "rps": round(len(latencies) / seconds, 1),
+        "p50_ms": round(quantiles[49] * 1000, 2),
+        "p95_ms": round(quantiles[94] * 1000, 2),
+        "p99_ms": round(quantiles[98] * 1000, 2),
+    }
+
+
+async def timed(scenario: Scenario, client, ctx) -> tuple[float, Optional[int]]:
+    """Seconds taken and the response status; None when the request failed outright."""
+    start = time.perf_counter()
+    try:
+        status = (await scenario(client, ctx)).status_code
+    except httpx.HTTPError:
+        status = None
+    return time.perf_counter() - start, status
+
+
+class Tally:
+    """Latencies plus errors and expected conflicts, for one scenario or the whole load."""
+
+    def __init__(self):
+        self.latencies: list[float] = []
+        self.errors = 0
+        self.conflicts = 0
+
+    def add(self, name: str, seconds: float, status: Optional[int]) -> None:
+        self.latencies.append(seconds)
+        if status in EXPECTED_STATUSES.get(name, ()):
+            self.conflicts += 1
+        elif status is None or status >= 400:
+            self.errors += 1
+
+    def summary(self, seconds: float) -> dict:
+        return summarize(self.latencies, self.errors, self.conflicts, seconds)
+
+
+async def run_endpoints(client, ctx, names: list[str], iterations: int, warmup: int) -> dict:
+    results = {}
+    for name in names:
+        scenario = SCENARIOS[name]
+        for _ in range(warmup):
+            await scenario(client, ctx)
+        tally = Tally()
+        start = time.perf_counter()
+        for _ in range(iterations):
+            tally.add(name, *await timed(scenario, client, ctx))
+        results[name] = tally.summary(time.perf_counter() - start)
+        print(f"  {name:<20} p50 {results[name]['p50_ms']:>8.2f} ms   p95 {results[name]['p95_ms']:>8.2f} ms",
+              file=sys.stderr)
+    return results
+
+
+async def run_load(client, ctx, concurrency: int, duration: float, seed: int) -> dict:
+    names = list(LOAD_MIX)
+    weights = list(LOAD_MIX.values())
+    tally = Tally()
+
+    async def worker(rng: random.Random, deadline: float):
+        while time.monotonic() < deadline:
+            name = rng.choices(names, weights)[0]
+            tally.add(name, *await timed(SCENARIOS[name], client, ctx))
+
+    deadline = time.monotonic() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(random.Random(seed + i), deadline) for i in range(concurrency)))
+    return tally.summary(time.perf_counter() - start)
+
+
+async def run(args) -> dict:
+    # Imported here: the app reads its settings at import, after main() sets them
+    import database
+    import main
+    from bench.seed import seed
+
+    database.Base.metadata.create_all(bind=database.get_engine())
+    started = time.perf_counter()
+    accounts = seed(args.users, args.years, args.entries_per_day, args.mixtures, args.ingredients, args.seed)
+    print(f"seeded {len(accounts)} accounts in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    ctx = Context(accounts)
+    names = args.only or list(SCENARIOS)
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", limits=limits, timeout=60) as client:
+            endpoints = await run_endpoints(client, ctx, names, args.iterations, args.warmup)
+            load = await run_load(client, ctx, args.concurrency, args.duration, args.seed) if args.duration else None
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "dialect": database.get_engine().dialect.name,
+            "db_mode": os.environ["DB_MODE"],
+            "users": args.users,
+            "years": args.years,
+            "mixtures": args.mixtures,
+            "iterations": args.iterations,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+        },
+        "endpoints": endpoints,
+        "load": load,
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+# ── Baseline comparison ───────────────────────────────────────────────────────
+
+def compare(results: dict, baseline: dict, tolerance: float, min_delta_ms: float) -> list[str]:
+    """Print p95 against the baseline; return the scenarios that regressed."""
+    rows = list(results["endpoints"].items())
+    if results.get("load") and baseline.get("load"):
+        rows.append(("(load)", results["load"]))
+    regressions = []
+    print(f"\n{'scenario':<20} {'base p95':>9} {'p95':>9} {'change':>8}")
+    for name, current in rows:
+        before = baseline["load"] if name == "(load)" else baseline["endpoints"].get(name)
+        if before is None:
+            print(f"{name:<20} {'-':>9} {current['p95_ms']:>9.2f} {'new':>8}")
+            continue
+        old, new = before["p95_ms"], current["p95_ms"]
+        change = (new - old) / old if old else 0.0
+        flag = ""
+        if change > tolerance and new - old > min_delta_ms:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<20} {old:>9.2f} {new:>9.2f} {change:>+8.0%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///./bench.db")
+    parser.add_argument("--db-mode", choices=("sync", "async"), default="sync")
+    parser.add_argument("--users", type=int, default=3)
+    parser.add_argument("--years", type=float, default=2)
+    parser.add_argument("--entries-per-day", type=int, default=6)
+    parser.add_argument("--mixtures", type=int, default=200)
+    parser.add_argument("--ingredients", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=32, help="clients in the load phase")
+    parser.add_argument("--duration", type=float, default=15, help="seconds of load; 0 skips the phase")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--only", nargs="+", choices=SCENARIOS, help="run just these scenarios")
+    parser.add_argument("--output", help="write results JSON here (e.g. to save a new baseline)")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 slowdown, as a fraction")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="ignore p95 changes smaller than this")
+    args = parser.parse_args()
+    if int(args.years * 365) < 1:
+        parser.error("--years must cover at least one day")
+
+    # Settings are read on first import of the app, so configure it first
+    os.environ.update({"DATABASE_URL": args.database_url, "DB_MODE": args.db_mode, "APP_ENV": "production"})
+    for key in ("SUPABASE_URL", "SUPABASE_ANON_KEY", "SUPABASE_SERVICE_ROLE_KEY", "JWT_SECRET"):
+        os.environ.setdefault(key, "bench")
+
+    results = asyncio.run(run(args))
+    if results["load"]:
+        load = results["load"]
+        print(f"load: {load['requests']} requests, {load['errors']} errors, "
+              f"{load['conflicts']} expected conflicts, {load['rps']} req/s, "
+              f"p50 {load['p50_ms']} ms, p95 {load['p95_ms']} ms, p99 {load['p99_ms']} ms", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+        if regressions:
+            print(f"\np95 regressed for: {', '.join(regressions)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
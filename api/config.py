@@ -7,11 +7,37 @@ class Settings(BaseSettings):
     supabase_anon_key: str
     supabase_service_role_key: str
     database_url: str
+    db_mode: str = "sync"              # sync (psycopg2, threadpool) | async (asyncpg, event loop)
+    fast_json: bool = False            # list endpoints skip response-model validation, see fastjson.py
+    stream_threshold: int = 1000       # list endpoints stream collections larger than this
+    compress_min_bytes: int = 1024     # smaller response bodies are sent uncompressed
     jwt_secret: str
     jwt_algorithm: str = "HS256"
     jwt_expire_minutes: int = 10080
+    user_cache_ttl: int = 60           # seconds a verified user row is trusted without a query
+    user_cache_size: int = 10000
+    password_hash_workers: int = 2     # bcrypt worker processes = max concurrent hashes
+    password_hash_max_waiting: int = 64  # beyond this, sign-ins get 503 instead of queueing
     app_env: str = "development"
+    google_client_id: str = ""         # ID token audience; Google sign-in is refused when empty
+    google_client_secret: str = ""
+    apple_client_id: str = "com.yourapp.vegfuel"   # your Apple Services ID / bundle ID
     allowed_origins: str = "http://localhost:3000"
+    resend_api_key: str = ""
+    email_backend: str = "resend"      # resend | console (logs instead of sending)
+    metrics_enabled: bool = True       # Prometheus middleware and GET /metrics
+    metrics_token: str = ""            # when set, /metrics requires "Authorization: Bearer <token>"
+    slow_query_ms: int = 500           # statements this slow are logged with route and user hash; 0 disables
+    admin_token: str = ""              # unlocks X-Profile and /debug/profiles outside development
+    profile_sample_rate: float = 0.0   # fraction of requests profiled at random, e.g. 0.001
+    profile_dir: str = "profiles"      # where folded-stack profiles are written
+    idempotency_ttl: int = 24 * 3600   # seconds a write's response is replayed for its Idempotency-Key
+    job_workers: int = 1               # background job worker tasks per process
+    job_poll_seconds: float = 5.0
+    usda_api_key: str = "DEMO_KEY"
+    usda_api_url: str = "https://api.nal.usda.gov/fdc/v1/foods/search"   # point at a stub for local testing
+    usda_cache_ttl: int = 7 * 24 * 3600   # seconds a cached USDA search is served without going upstream
+    usda_memory_size: int = 2000       # searches kept in the in-process tier
 
     @property
     def origins_list(self) -> list[str]:
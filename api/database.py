@@ -1,26 +1,223 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+import asyncio
+from contextlib import AsyncExitStack
+from typing import AsyncIterator, Awaitable, Callable, Iterator, Sequence, TypeVar
+from sqlalchemy import Engine, Row, Select, create_engine, event, text
+from sqlalchemy.orm import sessionmaker, DeclarativeBase, Session
+from starlette.concurrency import iterate_in_threadpool
 from config import get_settings
 
 settings = get_settings()
+T = TypeVar("T")
 
-engine = create_engine(
-    settings.database_url,
-    pool_pre_ping=True,        # reconnect on stale connections
-    pool_size=10,
-    max_overflow=20,
-)
+# Engines are built on first use rather than at import, so the app can start
+# answering /health before anything touches the database. Async mode
+# (DB_MODE=async) likewise never needs asyncpg installed in sync deployments.
+# A process uses one engine, the one its DB_MODE names: everything outside
+# the data routers' own sessions (auth, background jobs, idempotency keys,
+# caches, streamed bodies) goes through the helpers at the bottom of this
+# module, so async mode never opens a second, sync pool.
+_engine = None
+_session_factory = sessionmaker(autocommit=False, autoflush=False)
+_async_engine = None
+_AsyncSessionLocal = None
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Called with each (sync) Engine as it is created, e.g. to attach event listeners
+engine_hooks: list[Callable[[Engine], None]] = []
+
+
+def _sqlite_foreign_keys(engine: Engine) -> None:
+    """SQLite ignores foreign keys, ON DELETE CASCADE included, unless each connection enables them."""
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def enable(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+engine_hooks.append(_sqlite_foreign_keys)
+
+
+def _pool_sizing(url: str) -> dict:
+    """Pool size limits, for server databases only; SQLite's pools don't take them."""
+    if url.startswith("sqlite"):
+        return {}
+    return {"pool_size": 10, "max_overflow": 20}
+
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        _engine = create_engine(
+            settings.database_url,
+            pool_pre_ping=True,        # reconnect on stale connections
+            **_pool_sizing(settings.database_url),
+        )
+        _session_factory.configure(bind=_engine)
+        for hook in engine_hooks:
+            hook(_engine)
+    return _engine
+
+
+def SessionLocal() -> Session:
+    """A new session on the (lazily created) sync engine."""
+    get_engine()
+    return _session_factory()
 
 
 class Base(DeclarativeBase):
     pass
 
 
+def dialect_insert(db):
+    """INSERT construct for the session's dialect, so callers can use ON CONFLICT."""
+    if db.get_bind().dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+# ── Async engine ──────────────────────────────────────────────────────────────
+
+def async_database_url(url: str) -> str:
+    """Swap the sync driver for its async counterpart (asyncpg / aiosqlite)."""
+    scheme, rest = url.split("://", 1)
+    base = scheme.split("+", 1)[0]
+    if base in ("postgres", "postgresql"):
+        return f"postgresql+asyncpg://{rest}"
+    if base == "sqlite":
+        return f"sqlite+aiosqlite://{rest}"
+    return url
+
+
+def get_async_engine():
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+        url = async_database_url(settings.database_url)
+        _async_engine = create_async_engine(url, pool_pre_ping=True, **_pool_sizing(url))
+        # Handlers return ORM rows after commit; keep them loaded so response
+        # serialization never triggers lazy IO outside the greenlet
+        _AsyncSessionLocal = async_sessionmaker(
+            _async_engine, autoflush=False, expire_on_commit=False,
+        )
+        for hook in engine_hooks:
+            hook(_async_engine.sync_engine)
+    return _async_engine
+
+
+async def get_async_db():
+    get_async_engine()
+    async with _AsyncSessionLocal() as db:
+        yield db
+
+
+# ── Either mode ───────────────────────────────────────────────────────────────
+
+async def run_in_session(fn: Callable[..., T], *args) -> T:
+    """
+    fn(session, *args) on a session of its own, off the event loop: in a
+    worker thread on the sync engine, or through AsyncSession.run_sync on the
+    async engine. fn commits its own work.
+    """
+    if settings.db_mode == "async":
+        get_async_engine()
+        async with _AsyncSessionLocal() as db:
+            return await db.run_sync(fn, *args)
+
+    def call() -> T:
+        db = SessionLocal()
+        try:
+            return fn(db, *args)
+        finally:
+            db.close()
+    return await asyncio.to_thread(call)
+
+
+async def get_db_call() -> AsyncIterator[Callable[..., Awaitable]]:
+    """
+    Dependency for async handlers: `call(fn, *args)` runs fn(session, *args)
+    on the request's one session, off the event loop, in either mode.
+    """
+    if settings.db_mode == "async":
+        get_async_engine()
+        async with _AsyncSessionLocal() as db:
+            yield lambda fn, *args: db.run_sync(fn, *args)
+        return
+    db = SessionLocal()
+    try:
+        yield lambda fn, *args: asyncio.to_thread(fn, db, *args)
+    finally:
+        await asyncio.to_thread(db.close)
+
+
+def _sync_partitions(stmt: Select, size: int) -> Iterator[Sequence[Row]]:
+    db = SessionLocal()
+    try:
+        yield from db.execute(stmt.execution_options(yield_per=size)).partitions()
+    finally:
+        db.close()
+
+
+async def _async_partitions(stmt: Select, size: int) -> AsyncIterator[Sequence[Row]]:
+    get_async_engine()
+    async with _AsyncSessionLocal() as db:
+        result = await db.stream(stmt.execution_options(yield_per=size))
+        async for rows in result.partitions():
+            yield rows
+
+
+def stream_partitions(stmt: Select, size: int) -> AsyncIterator[Sequence[Row]]:
+    """
+    `stmt`'s rows in batches of `size` from a server-side cursor, on a
+    session of its own (for response bodies that outlive the request's).
+    """
+    if settings.db_mode == "async":
+        return _async_partitions(stmt, size)
+    return iterate_in_threadpool(_sync_partitions(stmt, size))
+
+
+async def create_all() -> None:
+    """Create any missing tables (development only; elsewhere Alembic owns the schema)."""
+    if settings.db_mode == "async":
+        async with get_async_engine().begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    else:
+        await asyncio.to_thread(Base.metadata.create_all, bind=get_engine())
+
+
+async def ping() -> None:
+    """Round-trip to the database; raises if it can't be reached."""
+    await run_in_session(lambda db: db.execute(text("SELECT 1")))
+
+
+async def warm_pool(connections: int) -> None:
+    """Open `connections` pooled connections up front so early requests don't pay for them."""
+    if settings.db_mode == "async":
+        engine = get_async_engine()
+        async with AsyncExitStack() as opened:
+            for _ in range(connections):
+                await opened.enter_async_context(engine.connect())
+        return
+
+    def warm() -> None:
+        engine = get_engine()
+        opened = []
+        try:
+            for _ in range(connections):
+                opened.append(engine.connect())
+        finally:
+            for conn in opened:
+                conn.close()
+    await asyncio.to_thread(warm)
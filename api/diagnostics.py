@@ -0,0 +1,262 @@
+"""
+Production diagnostics: a slow-query log and an opt-in sampling profiler.
+
+Slow queries: any statement taking SLOW_QUERY_MS or longer is logged to
+`vegfuel.slow_sql` with its SQL, the shape of its parameters (types and
+sizes, never values), the route template and a short hash of the caller's
+user ID.
+
+Profiler: while a profiled request runs, a background thread samples every
+thread's stack each PROFILE_INTERVAL and counts them as folded stacks
+(`outer;inner;leaf count`), the input format of flamegraph.pl, inferno and
+speedscope. A request is profiled when
+- it sends `X-Profile: 1` and `X-Admin-Token: <ADMIN_TOKEN>` (the token is
+  not needed with APP_ENV=development), or
+- it is picked at random at PROFILE_SAMPLE_RATE.
+
+One request is profiled at a time; others run unprofiled meanwhile. The
+sampler sees the whole process, so under concurrency a profile also holds
+whatever ran alongside the request. Profiles are written to PROFILE_DIR and
+named in the response's `X-Profile-Id` header; fetch them with
+GET /debug/profiles/{id}.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+
+from jose import jwt
+from sqlalchemy import Engine, event
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config import get_settings
+from metrics import route_label
+import database
+
+settings = get_settings()
+log = logging.getLogger("vegfuel.slow_sql")
+profile_log = logging.getLogger("vegfuel.profile")
+
+MAX_SQL_CHARS    = 2000
+MAX_PARAM_KEYS   = 20
+PROFILE_INTERVAL = 0.005    # seconds between stack samples
+IDLE_FILES       = {"threading.py", "selectors.py", "queue.py"}   # leaf frames of parked threads
+
+# The ASGI scope of the request being served; threadpool calls copy the context
+_request: ContextVar[Optional[Scope]] = ContextVar("request_scope", default=None)
+
+
+# ── Slow-query log ────────────────────────────────────────────────────────────
+
+def _kind(value) -> str:
+    if isinstance(value, (str, bytes, list, tuple, set, dict)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def param_shape(parameters, executemany: bool = False) -> str:
+    """Types and sizes of bound parameters, e.g. `{user_id: str[36], log_date: date}`."""
+    if executemany:
+        rows = list(parameters)
+        return f"{len(rows)} x {param_shape(rows[0])}" if rows else "0 rows"
+    if isinstance(parameters, dict):
+        items = [f"{key}: {_kind(value)}" for key, value in list(parameters.items())[:MAX_PARAM_KEYS]]
+        if len(parameters) > MAX_PARAM_KEYS:
+            items.append(f"+{len(parameters) - MAX_PARAM_KEYS} more")
+        return "{" + ", ".join(items) + "}"
+    if isinstance(parameters, (list, tuple)):
+        items = [_kind(value) for value in parameters[:MAX_PARAM_KEYS]]
+        if len(parameters) > MAX_PARAM_KEYS:
+            items.append(f"+{len(parameters) - MAX_PARAM_KEYS} more")
+        return "(" + ", ".join(items) + ")"
+    return _kind(parameters)
+
+
+def user_hash(scope: Scope) -> str:
+    """Short, stable hash of the bearer token's subject; '-' when there is none."""
+    auth = Headers(scope=scope).get("authorization", "")
+    if not auth.lower().startswith("bearer "):
+        return "-"
+    try:
+        sub = jwt.get_unverified_claims(auth[7:]).get("sub")    # only logged, never trusted
+    except Exception:
+        return "-"
+    return hashlib.sha256(str(sub).encode()).hexdigest()[:12] if sub else "-"
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("slow_sql_start", []).append(time.perf_counter())
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    ms = (time.perf_counter() - conn.info["slow_sql_start"].pop()) * 1000
+    if ms >= settings.slow_query_ms:
+        scope = _request.get()
+        log.warning(
+            "slow query %.0f ms route=%s user=%s params=%s sql=%s",
+            ms,
+            route_label(scope) if scope else "-",
+            user_hash(scope) if scope else "-",
+            param_shape(parameters, executemany),
+            " ".join(statement.split())[:MAX_SQL_CHARS],
+        )
+
+
+def _on_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("slow_sql_start"):
+        conn.info["slow_sql_start"].pop()
+
+
+def _instrument_engine(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_execute)
+    event.listen(engine, "after_cursor_execute", _after_execute)
+    event.listen(engine, "handle_error", _on_error)
+
+
+# ── Sampling profiler ─────────────────────────────────────────────────────────
+
+def _fold(frame) -> str:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class Sampler:
+    """Counts the stacks of every busy thread, every `interval` seconds, until stopped."""
+
+    def __init__(self, interval: float = PROFILE_INTERVAL):
+        self.interval = interval
+        self.samples = 0
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            for ident, frame in sys._current_frames().items():
+                if ident != me and os.path.basename(frame.f_code.co_filename) not in IDLE_FILES:
+                    self.stacks[_fold(frame)] += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def authorized(headers: Headers) -> bool:
+    """Whether the caller may trigger or read profiles."""
+    if settings.app_env == "development":
+        return True
+    token = headers.get("x-admin-token", "")
+    return bool(settings.admin_token) and secrets.compare_digest(token, settings.admin_token)
+
+
+PROFILE_ID = re.compile(r"^[\w.-]+\.folded$")
+
+
+def profile_path(profile_id: str) -> Optional[str]:
+    """Path of a written profile, or None for unknown or malformed IDs."""
+    if not PROFILE_ID.match(profile_id):
+        return None
+    path = os.path.join(settings.profile_dir, profile_id)
+    return path if os.path.isfile(path) else None
+
+
+def _write_profile(profile_id: str, sampler: Sampler) -> None:
+    os.makedirs(settings.profile_dir, exist_ok=True)
+    with open(os.path.join(settings.profile_dir, profile_id), "w") as f:
+        f.write(sampler.folded())
+
+
+_profiling = False
+
+
+def _wants_profile(scope: Scope) -> bool:
+    if _profiling:
+        return False
+    headers = Headers(scope=scope)
+    if headers.get("x-profile") == "1" and authorized(headers):
+        return True
+    return settings.profile_sample_rate > 0 and random.random() < settings.profile_sample_rate
+
+
+class DiagnosticsMiddleware:
+    """Makes the request visible to the slow-query log and profiles the requests that ask for it."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = _request.set(scope)
+        try:
+            if _wants_profile(scope):
+                await self._profiled(scope, receive, send)
+            else:
+                await self.app(scope, receive, send)
+        finally:
+            _request.reset(token)
+
+    async def _profiled(self, scope: Scope, receive: Receive, send: Send) -> None:
+        global _profiling
+        _profiling = True
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        profile_id = f"{stamp}-{uuid.uuid4().hex[:8]}.folded"
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Profile-Id"] = profile_id
+            await send(message)
+
+        sampler = Sampler()
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            _profiling = False
+            try:
+                await asyncio.to_thread(_write_profile, profile_id, sampler)
+            except OSError:
+                profile_log.exception("could not write profile %s", profile_id)
+            else:
+                profile_log.info(
+                    "profiled %s %s in %.0f ms (%d samples): %s",
+                    scope["method"], route_label(scope), (time.perf_counter() - start) * 1000,
+                    sampler.samples, profile_id,
+                )
+
+
+# ── Setup ─────────────────────────────────────────────────────────────────────
+
+def install() -> None:
+    """Attach the slow-query log to engines as they are created; call before the first one."""
+    if settings.slow_query_ms > 0:
+        database.engine_hooks.append(_instrument_engine)
@@ -0,0 +1,62 @@
+"""
+Strong ETags for per-user resources, so warm clients revalidate with
+If-None-Match and get a 304 without the server loading or serializing
+the body.
+
+Collections are versioned by a counter that every write bumps in the same
+transaction; a log day uses its daily_summaries version. ETags carry a
+hash of the user ID so a device that switches accounts can't match.
+"""
+import hashlib
+import json
+from typing import Optional
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+
+from database import dialect_insert
+import models
+
+# Cache, but always revalidate: the browser then sends If-None-Match itself
+CACHE_CONTROL = "private, no-cache"
+
+
+def bump(db: Session, user_id: str, collection: str) -> None:
+    """Advance a collection's version inside the caller's transaction."""
+    insert = dialect_insert(db)
+    stmt = insert(models.CollectionVersion).values(user_id=user_id, collection=collection, version=1)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["user_id", "collection"],
+        set_={"version": models.CollectionVersion.version + 1},
+    ))
+
+
+def current(db: Session, user_id: str, collection: str) -> int:
+    return db.query(models.CollectionVersion.version).filter(
+        models.CollectionVersion.user_id == user_id,
+        models.CollectionVersion.collection == collection,
+    ).scalar() or 0
+
+
+def make(user_id: str, collection: str, version: int) -> str:
+    owner = hashlib.sha1(user_id.encode()).hexdigest()[:10]
+    return f'"{collection}.{version}.{owner}"'
+
+
+def of_content(content: dict) -> str:
+    """ETag for a small body that's already in memory (e.g. the cached profile)."""
+    digest = hashlib.sha1(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
+    return f'"{digest[:20]}"'
+
+
+def check(request: Request, response: Response, tag: str) -> Optional[Response]:
+    """
+    A 304 response if the client already has `tag`; otherwise None, with the
+    ETag set on the response the handler is about to return.
+    """
+    headers = {"ETag": tag, "Cache-Control": CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match", "")
+    candidates = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+    if tag in candidates or "*" in candidates:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,58 @@
+"""
+Opt-in fast path for list responses (FAST_JSON=true).
+
+By default list endpoints return ORM objects that FastAPI validates
+through the response model and then re-encodes, walking every key of the
+per100g / ingredients / nutrition blobs twice. In fast mode a handler
+instead selects only the columns the client sees, as plain rows; JSON
+columns are read back as their stored text and spliced into the output
+verbatim (orjson.Fragment), so the blobs are never decoded at all. The
+handler returns the result as an ORJSONResponse, which skips response
+model validation.
+"""
+import orjson
+from typing import Iterable
+from fastapi import Response
+from sqlalchemy import Text, cast
+from sqlalchemy.engine import Row
+from sqlalchemy.types import TypeDecorator
+
+from config import get_settings
+
+
+def dumps(content) -> bytes:
+    return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+
+
+class ORJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+class _RawJSON(TypeDecorator):
+    """Text that is already JSON; loaded as an orjson.Fragment, not parsed."""
+    impl = Text
+    cache_ok = True
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else orjson.Fragment(value)
+
+
+def enabled() -> bool:
+    return get_settings().fast_json
+
+
+def raw(column):
+    """Select a JSON column as pre-encoded bytes for the response."""
+    return cast(column, _RawJSON).label(column.key)
+
+
+def records(rows: Iterable[Row]) -> list[dict]:
+    return [row._asdict() for row in rows]
+
+
+def respond(response: Response, content) -> ORJSONResponse:
+    """Render `content`, keeping headers (ETag etc.) already set on `response`."""
+    return ORJSONResponse(content, headers=dict(response.headers))
@@ -0,0 +1,188 @@
+"""
+In-memory food name search behind GET /foods/search.
+
+One global index holds the built-in food table, plus USDA foods as they are
+cached; each user who searches also gets a small index of their own custom
+ingredient and mixture names, loaded on first use and kept in a TTLCache.
+The mixture and ingredient write paths update a loaded user index in place,
+so a new name is searchable immediately; other processes pick it up when
+their copy expires.
+
+Ranking, best first: exact name, name prefix, word prefix, substring, then
+typo-tolerant matches by trigram similarity. Ties go to the user's own
+foods, then built-in, then USDA, then shorter names.
+"""
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Iterable
+from sqlalchemy.orm import Session
+
+from cache import TTLCache
+from food_table import FOODS
+import models
+
+EXACT, PREFIX, WORD_PREFIX, SUBSTRING, FUZZY = range(5)
+MIN_SIMILARITY = 0.3            # trigram Jaccard similarity for a fuzzy match
+SOURCE_RANK    = {"ingredient": 0, "mixture": 0, "builtin": 1, "usda": 2}
+
+USER_INDEXES   = 5000           # user indexes kept per process
+USER_INDEX_TTL = 300            # seconds before a user index is reloaded
+
+
+def normalize(name: str) -> str:
+    return " ".join(name.lower().split())
+
+
+def trigrams(key: str) -> set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _word_starts(key: str) -> list[int]:
+    return [0] + [i + 1 for i, ch in enumerate(key) if ch in " -,(/" and i + 1 < len(key)]
+
+
+class NameIndex:
+    """Prefix list plus trigram postings over normalized names. Thread-safe."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._names: dict[str, tuple[str, str, int]] = {}    # key -> (name, source, trigram count)
+        self._starts: list[tuple[str, int, str]] = []        # sorted (key[offset:], offset, key)
+        self._grams: dict[str, set[str]] = {}                # trigram -> keys
+
+    def add(self, name: str, source: str) -> None:
+        key = normalize(name)
+        if not key:
+            return
+        with self._lock:
+            if key in self._names:
+                self._names[key] = (name, source, self._names[key][2])
+                return
+            grams = trigrams(key)
+            self._names[key] = (name, source, len(grams))
+            for offset in _word_starts(key):
+                insort(self._starts, (key[offset:], offset, key))
+            for gram in grams:
+                self._grams.setdefault(gram, set()).add(key)
+
+    def remove(self, name: str, source: str) -> None:
+        key = normalize(name)
+        with self._lock:
+            entry = self._names.get(key)
+            if entry is None or entry[1] != source:
+                return
+            del self._names[key]
+            for offset in _word_starts(key):
+                i = bisect_left(self._starts, (key[offset:], offset, key))
+                if i < len(self._starts) and self._starts[i][2] == key:
+                    del self._starts[i]
+            for gram in trigrams(key):
+                keys = self._grams.get(gram)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._grams[gram]
+
+    def search(self, query: str, limit: int) -> list[tuple]:
+        """Up to `limit` best matches as sortable (tier, -similarity, source rank, length, name, source)."""
+        q = normalize(query)
+        if not q:
+            return []
+        tiers: dict[str, tuple[int, float]] = {}
+        with self._lock:
+            if q in self._names:
+                tiers[q] = (EXACT, 1.0)
+            i = bisect_left(self._starts, (q,))
+            while i < len(self._starts) and self._starts[i][0].startswith(q):
+                _, offset, key = self._starts[i]
+                tier = PREFIX if offset == 0 else WORD_PREFIX
+                if key not in tiers or tiers[key][0] > tier:
+                    tiers[key] = (tier, 1.0)
+                i += 1
+
+            # Substring and typo matches only when prefixes didn't fill the page
+            if len(tiers) < limit and len(q) >= 3:
+                q_grams = trigrams(q)
+                shared = Counter()
+                for gram in q_grams:
+                    shared.update(self._grams.get(gram, ()))
+                for key, n in shared.items():
+                    if key in tiers:
+                        continue
+                    if q in key:
+                        tiers[key] = (SUBSTRING, 1.0)
+                        continue
+                    similarity = n / (len(q_grams) + self._names[key][2] - n)
+                    if similarity >= MIN_SIMILARITY:
+                        tiers[key] = (FUZZY, similarity)
+
+            matches = [
+                (tier, -similarity, SOURCE_RANK.get(self._names[key][1], 9), len(key), *self._names[key][:2])
+                for key, (tier, similarity) in tiers.items()
+            ]
+        matches.sort()
+        return matches[:limit]
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+# ── Global and per-user indexes ───────────────────────────────────────────────
+
+_global = NameIndex()
+for _name in FOODS:
+    _global.add(_name, "builtin")
+
+_users = TTLCache(USER_INDEXES, USER_INDEX_TTL)
+
+
+def _user_index(db: Session, user_id: str) -> NameIndex:
+    index = _users.get(user_id)
+    if index is None:
+        index = NameIndex()
+        for (name,) in db.query(models.CustomIngredient.name).filter(models.CustomIngredient.user_id == user_id):
+            index.add(name, "ingredient")
+        for (name,) in db.query(models.Mixture.name).filter(models.Mixture.user_id == user_id):
+            index.add(name, "mixture")
+        _users.set(user_id, index)
+    return index
+
+
+def search(db: Session, user_id: str, query: str, limit: int = 20) -> list[dict]:
+    matches = sorted(_global.search(query, limit) + _user_index(db, user_id).search(query, limit))
+    results, seen = [], set()
+    for *_, name, source in matches:
+        key = normalize(name)
+        if key in seen:
+            continue    # a user's food shadows a built-in one of the same name
+        seen.add(key)
+        results.append({"name": name, "source": source})
+        if len(results) == limit:
+            break
+    return results
+
+
+def add_global(names: Iterable[str], source: str = "usda") -> None:
+    for name in names:
+        _global.add(name, source)
+
+
+def user_added(user_id: str, names: Iterable[str], source: str) -> None:
+    """Index a user's new or renamed foods, if their index is loaded here."""
+    index = _users.get(user_id)
+    if index is not None:
+        for name in names:
+            index.add(name, source)
+
+
+def user_removed(user_id: str, names: Iterable[str], source: str) -> None:
+    index = _users.get(user_id)
+    if index is not None:
+        for name in names:
+            index.remove(name, source)
+
+
+def forget_user(user_id: str) -> None:
+    _users.pop(user_id)
@@ -0,0 +1,216 @@
+"""
+Built-in food table (per 100 g), mirrored from the client's `DB` object in
+index.html so the server can compute nutrition without the browser.
+
+Entries flagged `_perUnit` hold values for one whole item or dose; their
+logged `amount` is a count, not grams.
+"""
+
+NUTRIENT_KEYS = (
+    "cal", "protein", "carbs", "fat", "fiber",
+    "iron", "calcium", "potassium", "vitC", "vitB12", "zinc", "magnesium",
+)
+
+MACRO_KEYS = NUTRIENT_KEYS[:5]
+MICRO_KEYS = NUTRIENT_KEYS[5:]
+
+# USDA FoodData Central nutrient IDs → our keys (NUTRIENT_MAP in index.html)
+USDA_NUTRIENT_IDS = {
+    1008: "cal", 1003: "protein", 1005: "carbs", 1004: "fat",
+    1079: "fiber", 1089: "iron", 1087: "calcium", 1092: "potassium",
+    1162: "vitC", 1178: "vitB12", 1095: "zinc", 1090: "magnesium",
+}
+
+FOODS: dict[str, dict] = {
+    # Proteins
+    "tofu":                          dict(cal=76, protein=8, carbs=1.9, fat=4.8, fiber=0.3, iron=1.6, calcium=350, potassium=121, vitC=0.1, vitB12=0, zinc=0.8, magnesium=30),
+    "tempeh":                        dict(cal=193, protein=19, carbs=9.4, fat=11, fiber=1.8, iron=2.7, calcium=111, potassium=401, vitC=0, vitB12=0, zinc=1.7, magnesium=81),
+    "edamame":                       dict(cal=121, protein=11, carbs=8.9, fat=5.2, fiber=5.2, iron=2.3, calcium=63, potassium=436, vitC=6.1, vitB12=0, zinc=1.4, magnesium=64),
+    "lentils":                       dict(cal=116, protein=9, carbs=20, fat=0.4, fiber=7.9, iron=3.3, calcium=19, potassium=369, vitC=1.5, vitB12=0, zinc=1.3, magnesium=36),
+    "green lentils":                 dict(cal=106, protein=9, carbs=19, fat=0.4, fiber=7.8, iron=3.2, calcium=25, potassium=370, vitC=1.5, vitB12=0, zinc=1.3, magnesium=36),
+    "chickpeas":                     dict(cal=164, protein=9, carbs=27, fat=2.6, fiber=7.6, iron=2.9, calcium=49, potassium=291, vitC=1.3, vitB12=0, zinc=1.5, magnesium=48),
+    "black beans":                   dict(cal=132, protein=8.9, carbs=24, fat=0.5, fiber=8.7, iron=2.1, calcium=27, potassium=355, vitC=0, vitB12=0, zinc=1.0, magnesium=60),
+    "greek yogurt":                  dict(cal=97, protein=9, carbs=3.6, fat=5, fiber=0, iron=0.1, calcium=110, potassium=141, vitC=0, vitB12=1.3, zinc=0.5, magnesium=11),
+    "cottage cheese":                dict(cal=98, protein=11, carbs=3.4, fat=4.3, fiber=0, iron=0.1, calcium=83, potassium=104, vitC=0, vitB12=0.4, zinc=0.4, magnesium=8),
+    "eggs":                          dict(cal=155, protein=13, carbs=1.1, fat=11, fiber=0, iron=1.8, calcium=56, potassium=138, vitC=0, vitB12=1.1, zinc=1.3, magnesium=12),
+    # Animal proteins
+    "chicken breast":                dict(cal=165, protein=31, carbs=0, fat=3.6, fiber=0, iron=0.7, calcium=15, potassium=256, vitC=0, vitB12=0.3, zinc=1.0, magnesium=29),
+    "ground turkey":                 dict(cal=189, protein=27, carbs=0, fat=9, fiber=0, iron=1.5, calcium=21, potassium=291, vitC=0, vitB12=1.3, zinc=2.5, magnesium=24),
+    "turkey breast":                 dict(cal=135, protein=30, carbs=0, fat=1, fiber=0, iron=1.4, calcium=18, potassium=298, vitC=0, vitB12=0.5, zinc=1.7, magnesium=28),
+    "salmon":                        dict(cal=208, protein=20, carbs=0, fat=13, fiber=0, iron=0.8, calcium=12, potassium=363, vitC=3.9, vitB12=3.2, zinc=0.6, magnesium=27),
+    "tuna":                          dict(cal=116, protein=26, carbs=0, fat=1, fiber=0, iron=1.0, calcium=10, potassium=441, vitC=0, vitB12=2.3, zinc=0.6, magnesium=35),
+    "canned tuna":                   dict(cal=109, protein=25, carbs=0, fat=0.8, fiber=0, iron=1.3, calcium=11, potassium=237, vitC=0, vitB12=2.1, zinc=0.7, magnesium=31),
+    "shrimp":                        dict(cal=99, protein=24, carbs=0.2, fat=0.3, fiber=0, iron=0.5, calcium=64, potassium=259, vitC=0, vitB12=1.1, zinc=1.1, magnesium=37),
+    "tilapia":                       dict(cal=96, protein=20, carbs=0, fat=1.7, fiber=0, iron=0.6, calcium=14, potassium=302, vitC=0, vitB12=1.6, zinc=0.4, magnesium=27),
+    "cod":                           dict(cal=82, protein=18, carbs=0, fat=0.7, fiber=0, iron=0.4, calcium=16, potassium=413, vitC=1.0, vitB12=0.9, zinc=0.4, magnesium=32),
+    "sardines":                      dict(cal=208, protein=25, carbs=0, fat=11, fiber=0, iron=2.9, calcium=382, potassium=397, vitC=0, vitB12=8.9, zinc=1.3, magnesium=39),
+    "beef sirloin":                  dict(cal=207, protein=26, carbs=0, fat=11, fiber=0, iron=2.6, calcium=18, potassium=318, vitC=0, vitB12=1.9, zinc=5.5, magnesium=23),
+    "ground beef":                   dict(cal=254, protein=26, carbs=0, fat=17, fiber=0, iron=2.4, calcium=18, potassium=270, vitC=0, vitB12=2.3, zinc=6.3, magnesium=21),
+    "lean ground beef":              dict(cal=215, protein=27, carbs=0, fat=12, fiber=0, iron=2.5, calcium=19, potassium=289, vitC=0, vitB12=2.5, zinc=6.5, magnesium=22),
+    "pork tenderloin":               dict(cal=143, protein=26, carbs=0, fat=3.5, fiber=0, iron=1.1, calcium=20, potassium=423, vitC=0.6, vitB12=0.7, zinc=2.2, magnesium=28),
+    "whey protein powder":           dict(cal=400, protein=80, carbs=8, fat=5, fiber=0, iron=0.5, calcium=600, potassium=500, vitC=0, vitB12=1.2, zinc=3.5, magnesium=60),
+    "casein protein powder":         dict(cal=370, protein=75, carbs=10, fat=3, fiber=0, iron=0.4, calcium=800, potassium=450, vitC=0, vitB12=1.0, zinc=3.0, magnesium=55),
+    # Grains
+    "quinoa":                        dict(cal=120, protein=4.4, carbs=22, fat=1.9, fiber=2.8, iron=1.5, calcium=17, potassium=172, vitC=0, vitB12=0, zinc=1.1, magnesium=64),
+    "brown rice":                    dict(cal=112, protein=2.6, carbs=23, fat=0.9, fiber=1.8, iron=0.5, calcium=10, potassium=79, vitC=0, vitB12=0, zinc=0.6, magnesium=43),
+    "oats":                          dict(cal=389, protein=17, carbs=66, fat=7, fiber=10, iron=4.7, calcium=54, potassium=429, vitC=0, vitB12=0, zinc=3.9, magnesium=177),
+    "whole wheat bread":             dict(cal=247, protein=13, carbs=41, fat=3.4, fiber=7, iron=3.6, calcium=107, potassium=248, vitC=0, vitB12=0, zinc=1.5, magnesium=76),
+    "barley":                        dict(cal=354, protein=12, carbs=74, fat=2.3, fiber=17, iron=3.6, calcium=33, potassium=452, vitC=0, vitB12=0, zinc=2.8, magnesium=133),
+    # Vegetables
+    "spinach":                       dict(cal=23, protein=2.9, carbs=3.6, fat=0.4, fiber=2.2, iron=2.7, calcium=99, potassium=558, vitC=28, vitB12=0, zinc=0.5, magnesium=79),
+    "kale":                          dict(cal=49, protein=4.3, carbs=9, fat=0.9, fiber=3.6, iron=1.5, calcium=150, potassium=491, vitC=120, vitB12=0, zinc=0.4, magnesium=47),
+    "broccoli":                      dict(cal=34, protein=2.8, carbs=7, fat=0.4, fiber=2.6, iron=0.7, calcium=47, potassium=316, vitC=89, vitB12=0, zinc=0.4, magnesium=21),
+    "celery":                        dict(cal=16, protein=0.7, carbs=3, fat=0.2, fiber=1.6, iron=0.2, calcium=40, potassium=260, vitC=3.1, vitB12=0, zinc=0.1, magnesium=11),
+    "cucumber":                      dict(cal=15, protein=0.7, carbs=3.6, fat=0.1, fiber=0.5, iron=0.3, calcium=16, potassium=147, vitC=2.8, vitB12=0, zinc=0.2, magnesium=13),
+    "red bell pepper":               dict(cal=31, protein=1, carbs=6, fat=0.3, fiber=2.1, iron=0.4, calcium=10, potassium=211, vitC=128, vitB12=0, zinc=0.2, magnesium=10),
+    "garlic":                        dict(cal=149, protein=6.4, carbs=33, fat=0.5, fiber=2.1, iron=1.7, calcium=181, potassium=401, vitC=31, vitB12=0, zinc=1.2, magnesium=25),
+    "mushrooms":                     dict(cal=22, protein=3.1, carbs=3.3, fat=0.3, fiber=1, iron=0.5, calcium=3, potassium=318, vitC=2.1, vitB12=0, zinc=0.5, magnesium=9),
+    "zucchini":                      dict(cal=17, protein=1.2, carbs=3.1, fat=0.3, fiber=1, iron=0.4, calcium=16, potassium=261, vitC=17, vitB12=0, zinc=0.3, magnesium=18),
+    "cauliflower":                   dict(cal=25, protein=1.9, carbs=5, fat=0.3, fiber=2, iron=0.4, calcium=22, potassium=299, vitC=48, vitB12=0, zinc=0.3, magnesium=15),
+    "brussels sprouts":              dict(cal=43, protein=3.4, carbs=9, fat=0.3, fiber=3.8, iron=1.4, calcium=42, potassium=389, vitC=85, vitB12=0, zinc=0.4, magnesium=23),
+    "green beans":                   dict(cal=31, protein=1.8, carbs=7, fat=0.2, fiber=2.7, iron=1, calcium=37, potassium=211, vitC=12, vitB12=0, zinc=0.2, magnesium=25),
+    "peas":                          dict(cal=81, protein=5.4, carbs=14, fat=0.4, fiber=5.1, iron=1.5, calcium=25, potassium=244, vitC=40, vitB12=0, zinc=1.2, magnesium=33),
+    "corn":                          dict(cal=86, protein=3.2, carbs=19, fat=1.2, fiber=2.7, iron=0.5, calcium=2, potassium=270, vitC=6.8, vitB12=0, zinc=0.5, magnesium=37),
+    "beet":                          dict(cal=43, protein=1.6, carbs=10, fat=0.2, fiber=2.8, iron=0.8, calcium=16, potassium=325, vitC=4.9, vitB12=0, zinc=0.4, magnesium=23),
+    "asparagus":                     dict(cal=20, protein=2.2, carbs=3.9, fat=0.1, fiber=2.1, iron=2.1, calcium=24, potassium=202, vitC=5.6, vitB12=0, zinc=0.5, magnesium=14),
+    "cabbage":                       dict(cal=25, protein=1.3, carbs=5.8, fat=0.1, fiber=2.5, iron=0.5, calcium=40, potassium=170, vitC=36, vitB12=0, zinc=0.2, magnesium=12),
+    "bok choy":                      dict(cal=13, protein=1.5, carbs=2.2, fat=0.2, fiber=1, iron=0.8, calcium=105, potassium=252, vitC=45, vitB12=0, zinc=0.2, magnesium=19),
+    "arugula":                       dict(cal=25, protein=2.6, carbs=3.7, fat=0.7, fiber=1.6, iron=1.5, calcium=160, potassium=369, vitC=15, vitB12=0, zinc=0.5, magnesium=47),
+    "swiss chard":                   dict(cal=19, protein=1.8, carbs=3.7, fat=0.2, fiber=1.6, iron=1.8, calcium=51, potassium=379, vitC=30, vitB12=0, zinc=0.4, magnesium=81),
+    "collard greens":                dict(cal=32, protein=3, carbs=5.7, fat=0.6, fiber=4, iron=0.5, calcium=232, potassium=213, vitC=35, vitB12=0, zinc=0.2, magnesium=27),
+    "eggplant":                      dict(cal=25, protein=1, carbs=6, fat=0.2, fiber=3, iron=0.2, calcium=9, potassium=229, vitC=2.2, vitB12=0, zinc=0.1, magnesium=14),
+    "leek":                          dict(cal=61, protein=1.5, carbs=14, fat=0.3, fiber=1.8, iron=2.1, calcium=59, potassium=180, vitC=12, vitB12=0, zinc=0.1, magnesium=28),
+    "butternut squash":              dict(cal=45, protein=1, carbs=12, fat=0.1, fiber=2, iron=0.7, calcium=48, potassium=352, vitC=21, vitB12=0, zinc=0.2, magnesium=34),
+    "acorn squash":                  dict(cal=40, protein=0.9, carbs=10, fat=0.1, fiber=1.5, iron=0.6, calcium=44, potassium=347, vitC=11, vitB12=0, zinc=0.2, magnesium=43),
+    "artichoke":                     dict(cal=47, protein=3.3, carbs=11, fat=0.2, fiber=5.4, iron=1.3, calcium=44, potassium=370, vitC=11, vitB12=0, zinc=0.5, magnesium=60),
+    "turnip":                        dict(cal=28, protein=0.9, carbs=6.4, fat=0.1, fiber=1.8, iron=0.3, calcium=30, potassium=191, vitC=21, vitB12=0, zinc=0.3, magnesium=11),
+    "radish":                        dict(cal=16, protein=0.7, carbs=3.4, fat=0.1, fiber=1.6, iron=0.3, calcium=25, potassium=233, vitC=14, vitB12=0, zinc=0.3, magnesium=10),
+    # Fruits
+    "blueberries":                   dict(cal=57, protein=0.7, carbs=14, fat=0.3, fiber=2.4, iron=0.3, calcium=6, potassium=77, vitC=9.7, vitB12=0, zinc=0.2, magnesium=6),
+    "strawberries":                  dict(cal=32, protein=0.7, carbs=7.7, fat=0.3, fiber=2, iron=0.4, calcium=16, potassium=153, vitC=59, vitB12=0, zinc=0.1, magnesium=13),
+    "pineapple":                     dict(cal=50, protein=0.5, carbs=13, fat=0.1, fiber=1.4, iron=0.3, calcium=13, potassium=109, vitC=47, vitB12=0, zinc=0.1, magnesium=12),
+    "grapes":                        dict(cal=69, protein=0.7, carbs=18, fat=0.2, fiber=0.9, iron=0.4, calcium=10, potassium=191, vitC=3.2, vitB12=0, zinc=0.1, magnesium=7),
+    "watermelon":                    dict(cal=30, protein=0.6, carbs=7.6, fat=0.2, fiber=0.4, iron=0.2, calcium=7, potassium=112, vitC=8.1, vitB12=0, zinc=0.1, magnesium=10),
+    "cherries":                      dict(cal=50, protein=1, carbs=12, fat=0.3, fiber=1.6, iron=0.4, calcium=13, potassium=222, vitC=7, vitB12=0, zinc=0.1, magnesium=11),
+    "raspberries":                   dict(cal=52, protein=1.2, carbs=12, fat=0.7, fiber=6.5, iron=0.7, calcium=25, potassium=151, vitC=26, vitB12=0, zinc=0.4, magnesium=22),
+    "blackberries":                  dict(cal=43, protein=1.4, carbs=10, fat=0.5, fiber=5.3, iron=0.6, calcium=29, potassium=162, vitC=21, vitB12=0, zinc=0.5, magnesium=20),
+    "pomegranate":                   dict(cal=83, protein=1.7, carbs=19, fat=1.2, fiber=4, iron=0.3, calcium=10, potassium=236, vitC=10, vitB12=0, zinc=0.4, magnesium=12),
+    "papaya":                        dict(cal=43, protein=0.5, carbs=11, fat=0.3, fiber=1.7, iron=0.3, calcium=20, potassium=182, vitC=62, vitB12=0, zinc=0.1, magnesium=21),
+    "mandarin oranges":              dict(cal=53, protein=0.8, carbs=13, fat=0.3, fiber=1.8, iron=0.2, calcium=37, potassium=166, vitC=27, vitB12=0, zinc=0.1, magnesium=12),
+    "clementine":                    dict(cal=47, protein=0.9, carbs=12, fat=0.1, fiber=1.7, iron=0.1, calcium=30, potassium=177, vitC=49, vitB12=0, zinc=0.1, magnesium=10),
+    # Whole-unit foods (values per whole item at USDA medium size)
+    # Enter quantity as number of pieces, unit = 'g', amount = piece weight in grams
+    "apple":                         dict(_perUnit=True, cal=95, protein=0.5, carbs=25, fat=0.3, fiber=4.4, iron=0.2, calcium=11, potassium=195, vitC=8.4, vitB12=0, zinc=0.1, magnesium=9),
+    "banana":                        dict(_perUnit=True, cal=105, protein=1.3, carbs=27, fat=0.4, fiber=3.1, iron=0.3, calcium=6, potassium=422, vitC=10, vitB12=0, zinc=0.2, magnesium=32),
+    "orange":                        dict(_perUnit=True, cal=62, protein=1.2, carbs=15, fat=0.2, fiber=3.1, iron=0.1, calcium=52, potassium=237, vitC=70, vitB12=0, zinc=0.1, magnesium=13),
+    "mandarin orange":               dict(_perUnit=True, cal=40, protein=0.6, carbs=10, fat=0.2, fiber=1.3, iron=0.1, calcium=27, potassium=131, vitC=21, vitB12=0, zinc=0.1, magnesium=9),
+    "pear":                          dict(_perUnit=True, cal=101, protein=0.6, carbs=27, fat=0.2, fiber=5.5, iron=0.3, calcium=16, potassium=206, vitC=7.5, vitB12=0, zinc=0.2, magnesium=12),
+    "peach":                         dict(_perUnit=True, cal=58, protein=1.4, carbs=14, fat=0.4, fiber=2.3, iron=0.4, calcium=9, potassium=285, vitC=9.9, vitB12=0, zinc=0.3, magnesium=14),
+    "kiwi":                          dict(_perUnit=True, cal=42, protein=0.8, carbs=10, fat=0.4, fiber=2.1, iron=0.2, calcium=24, potassium=215, vitC=64, vitB12=0, zinc=0.1, magnesium=12),
+    "mango":                         dict(_perUnit=True, cal=202, protein=2.8, carbs=50, fat=1.3, fiber=5.4, iron=0.5, calcium=37, potassium=564, vitC=122, vitB12=0, zinc=0.3, magnesium=33),
+    "avocado":                       dict(_perUnit=True, cal=240, protein=3, carbs=13, fat=22, fiber=10, iron=0.9, calcium=18, potassium=728, vitC=15, vitB12=0, zinc=0.9, magnesium=43),
+    "carrot":                        dict(_perUnit=True, cal=25, protein=0.6, carbs=6, fat=0.1, fiber=1.7, iron=0.2, calcium=20, potassium=195, vitC=3.6, vitB12=0, zinc=0.1, magnesium=7),
+    "large carrot":                  dict(_perUnit=True, cal=30, protein=0.7, carbs=7, fat=0.2, fiber=2.1, iron=0.2, calcium=24, potassium=230, vitC=4.1, vitB12=0, zinc=0.2, magnesium=9),
+    "tomato":                        dict(_perUnit=True, cal=22, protein=1.1, carbs=4.8, fat=0.2, fiber=1.5, iron=0.3, calcium=12, potassium=292, vitC=17, vitB12=0, zinc=0.2, magnesium=13),
+    "potato":                        dict(_perUnit=True, cal=161, protein=4.3, carbs=37, fat=0.2, fiber=3.8, iron=1.9, calcium=26, potassium=926, vitC=17, vitB12=0, zinc=0.6, magnesium=48),
+    "sweet potato":                  dict(_perUnit=True, cal=103, protein=2.3, carbs=24, fat=0.1, fiber=3.8, iron=0.8, calcium=39, potassium=542, vitC=22, vitB12=0, zinc=0.4, magnesium=33),
+    "egg":                           dict(_perUnit=True, cal=72, protein=6.3, carbs=0.4, fat=5, fiber=0, iron=0.9, calcium=28, potassium=69, vitC=0, vitB12=0.6, zinc=0.6, magnesium=6),
+    "large egg":                     dict(_perUnit=True, cal=78, protein=6.3, carbs=0.6, fat=5.3, fiber=0, iron=1.0, calcium=30, potassium=76, vitC=0, vitB12=0.6, zinc=0.6, magnesium=6),
+    "onion":                         dict(_perUnit=True, cal=44, protein=1.2, carbs=10, fat=0.1, fiber=1.9, iron=0.2, calcium=25, potassium=161, vitC=8.1, vitB12=0, zinc=0.2, magnesium=11),
+    "bell pepper":                   dict(_perUnit=True, cal=31, protein=1, carbs=7.2, fat=0.3, fiber=2.5, iron=0.4, calcium=12, potassium=251, vitC=152, vitB12=0, zinc=0.2, magnesium=12),
+    "lemon":                         dict(_perUnit=True, cal=17, protein=0.6, carbs=5.4, fat=0.2, fiber=1.6, iron=0.4, calcium=15, potassium=80, vitC=31, vitB12=0, zinc=0.1, magnesium=5),
+    # Vitamins & supplements (per dose — enter 1 for one dose)
+    "vitamin d3 1000iu":             dict(_perUnit=True, cal=0, protein=0, carbs=0, fat=0, fiber=0, iron=0, calcium=0, potassium=0, vitC=0, vitB12=0, zinc=0, magnesium=0),
+    "vitamin b12 1000mcg":           dict(_perUnit=True, cal=0, protein=0, carbs=0, fat=0, fiber=0, iron=0, calcium=0, potassium=0, vitC=0, vitB12=1000, zinc=0, magnesium=0),
+    "vitamin c 500mg":               dict(_perUnit=True, cal=0, protein=0, carbs=0, fat=0, fiber=0, iron=0, calcium=0, potassium=0, vitC=500, vitB12=0, zinc=0, magnesium=0),
+    "vitamin c 1000mg":              dict(_perUnit=True, cal=0, protein=0, carbs=0, fat=0, fiber=0, iron=0, calcium=0, potassium=0, vitC=1000, vitB12=0, zinc=0, magnesium=0),
+    "zinc 10mg":                     dict(_perUnit=True, cal=0, protein=0, carbs=0, fat=0, fiber=0, iron=0, calcium=0, potassium=0, vitC=0, vitB12=0, zinc=10, magnesium=0),
+    "magnesium 200mg":               dict(_perUnit=True, cal=0, protein=0, carbs=0, fat=0, fiber=0, iron=0, calcium=0, potassium=0, vitC=0, vitB12=0, zinc=0, magnesium=200),
+    "magnesium 400mg":               dict(_perUnit=True, cal=0, protein=0, carbs=0, fat=0, fiber=0, iron=0, calcium=0, potassium=0, vitC=0, vitB12=0, zinc=0, magnesium=400),
+    "iron 18mg":                     dict(_perUnit=True, cal=0, protein=0, carbs=0, fat=0, fiber=0, iron=18, calcium=0, potassium=0, vitC=0, vitB12=0, zinc=0, magnesium=0),
+    "calcium 500mg":                 dict(_perUnit=True, cal=0, protein=0, carbs=0, fat=0, fiber=0, iron=0, calcium=500, potassium=0, vitC=0, vitB12=0, zinc=0, magnesium=0),
+    "raisins":                       dict(cal=299, protein=3.1, carbs=79, fat=0.5, fiber=3.7, iron=1.9, calcium=50, potassium=749, vitC=2.3, vitB12=0, zinc=0.2, magnesium=32),
+    "dates":                         dict(cal=282, protein=2.5, carbs=75, fat=0.4, fiber=8, iron=1.0, calcium=64, potassium=696, vitC=0, vitB12=0, zinc=0.4, magnesium=54),
+    "medjool dates":                 dict(cal=277, protein=1.8, carbs=75, fat=0.2, fiber=6.7, iron=0.9, calcium=64, potassium=696, vitC=0, vitB12=0, zinc=0.4, magnesium=54),
+    "dried apricots":                dict(cal=241, protein=3.4, carbs=63, fat=0.5, fiber=7.3, iron=2.7, calcium=55, potassium=1162, vitC=1, vitB12=0, zinc=0.4, magnesium=32),
+    "dried cranberries":             dict(cal=308, protein=0.1, carbs=82, fat=1.4, fiber=5.7, iron=0.3, calcium=9, potassium=49, vitC=0.2, vitB12=0, zinc=0.1, magnesium=6),
+    "dried mango":                   dict(cal=319, protein=2.7, carbs=78, fat=1.2, fiber=2.4, iron=1.0, calcium=23, potassium=279, vitC=14, vitB12=0, zinc=0.2, magnesium=18),
+    "dried figs":                    dict(cal=249, protein=3.3, carbs=64, fat=0.9, fiber=9.8, iron=2.0, calcium=162, potassium=680, vitC=1.2, vitB12=0, zinc=0.5, magnesium=68),
+    "prunes":                        dict(cal=240, protein=2.2, carbs=64, fat=0.4, fiber=7.1, iron=0.9, calcium=43, potassium=732, vitC=0.6, vitB12=0, zinc=0.4, magnesium=41),
+    "dried blueberries":             dict(cal=317, protein=0.3, carbs=84, fat=1.1, fiber=4, iron=0.4, calcium=8, potassium=67, vitC=0, vitB12=0, zinc=0.1, magnesium=7),
+    "dried cherries":                dict(cal=283, protein=2.6, carbs=72, fat=0.5, fiber=3.5, iron=0.7, calcium=25, potassium=495, vitC=0, vitB12=0, zinc=0.2, magnesium=22),
+    "dried goji berries":            dict(cal=349, protein=14, carbs=77, fat=0.4, fiber=13, iron=6.8, calcium=190, potassium=1132, vitC=48, vitB12=0, zinc=2.0, magnesium=83),
+    "dried pineapple":               dict(cal=346, protein=1.4, carbs=86, fat=1.3, fiber=6.8, iron=1.3, calcium=51, potassium=581, vitC=10, vitB12=0, zinc=0.3, magnesium=54),
+    "sultanas":                      dict(cal=299, protein=3.1, carbs=79, fat=0.5, fiber=3.7, iron=1.9, calcium=50, potassium=749, vitC=2.3, vitB12=0, zinc=0.2, magnesium=32),
+    "almonds":                       dict(cal=579, protein=21, carbs=22, fat=50, fiber=12.5, iron=3.7, calcium=264, potassium=733, vitC=0, vitB12=0, zinc=3.1, magnesium=270),
+    "walnuts":                       dict(cal=654, protein=15, carbs=14, fat=65, fiber=6.7, iron=2.9, calcium=98, potassium=441, vitC=1.3, vitB12=0, zinc=3.1, magnesium=158),
+    "cashews":                       dict(cal=553, protein=18, carbs=30, fat=44, fiber=3.3, iron=6.7, calcium=37, potassium=660, vitC=0.5, vitB12=0, zinc=5.8, magnesium=292),
+    "pistachios":                    dict(cal=560, protein=20, carbs=28, fat=45, fiber=10.6, iron=3.9, calcium=105, potassium=1025, vitC=5.6, vitB12=0, zinc=2.2, magnesium=121),
+    "pecans":                        dict(cal=691, protein=9.2, carbs=14, fat=72, fiber=9.6, iron=2.5, calcium=70, potassium=410, vitC=1.1, vitB12=0, zinc=4.5, magnesium=121),
+    "macadamia nuts":                dict(cal=718, protein=7.9, carbs=14, fat=76, fiber=8.6, iron=3.7, calcium=85, potassium=368, vitC=1.2, vitB12=0, zinc=1.3, magnesium=130),
+    "brazil nuts":                   dict(cal=659, protein=14, carbs=12, fat=67, fiber=7.5, iron=2.4, calcium=160, potassium=659, vitC=0.7, vitB12=0, zinc=4.1, magnesium=376),
+    "hazelnuts":                     dict(cal=628, protein=15, carbs=17, fat=61, fiber=9.7, iron=4.7, calcium=114, potassium=680, vitC=6.3, vitB12=0, zinc=2.4, magnesium=163),
+    "pine nuts":                     dict(cal=673, protein=14, carbs=13, fat=68, fiber=3.7, iron=5.5, calcium=16, potassium=597, vitC=0.8, vitB12=0, zinc=6.5, magnesium=251),
+    "peanuts":                       dict(cal=567, protein=26, carbs=16, fat=49, fiber=8.5, iron=4.6, calcium=92, potassium=705, vitC=0, vitB12=0, zinc=3.3, magnesium=168),
+    "sunflower seeds":               dict(cal=584, protein=21, carbs=20, fat=51, fiber=8.6, iron=5.3, calcium=78, potassium=645, vitC=1.4, vitB12=0, zinc=5.0, magnesium=325),
+    "sesame seeds":                  dict(cal=573, protein=18, carbs=23, fat=50, fiber=11.8, iron=14.6, calcium=975, potassium=468, vitC=0, vitB12=0, zinc=7.8, magnesium=351),
+    "flaxseeds":                     dict(cal=534, protein=18, carbs=29, fat=42, fiber=27, iron=5.7, calcium=255, potassium=813, vitC=0.6, vitB12=0, zinc=4.3, magnesium=392),
+    "tahini":                        dict(cal=595, protein=17, carbs=21, fat=54, fiber=9.3, iron=8.9, calcium=426, potassium=414, vitC=0, vitB12=0, zinc=4.6, magnesium=95),
+    "almond butter":                 dict(cal=614, protein=21, carbs=19, fat=56, fiber=10.5, iron=3.5, calcium=347, potassium=748, vitC=0, vitB12=0, zinc=3.0, magnesium=279),
+    "cashew butter":                 dict(cal=587, protein=17, carbs=27, fat=50, fiber=2.1, iron=5.6, calcium=43, potassium=546, vitC=0, vitB12=0, zinc=5.3, magnesium=260),
+    "mixed nuts":                    dict(cal=607, protein=15, carbs=21, fat=54, fiber=5.3, iron=2.6, calcium=96, potassium=601, vitC=0.4, vitB12=0, zinc=3.3, magnesium=183),
+    "chia seeds":                    dict(cal=486, protein=17, carbs=42, fat=31, fiber=34, iron=7.7, calcium=631, potassium=407, vitC=1.6, vitB12=0, zinc=4.6, magnesium=335),
+    "hemp seeds":                    dict(cal=553, protein=32, carbs=8.7, fat=49, fiber=4, iron=7.9, calcium=70, potassium=1200, vitC=1, vitB12=0, zinc=9.9, magnesium=700),
+    "pumpkin seeds":                 dict(cal=559, protein=30, carbs=11, fat=49, fiber=6, iron=8.8, calcium=46, potassium=809, vitC=1.9, vitB12=0, zinc=7.8, magnesium=592),
+    "peanut butter":                 dict(cal=588, protein=25, carbs=20, fat=50, fiber=6, iron=1.9, calcium=43, potassium=558, vitC=0, vitB12=0, zinc=2.9, magnesium=154),
+    # ── NEW: Hulled hemp seeds (alias of hemp seeds, slightly higher protein when hulled) ──
+    "hulled hemp seeds":             dict(cal=566, protein=32, carbs=8.7, fat=50, fiber=4, iron=7.9, calcium=70, potassium=1200, vitC=1, vitB12=0, zinc=9.9, magnesium=700),
+    # ── NEW: Flaxseed meal (ground flax) ──
+    "flaxseed meal":                 dict(cal=534, protein=18, carbs=29, fat=42, fiber=27, iron=5.7, calcium=255, potassium=813, vitC=0.6, vitB12=0, zinc=4.3, magnesium=392),
+    "flax seed meal":                dict(cal=534, protein=18, carbs=29, fat=42, fiber=27, iron=5.7, calcium=255, potassium=813, vitC=0.6, vitB12=0, zinc=4.3, magnesium=392),
+    # ── NEW: Chai seeds (alias for chia seeds — likely a typo of "chia") ──
+    "chai seeds":                    dict(cal=486, protein=17, carbs=42, fat=31, fiber=34, iron=7.7, calcium=631, potassium=407, vitC=1.6, vitB12=0, zinc=4.6, magnesium=335),
+    # ── NEW: Cinnamon powder ──
+    "cinnamon powder":               dict(cal=247, protein=4, carbs=81, fat=1.2, fiber=53, iron=8.3, calcium=1002, potassium=431, vitC=3.8, vitB12=0, zinc=1.8, magnesium=60),
+    # ── NEW: Unsweetened shredded/desiccated coconut ──
+    "unsweetened coconut":           dict(cal=660, protein=6.9, carbs=24, fat=65, fiber=16, iron=3.3, calcium=26, potassium=543, vitC=3.3, vitB12=0, zinc=2.0, magnesium=105),
+    # ── NEW: Whole Foods 365 Organic Oat & Honey Granola (per 100g, ~420 kcal) ──
+    "oat honey granola":             dict(cal=420, protein=9, carbs=63, fat=15, fiber=5, iron=3.2, calcium=40, potassium=280, vitC=0, vitB12=0, zinc=2.0, magnesium=70),
+    # ── NEW: Trader Joe's Organic Creamy Cashew Cultured Yogurt Alternative, Plain Unsweetened ──
+    # Per 100g: 0.75 cup (171g) = 140 cal, 9g fat, 11g carbs, 1g fiber, 4g protein → scaled to 100g
+    "tj cashew yogurt":              dict(cal=82, protein=2.3, carbs=6.4, fat=5.3, fiber=0.6, iron=0.9, calcium=20, potassium=130, vitC=0, vitB12=0, zinc=0.4, magnesium=25),
+    "cashew yogurt":                 dict(cal=82, protein=2.3, carbs=6.4, fat=5.3, fiber=0.6, iron=0.9, calcium=20, potassium=130, vitC=0, vitB12=0, zinc=0.4, magnesium=25),
+    # ── NEW: WFM Forbidden Rice Sourdough ──
+    # Per 1 slice (~50g): 120 cal, 4g protein, 22g carbs, 2g fat → scaled to 100g
+    "forbidden rice sourdough":      dict(cal=240, protein=8, carbs=44, fat=4, fiber=3, iron=2.8, calcium=30, potassium=120, vitC=0, vitB12=0, zinc=0.9, magnesium=28),
+    "wfm forbidden rice sourdough":  dict(cal=240, protein=8, carbs=44, fat=4, fiber=3, iron=2.8, calcium=30, potassium=120, vitC=0, vitB12=0, zinc=0.9, magnesium=28),
+    # ── NEW: Meyenberg Vanilla Goat Yogurt ──
+    # Official label: 170g serving = 150 cal, 5g fat, 22g carbs, 0g fiber, 5g protein, 180mg Ca, 340mg K → per 100g
+    "meyenberg vanilla goat yogurt": dict(cal=88, protein=2.9, carbs=12.9, fat=2.9, fiber=0, iron=0, calcium=106, potassium=200, vitC=0, vitB12=0.4, zinc=0.4, magnesium=14),
+    "vanilla goat yogurt":           dict(cal=88, protein=2.9, carbs=12.9, fat=2.9, fiber=0, iron=0, calcium=106, potassium=200, vitC=0, vitB12=0.4, zinc=0.4, magnesium=14),
+    # ── NEW: Oatly 4 Ingredient Oatmilk ──
+    # Official label: 240ml = 80 cal, 1g fat, 16g carbs, 2g fiber, 3g protein, 70mg K → per 100ml
+    "oatly 4 ingredient":            dict(cal=33, protein=1.3, carbs=6.7, fat=0.4, fiber=0.8, iron=0, calcium=0, potassium=29, vitC=0, vitB12=0, zinc=0.1, magnesium=5),
+    "oatly 4 ingredient oat milk":   dict(cal=33, protein=1.3, carbs=6.7, fat=0.4, fiber=0.8, iron=0, calcium=0, potassium=29, vitC=0, vitB12=0, zinc=0.1, magnesium=5),
+    # ── NEW: Raw Tuscan / Lacinato Kale ──
+    "tuscan kale":                   dict(cal=35, protein=2.5, carbs=6.7, fat=0.5, fiber=2.0, iron=1.0, calcium=72, potassium=348, vitC=93, vitB12=0, zinc=0.3, magnesium=18),
+    "lacinato kale":                 dict(cal=35, protein=2.5, carbs=6.7, fat=0.5, fiber=2.0, iron=1.0, calcium=72, potassium=348, vitC=93, vitB12=0, zinc=0.3, magnesium=18),
+    "raw tuscan kale":               dict(cal=35, protein=2.5, carbs=6.7, fat=0.5, fiber=2.0, iron=1.0, calcium=72, potassium=348, vitC=93, vitB12=0, zinc=0.3, magnesium=18),
+    # ── NEW: Raw green beans alias ──
+    "raw green beans":               dict(cal=31, protein=1.8, carbs=7, fat=0.2, fiber=2.7, iron=1, calcium=37, potassium=211, vitC=12, vitB12=0, zinc=0.2, magnesium=25),
+    # ── NEW: Beets alias ──
+    "beets":                         dict(cal=43, protein=1.6, carbs=10, fat=0.2, fiber=2.8, iron=0.8, calcium=16, potassium=325, vitC=4.9, vitB12=0, zinc=0.4, magnesium=23),
+    # ── NEW: Red cabbage ──
+    "red cabbage":                   dict(cal=31, protein=1.4, carbs=7.4, fat=0.2, fiber=2.1, iron=0.6, calcium=45, potassium=243, vitC=57, vitB12=0, zinc=0.2, magnesium=16),
+    # ── NEW: Green cabbage alias ──
+    "green cabbage":                 dict(cal=25, protein=1.3, carbs=5.8, fat=0.1, fiber=2.5, iron=0.5, calcium=40, potassium=170, vitC=36, vitB12=0, zinc=0.2, magnesium=12),
+    # ── NEW: WFM 365 Organic Original Hummus ──
+    # Official label: 30g (2 tbsp) = 80 cal, 5g fat, 6g carbs, 1g fiber, 2g protein, 0.36mg iron → per 100g
+    "wfm organic hummus":            dict(cal=267, protein=6.7, carbs=20, fat=16.7, fiber=3.3, iron=1.2, calcium=40, potassium=200, vitC=2, vitB12=0, zinc=1.2, magnesium=35),
+    "365 organic hummus":            dict(cal=267, protein=6.7, carbs=20, fat=16.7, fiber=3.3, iron=1.2, calcium=40, potassium=200, vitC=2, vitB12=0, zinc=1.2, magnesium=35),
+    "hummus":                        dict(cal=267, protein=6.7, carbs=20, fat=16.7, fiber=3.3, iron=1.2, calcium=40, potassium=200, vitC=2, vitB12=0, zinc=1.2, magnesium=35),
+    # Dairy alternatives
+    "soy milk":                      dict(cal=54, protein=3.3, carbs=6.3, fat=1.8, fiber=0.5, iron=0.6, calcium=123, potassium=118, vitC=0, vitB12=1.2, zinc=0.3, magnesium=18),
+    "oat milk":                      dict(cal=47, protein=1, carbs=7.9, fat=1.5, fiber=0.8, iron=0.2, calcium=120, potassium=62, vitC=0, vitB12=0.4, zinc=0.1, magnesium=10),
+    "nutritional yeast":             dict(cal=325, protein=50, carbs=28, fat=6, fiber=14, iron=4.9, calcium=38, potassium=1500, vitC=0, vitB12=2.4, zinc=2.9, magnesium=97),
+}
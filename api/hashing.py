@@ -0,0 +1,95 @@
+"""
+Password hashing on a dedicated, bounded process pool.
+
+bcrypt deliberately burns 100–300 ms of CPU per call. Running it in worker
+processes keeps it off the event loop and out of Starlette's threadpool,
+and sidesteps the GIL; the semaphore caps how many hashes run at once and
+the waiting cap sheds load during a login storm instead of queueing forever.
+"""
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Optional
+
+from config import get_settings
+
+_executor: Optional[ProcessPoolExecutor] = None
+_slots: Optional[asyncio.Semaphore] = None
+_stats = {"in_flight": 0, "waiting": 0, "completed": 0, "failed": 0, "rejected": 0}
+
+
+class Overloaded(Exception):
+    """Too many hashes are already waiting for a slot; the caller should shed the request."""
+
+
+# ── Blocking primitives (run inside the worker processes) ─────────────────────
+
+@lru_cache
+def _context():
+    # Built on first use (in whichever process hashes), not at import
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def hash_password(password: str) -> str:
+    return _context().hash(password)
+
+
+def verify_password(plain: str, hashed: str) -> bool:
+    return _context().verify(plain, hashed)
+
+
+# ── Pool ──────────────────────────────────────────────────────────────────────
+
+def _pool() -> tuple[ProcessPoolExecutor, asyncio.Semaphore]:
+    global _executor, _slots
+    if _executor is None:
+        workers = get_settings().password_hash_workers
+        _executor = ProcessPoolExecutor(max_workers=workers)
+        _slots = asyncio.Semaphore(workers)
+    return _executor, _slots
+
+
+async def _run(fn, *args):
+    executor, slots = _pool()
+    if _stats["waiting"] >= get_settings().password_hash_max_waiting:
+        _stats["rejected"] += 1
+        raise Overloaded()
+
+    _stats["waiting"] += 1
+    try:
+        await slots.acquire()
+    finally:
+        _stats["waiting"] -= 1
+    _stats["in_flight"] += 1
+    try:
+        result = await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+    except Exception:
+        _stats["failed"] += 1
+        raise
+    else:
+        _stats["completed"] += 1
+        return result
+    finally:
+        _stats["in_flight"] -= 1
+        slots.release()
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run(hash_password, password)
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    return await _run(verify_password, plain, hashed)
+
+
+def stats() -> dict:
+    """Queue-depth counters: hashes running, waiting for a slot, done, raised, shed."""
+    return {"workers": get_settings().password_hash_workers, **_stats}
+
+
+def shutdown() -> None:
+    global _executor, _slots
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor, _slots = None, None
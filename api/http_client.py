@@ -0,0 +1,115 @@
+"""
+One application-scoped outbound HTTP client.
+
+Every call to Google, Apple and Resend goes through `request()`, which
+reuses pooled keep-alive connections (HTTP/2 when `h2` is installed), caps
+concurrent connections per host, retries transient failures with backoff,
+and reports per-host latency to any registered hooks.
+"""
+import asyncio
+import importlib.util
+import random
+import time
+from typing import Callable, Optional
+from urllib.parse import urlsplit
+import httpx
+
+MAX_CONNECTIONS      = 100
+MAX_KEEPALIVE        = 20
+PER_HOST_CONNECTIONS = 10
+TIMEOUT              = httpx.Timeout(10.0, connect=5.0)
+RETRIES              = 2
+BACKOFF_BASE         = 0.2     # seconds; doubles each attempt, plus jitter
+RETRY_STATUSES       = {429, 502, 503, 504}
+IDEMPOTENT_METHODS   = {"GET", "HEAD", "OPTIONS"}
+
+HTTP2 = importlib.util.find_spec("h2") is not None
+
+_client: Optional[httpx.AsyncClient] = None
+_host_slots: dict[str, asyncio.Semaphore] = {}
+_host_stats: dict[str, dict] = {}
+
+# Called as hook(host, seconds, status_code or None on transport error)
+latency_hooks: list[Callable[[str, float, Optional[int]], None]] = []
+
+
+# ── Lifecycle ─────────────────────────────────────────────────────────────────
+
+def _new_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=HTTP2,
+        timeout=TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE,
+            keepalive_expiry=30,
+        ),
+    )
+
+
+async def start() -> None:
+    global _client
+    if _client is None:
+        _client = _new_client()
+
+
+async def close() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """The shared client; created on first use outside the app lifespan (scripts)."""
+    global _client
+    if _client is None:
+        _client = _new_client()
+    return _client
+
+
+# ── Requests ──────────────────────────────────────────────────────────────────
+
+def _record(host: str, seconds: float, status: Optional[int]) -> None:
+    stats = _host_stats.setdefault(host, {"count": 0, "errors": 0, "total_s": 0.0, "max_s": 0.0})
+    stats["count"] += 1
+    stats["total_s"] += seconds
+    stats["max_s"] = max(stats["max_s"], seconds)
+    if status is None or status >= 500:
+        stats["errors"] += 1
+    for hook in latency_hooks:
+        hook(host, seconds, status)
+
+
+async def request(method: str, url: str, *, retries: int = RETRIES, **kwargs) -> httpx.Response:
+    """
+    Send a request on the shared client. GET-like requests are retried on
+    transport errors and on 429/5xx gateway statuses; other methods only
+    when the connection failed before anything was sent.
+    """
+    method = method.upper()
+    host = urlsplit(url).hostname or ""
+    slots = _host_slots.setdefault(host, asyncio.Semaphore(PER_HOST_CONNECTIONS))
+    idempotent = method in IDEMPOTENT_METHODS
+
+    for attempt in range(retries + 1):
+        last = attempt == retries
+        start = time.perf_counter()
+        try:
+            async with slots:
+                resp = await get_client().request(method, url, **kwargs)
+        except httpx.TransportError as e:
+            _record(host, time.perf_counter() - start, None)
+            unsent = isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+            if last or not (idempotent or unsent):
+                raise
+        else:
+            _record(host, time.perf_counter() - start, resp.status_code)
+            if last or not idempotent or resp.status_code not in RETRY_STATUSES:
+                return resp
+        await asyncio.sleep(BACKOFF_BASE * 2 ** attempt * (1 + random.random()))
+
+
+def stats() -> dict:
+    """Per-host request counts, errors and latency (seconds)."""
+    return {host: dict(s) for host, s in _host_stats.items()}
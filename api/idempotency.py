@@ -0,0 +1,331 @@
+"""
+Idempotency-Key support for every write endpoint (POST, PUT, PATCH, DELETE).
+
+A client that may retry a write sends `Idempotency-Key: <unique string>`.
+The first request with that key (per user) runs normally and its response
+is kept in `idempotency_keys` for IDEMPOTENCY_TTL seconds. Retries with the
+key get the stored response back, marked `Idempotent-Replayed: true`,
+without the handler running again.
+
+- Concurrent duplicates in one process wait for the first request and share
+  its outcome. A duplicate arriving at another process polls the row for
+  up to WAIT_SECONDS, then gets 409 with Retry-After.
+- Reusing a key for a different request (method, path, query or body) is
+  a 422.
+- 5xx responses, errors and responses over MAX_STORED_BYTES are not kept;
+  the key is released so a retry runs for real.
+- An in-progress claim is a LEASE, renewed every RENEW_SECONDS while the
+  request runs, so a long import keeps its key and only a key held by a
+  process that died mid-request becomes usable again.
+
+Requests without the header, or without a valid bearer token (sign-in,
+sign-up), pass straight through, as do tokens for a deleted user, which the
+endpoint then rejects.
+"""
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from auth import decode_token
+from config import get_settings
+from database import dialect_insert, run_in_session
+import models
+
+log = logging.getLogger("vegfuel.idempotency")
+
+METHODS          = {"POST", "PUT", "PATCH", "DELETE"}
+MAX_KEY_LENGTH   = 255
+MAX_STORED_BYTES = 256 * 1024
+LEASE            = timedelta(seconds=60)   # how long an in-progress claim holds its key
+RENEW_SECONDS    = 20.0                    # a running request extends its lease this often
+WAIT_SECONDS     = 10.0                    # a duplicate handled by another process waits this long
+POLL_SECONDS     = 0.1
+PURGE_SECONDS    = 300                     # expired keys are deleted this often
+SKIP_HEADERS     = {b"content-length", b"date", b"server", b"set-cookie"}
+
+settings = get_settings()
+Ident = tuple[str, str]        # (user_id, key)
+
+_inflight: dict[Ident, asyncio.Future] = {}
+_purger: Optional[asyncio.Task] = None
+
+
+# ── Store (sync, run through run_in_session) ──────────────────────────────────
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _claim(db: Session, ident: Ident) -> Optional[dict]:
+    """
+    Take the key if it is new or expired and return None; otherwise return
+    what is stored for it ({"status": "in_progress"} or the done record).
+    {"status": "no_user"} means the token's user no longer exists.
+    """
+    user_id, key = ident
+    now = _now()
+    insert = dialect_insert(db)
+    stmt = insert(models.IdempotencyKey).values(
+        user_id=user_id, key=key, status="in_progress", expires_at=now + LEASE,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "key"],
+        set_={
+            "status": "in_progress", "fingerprint": None, "status_code": None,
+            "headers": None, "body": None, "expires_at": now + LEASE,
+        },
+        where=models.IdempotencyKey.expires_at < now,
+    ).returning(models.IdempotencyKey.key)
+    try:
+        claimed = db.execute(stmt).first() is not None
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return {"status": "no_user"}
+    if claimed:
+        return None
+    row = db.get(models.IdempotencyKey, ident)
+    if row is None or row.status != "done":
+        return {"status": "in_progress"}    # or just released: the next poll claims it
+    return {
+        "status": row.status,
+        "fingerprint": row.fingerprint,
+        "status_code": row.status_code,
+        "headers": row.headers,
+        "body": row.body,
+    }
+
+
+def _store(db: Session, ident: Ident, record: dict) -> None:
+    user_id, key = ident
+    db.execute(
+        update(models.IdempotencyKey)
+        .where(models.IdempotencyKey.user_id == user_id, models.IdempotencyKey.key == key)
+        .values(**record, expires_at=_now() + timedelta(seconds=settings.idempotency_ttl))
+    )
+    db.commit()
+
+
+def _renew(db: Session, ident: Ident) -> None:
+    user_id, key = ident
+    db.execute(
+        update(models.IdempotencyKey)
+        .where(
+            models.IdempotencyKey.user_id == user_id,
+            models.IdempotencyKey.key == key,
+            models.IdempotencyKey.status == "in_progress",
+        )
+        .values(expires_at=_now() + LEASE)
+    )
+    db.commit()
+
+
+def _release(db: Session, ident: Ident) -> None:
+    user_id, key = ident
+    db.execute(delete(models.IdempotencyKey).where(
+        models.IdempotencyKey.user_id == user_id,
+        models.IdempotencyKey.key == key,
+        models.IdempotencyKey.status == "in_progress",
+    ))
+    db.commit()
+
+
+def purge(db: Session) -> int:
+    """Delete expired keys; returns how many."""
+    result = db.execute(delete(models.IdempotencyKey).where(models.IdempotencyKey.expires_at < _now()))
+    db.commit()
+    return result.rowcount
+
+
+# ── Middleware ────────────────────────────────────────────────────────────────
+
+def _user_id(headers: Headers) -> Optional[str]:
+    auth = headers.get("authorization", "")
+    if not auth.lower().startswith("bearer "):
+        return None
+    try:
+        return decode_token(auth[7:])
+    except HTTPException:
+        return None     # the endpoint rejects it
+
+
+async def _read_body(receive: Receive, fingerprint) -> None:
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            return
+        fingerprint.update(message.get("body", b""))
+        if not message.get("more_body", False):
+            return
+
+
+async def _replay(record: dict, fingerprint, scope: Scope, receive: Receive, send: Send) -> None:
+    await _read_body(receive, fingerprint)
+    if record["fingerprint"] != fingerprint.hexdigest():
+        response = JSONResponse(
+            status_code=422, content={"detail": "Idempotency-Key was already used for a different request"},
+        )
+        await response(scope, receive, send)
+        return
+    body = record["body"] or b""
+    headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in record["headers"]]
+    headers += [(b"content-length", str(len(body)).encode()), (b"idempotent-replayed", b"true")]
+    await send({"type": "http.response.start", "status": record["status_code"], "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+class IdempotencyMiddleware:
+    """Innermost, so stored responses are uncompressed and without CORS headers."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in METHODS:
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        key = headers.get("idempotency-key")
+        user_id = _user_id(headers) if key else None
+        if user_id is None:
+            await self.app(scope, receive, send)
+            return
+        if len(key) > MAX_KEY_LENGTH:
+            response = JSONResponse(status_code=400, content={"detail": "Idempotency-Key is too long"})
+            await response(scope, receive, send)
+            return
+
+        ident = (user_id, key)
+        fingerprint = hashlib.sha256(
+            f"{scope['method']} {scope['path']}?{scope['query_string'].decode('latin-1')}\n".encode()
+        )
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + WAIT_SECONDS
+        while True:
+            pending = _inflight.get(ident)
+            if pending is not None:
+                record = await asyncio.shield(pending)
+                if record is None:
+                    continue    # the first attempt failed and gave the key back
+            else:
+                record = await run_in_session(_claim, ident)
+                if record is None:
+                    await self._first(ident, fingerprint, scope, receive, send)
+                    return
+                if record["status"] == "no_user":
+                    await self.app(scope, receive, send)    # auth answers 401
+                    return
+                if record["status"] == "in_progress":
+                    if loop.time() >= deadline:
+                        response = JSONResponse(
+                            status_code=409,
+                            content={"detail": "A request with this Idempotency-Key is still in progress"},
+                            headers={"Retry-After": "1"},
+                        )
+                        await response(scope, receive, send)
+                        return
+                    await asyncio.sleep(POLL_SECONDS)
+                    continue
+            await _replay(record, fingerprint, scope, receive, send)
+            return
+
+    async def _first(self, ident: Ident, fingerprint, scope: Scope, receive: Receive, send: Send) -> None:
+        future = asyncio.get_running_loop().create_future()
+        _inflight[ident] = future
+        renewer = asyncio.create_task(_keep_claimed(ident))
+        status, stored_headers, body = 500, [], bytearray()
+        storable, complete, body_read = True, False, False
+
+        async def hashing_receive() -> Message:
+            nonlocal body_read
+            message = await receive()
+            if message["type"] == "http.request":
+                fingerprint.update(message.get("body", b""))
+                body_read = not message.get("more_body", False)
+            return message
+
+        async def capturing_send(message: Message) -> None:
+            nonlocal status, stored_headers, storable, complete
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                stored_headers = [
+                    [name.decode("latin-1"), value.decode("latin-1")]
+                    for name, value in message.get("headers", [])
+                    if name.lower() not in SKIP_HEADERS
+                ]
+            elif message["type"] == "http.response.body" and storable:
+                body.extend(message.get("body", b""))
+                storable = len(body) <= MAX_STORED_BYTES
+                complete = not message.get("more_body", False)
+            await send(message)
+
+        record = None
+        try:
+            await self.app(scope, hashing_receive, capturing_send)
+            if not body_read:       # e.g. a bodiless DELETE; the fingerprint still needs the body
+                await _read_body(receive, fingerprint)
+            if complete and storable and status < 500:
+                record = {
+                    "status": "done",
+                    "fingerprint": fingerprint.hexdigest(),
+                    "status_code": status,
+                    "headers": stored_headers,
+                    "body": bytes(body),
+                }
+        finally:
+            renewer.cancel()
+            try:
+                if record is not None:
+                    await run_in_session(_store, ident, record)
+                else:
+                    await run_in_session(_release, ident)
+            except Exception:
+                log.exception("could not settle idempotency key")
+                record = None
+            finally:
+                _inflight.pop(ident, None)
+                future.set_result(record)
+
+
+async def _keep_claimed(ident: Ident) -> None:
+    """Extend the claim's lease until cancelled, so a slow request keeps its key."""
+    while True:
+        await asyncio.sleep(RENEW_SECONDS)
+        try:
+            await run_in_session(_renew, ident)
+        except Exception:
+            log.exception("could not renew idempotency key lease")
+
+
+# ── Expiry ────────────────────────────────────────────────────────────────────
+
+async def _purge_forever() -> None:
+    while True:
+        await asyncio.sleep(PURGE_SECONDS)
+        try:
+            await run_in_session(purge)
+        except Exception:
+            log.exception("could not purge idempotency keys")
+
+
+async def start() -> None:
+    global _purger
+    _purger = asyncio.create_task(_purge_forever())
+
+
+async def stop() -> None:
+    global _purger
+    if _purger is not None:
+        _purger.cancel()
+        await asyncio.gather(_purger, return_exceptions=True)
+        _purger = None
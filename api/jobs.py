@@ -0,0 +1,148 @@
+"""
+In-process background jobs on a persistent outbox table.
+
+Request handlers call `enqueue()` inside their own transaction, so a job
+exists exactly when the change that caused it was committed, then `notify()`
+to wake a worker. Workers run in the app's lifespan, claim due rows with
+SELECT ... FOR UPDATE SKIP LOCKED (safe across several app processes),
+retry failures with exponential backoff, and park a job as `dead` once it
+has used all of its attempts.
+
+A claimed job's `run_after` is pushed out by LEASE, so a job whose worker
+died mid-run is picked up again once the lease lapses.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+from sqlalchemy.orm import Session
+
+from config import get_settings
+from database import run_in_session
+import models
+
+log = logging.getLogger("vegfuel.jobs")
+
+LEASE        = timedelta(minutes=5)
+BACKOFF_BASE = timedelta(seconds=10)    # 10s, 20s, 40s, ... per failed attempt
+BACKOFF_MAX  = timedelta(hours=1)
+
+_handlers: dict[str, Callable[[dict], Awaitable[None]]] = {}
+_wakeup: Optional[asyncio.Event] = None
+_workers: list[asyncio.Task] = []
+_stats = {"succeeded": 0, "failed": 0, "dead": 0}
+
+
+def handler(kind: str):
+    """Register an async function as the handler for a job kind."""
+    def register(fn):
+        _handlers[kind] = fn
+        return fn
+    return register
+
+
+def enqueue(db: Session, kind: str, payload: dict, max_attempts: int = 6) -> None:
+    """Add a job to the caller's transaction; it runs only if that commits."""
+    db.add(models.OutboxJob(kind=kind, payload=payload, max_attempts=max_attempts))
+
+
+def notify() -> None:
+    """Wake an idle worker now instead of at its next poll."""
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+# ── Claiming and settling (sync, run through run_in_session) ──────────────────
+
+def _claim(db: Session) -> Optional[tuple[str, str, dict]]:
+    now = datetime.now(timezone.utc)
+    job = (
+        db.query(models.OutboxJob)
+        .filter(
+            models.OutboxJob.status.in_(("pending", "running")),
+            models.OutboxJob.run_after <= now,
+        )
+        .order_by(models.OutboxJob.run_after)
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+    if job is None:
+        return None
+    job.status = "running"
+    job.attempts += 1
+    job.run_after = now + LEASE
+    claimed = job.id, job.kind, job.payload
+    db.commit()
+    return claimed
+
+
+def _settle(db: Session, job_id: str, error: Optional[str]) -> None:
+    job = db.get(models.OutboxJob, job_id)
+    if job is None:
+        return
+    if error is None:
+        db.delete(job)
+        _stats["succeeded"] += 1
+    elif job.attempts >= job.max_attempts:
+        job.status, job.last_error = "dead", error
+        _stats["dead"] += 1
+        log.error("job %s (%s) is dead after %d attempts: %s", job.id, job.kind, job.attempts, error)
+    else:
+        delay = min(BACKOFF_BASE * 2 ** (job.attempts - 1), BACKOFF_MAX)
+        job.status, job.last_error = "pending", error
+        job.run_after = datetime.now(timezone.utc) + delay
+        _stats["failed"] += 1
+        log.warning("job %s (%s) failed, retrying in %s: %s", job.id, job.kind, delay, error)
+    db.commit()
+
+
+# ── Workers ───────────────────────────────────────────────────────────────────
+
+async def _run_one() -> bool:
+    claimed = await run_in_session(_claim)
+    if claimed is None:
+        return False
+    job_id, kind, payload = claimed
+    error = None
+    try:
+        fn = _handlers.get(kind)
+        if fn is None:
+            raise LookupError(f"no handler for job kind {kind!r}")
+        await fn(payload)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    await run_in_session(_settle, job_id, error)
+    return True
+
+
+async def _worker() -> None:
+    poll = get_settings().job_poll_seconds
+    while True:
+        _wakeup.clear()     # before claiming, so a notify() during the claim isn't lost
+        try:
+            if await _run_one():
+                continue
+        except Exception:
+            log.exception("job worker error")
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=poll)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def start() -> None:
+    global _wakeup
+    _wakeup = asyncio.Event()
+    for _ in range(get_settings().job_workers):
+        _workers.append(asyncio.create_task(_worker()))
+
+
+async def stop() -> None:
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+
+
+def stats() -> dict:
+    return {"workers": len(_workers), **_stats}
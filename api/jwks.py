@@ -0,0 +1,88 @@
+"""
+Cached JSON Web Key Sets for verifying Google and Apple ID tokens locally.
+
+Keys are kept for the provider's Cache-Control max-age and refreshed in the
+background once most of that has elapsed, so sign-ins never wait on the
+download except the very first time. Concurrent refreshes share one fetch.
+"""
+import asyncio
+import logging
+import re
+import time
+from typing import Optional
+from fastapi import HTTPException
+from jose import jwk
+from jose.exceptions import JWKError
+import httpx
+
+import http_client
+
+log = logging.getLogger("vegfuel.jwks")
+
+DEFAULT_MAX_AGE = 3600       # when the provider sends no max-age
+REFRESH_AT = 0.8             # fraction of max-age after which we refresh in the background
+MIN_FORCED_REFRESH = 60      # seconds between refreshes triggered by an unknown kid
+
+
+def _max_age(cache_control: str) -> int:
+    match = re.search(r"max-age=(\d+)", cache_control or "")
+    return int(match.group(1)) if match else DEFAULT_MAX_AGE
+
+
+class JWKSCache:
+    def __init__(self, url: str):
+        self.url = url
+        self._keys: Optional[dict] = None      # kid → constructed public key
+        self._fetched_at = 0.0
+        self._max_age = DEFAULT_MAX_AGE
+        self._inflight: Optional[asyncio.Task] = None
+
+    async def get_key(self, kid: str):
+        """Public key for `kid`, or None if the provider doesn't publish it."""
+        keys = await self._current()
+        if kid not in keys and time.monotonic() - self._fetched_at > MIN_FORCED_REFRESH:
+            # Providers rotate keys ahead of max-age; look again, but not on every bad token
+            keys = await self._refresh()
+        return keys.get(kid)
+
+    async def _current(self) -> dict:
+        age = time.monotonic() - self._fetched_at
+        if self._keys is None or age >= self._max_age:
+            return await self._refresh()
+        if age >= self._max_age * REFRESH_AT and self._inflight is None:
+            self._start_refresh()
+        return self._keys
+
+    def _start_refresh(self) -> asyncio.Task:
+        if self._inflight is None:
+            self._inflight = asyncio.create_task(self._fetch())
+            self._inflight.add_done_callback(self._refresh_done)
+        return self._inflight
+
+    def _refresh_done(self, task: asyncio.Task) -> None:
+        self._inflight = None
+        if not task.cancelled():
+            task.exception()   # mark retrieved; failures keep serving the old keys
+
+    async def _refresh(self) -> dict:
+        try:
+            return await asyncio.shield(self._start_refresh())
+        except (httpx.HTTPError, ValueError, KeyError):
+            if self._keys is not None:
+                return self._keys   # stale keys beat failing every sign-in
+            raise HTTPException(status_code=503, detail="Sign-in keys unavailable, try again shortly")
+
+    async def _fetch(self) -> dict:
+        resp = await http_client.request("GET", self.url)
+        resp.raise_for_status()
+        keys = {}
+        for k in resp.json()["keys"]:
+            try:
+                keys[k["kid"]] = jwk.construct(k, algorithm=k.get("alg", "RS256"))
+            except (JWKError, KeyError, TypeError, ValueError):
+                # One unusable key must not take down sign-in with the others
+                log.warning("skipping unusable key %r from %s", k.get("kid"), self.url)
+        self._keys = keys
+        self._max_age = _max_age(resp.headers.get("cache-control"))
+        self._fetched_at = time.monotonic()
+        return self._keys
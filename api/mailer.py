@@ -0,0 +1,39 @@
+"""
+Transactional email. Sending happens in the background job queue; the
+`resend` backend posts to Resend's HTTP API on the shared outbound client,
+the `console` backend just logs (local development and tests).
+"""
+import logging
+
+from config import get_settings
+import http_client, jobs
+
+log = logging.getLogger("vegfuel.mailer")
+
+RESEND_URL = "https://api.resend.com/emails"
+FROM_ADDRESS = "VegFuel <onboarding@resend.dev>"
+
+
+async def send_email(to: str, subject: str, html: str) -> None:
+    """Send one email; raises httpx.HTTPStatusError if Resend rejects it."""
+    settings = get_settings()
+    if settings.email_backend == "console":
+        log.info("email to=%s subject=%r\n%s", to, subject, html)
+        return
+    resp = await http_client.request(
+        "POST",
+        RESEND_URL,
+        headers={"Authorization": f"Bearer {settings.resend_api_key}"},
+        json={"from": FROM_ADDRESS, "to": to, "subject": subject, "html": html},
+    )
+    resp.raise_for_status()
+
+
+@jobs.handler("email")
+async def send_email_job(payload: dict) -> None:
+    await send_email(payload["to"], payload["subject"], payload["html"])
+
+
+def queue_email(db, to: str, subject: str, html: str) -> None:
+    """Queue an email in the caller's transaction; call jobs.notify() after commit."""
+    jobs.enqueue(db, "email", {"to": to, "subject": subject, "html": html})
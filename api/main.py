@@ -1,21 +1,62 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+import secrets
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import FileResponse, JSONResponse
 
 from config import get_settings
-from database import engine, Base
+import database, diagnostics, hashing, http_client, idempotency, jobs, metrics, usda
+from compression import CompressionMiddleware
 from routers.users_auth import router as auth_router
 from routers.users import router as users_router
 from routers.logs import router as logs_router
 from routers.mixtures import router as mixtures_router
 from routers.ingredients import router as ingredients_router
+from routers.sync import router as sync_router
+from routers.bootstrap import router as bootstrap_router
+from routers.transfer import router as transfer_router
+from routers.foods import router as foods_router
 
 settings = get_settings()
+log = logging.getLogger("vegfuel")
+
+WARM_CONNECTIONS = 2       # pooled connections opened in the background at startup
+READY_TIMEOUT    = 2.0     # seconds /ready waits on the database
+
+
+# ── Lifespan: app-scoped clients and pools ─────────────────────────────────────
+async def _warm() -> None:
+    """Startup work that requests don't need to wait for."""
+    try:
+        await database.warm_pool(WARM_CONNECTIONS)
+    except Exception:
+        log.exception("could not warm the database pool")
+    await usda.warm_index()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.app_env == "development":
+        # Convenience for local runs; everywhere else the schema is Alembic's job
+        await database.create_all()
+    await http_client.start()
+    await jobs.start()
+    await idempotency.start()
+    warm = asyncio.create_task(_warm())
+    yield
+    warm.cancel()
+    await idempotency.stop()
+    await jobs.stop()
+    await http_client.close()
+    hashing.shutdown()
+    if settings.db_mode == "async":
+        await database.get_async_engine().dispose()
 
-# ── Create tables (use Alembic in production) ──────────────────────────────────
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
+    lifespan=lifespan,
     title="VegFuel API",
     description="Plant-powered nutrition tracker for athletes",
     version="1.0.0",
@@ -23,6 +64,12 @@ app = FastAPI(
     redoc_url="/redoc" if settings.app_env == "development" else None,
 )
 
+# ── Idempotency-Key replay (innermost: stores uncompressed responses) ─────────
+app.add_middleware(idempotency.IdempotencyMiddleware)
+
+# ── Compression (br/gzip, negotiated) ──────────────────────────────────────────
+app.add_middleware(CompressionMiddleware, minimum_size=settings.compress_min_bytes)
+
 # ── CORS ───────────────────────────────────────────────────────────────────────
 app.add_middleware(
     CORSMiddleware,
@@ -32,20 +79,71 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ── Slow-query log and sampled profiling ───────────────────────────────────────
+diagnostics.install()
+app.add_middleware(diagnostics.DiagnosticsMiddleware)
+
+# ── Metrics (outermost, so latency covers compression and CORS) ───────────────
+if settings.metrics_enabled:
+    metrics.install()
+    app.add_middleware(metrics.MetricsMiddleware)
+
 # ── Routers ────────────────────────────────────────────────────────────────────
 app.include_router(auth_router)
-app.include_router(users_router)
-app.include_router(logs_router)
-app.include_router(mixtures_router)
-app.include_router(ingredients_router)
+if settings.db_mode == "async":
+    from routers import aio
+    for router in aio.routers:
+        app.include_router(router)
+else:
+    app.include_router(users_router)
+    app.include_router(logs_router)
+    app.include_router(mixtures_router)
+    app.include_router(ingredients_router)
+    app.include_router(sync_router)
+    app.include_router(bootstrap_router)
+    app.include_router(transfer_router)
+    app.include_router(foods_router)
 
 
-# ── Health check ───────────────────────────────────────────────────────────────
+# ── Health checks ──────────────────────────────────────────────────────────────
 @app.get("/health", tags=["meta"])
 def health():
+    """Liveness: the process is up. Never touches the database."""
     return {"status": "ok", "env": settings.app_env}
 
 
+@app.get("/ready", tags=["meta"])
+async def ready():
+    """Readiness: the database answers, so requests can be routed here."""
+    try:
+        await asyncio.wait_for(database.ping(), timeout=READY_TIMEOUT)
+    except Exception:
+        return JSONResponse(status_code=503, content={"status": "unavailable"})
+    return {"status": "ready"}
+
+
+if settings.metrics_enabled:
+    @app.get("/metrics", tags=["meta"], include_in_schema=False)
+    async def prometheus_metrics(request: Request):
+        """Prometheus scrape endpoint; needs `Bearer METRICS_TOKEN` when that is set."""
+        if settings.metrics_token and not secrets.compare_digest(
+            request.headers.get("authorization", ""), f"Bearer {settings.metrics_token}",
+        ):
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+        return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/debug/profiles/{profile_id}", tags=["meta"], include_in_schema=False)
+def get_profile(profile_id: str, request: Request):
+    """A folded-stack profile named by a response's X-Profile-Id; needs X-Admin-Token."""
+    if not diagnostics.authorized(request.headers):
+        raise HTTPException(status_code=403, detail="Admin token required")
+    path = diagnostics.profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain")
+
+
 # ── Global error handler ───────────────────────────────────────────────────────
 @app.exception_handler(Exception)
 async def generic_exception_handler(request, exc):
@@ -0,0 +1,253 @@
+"""
+Prometheus metrics for the API, served at GET /metrics.
+
+- per-route request latency, and per-request SQL statement counts and time,
+  so an N+1 pattern shows up as a route whose statements-per-request climbs
+  with the size of the payload
+- every SQL statement's duration, via SQLAlchemy cursor events
+- connection pool gauges and time spent checking a connection out
+- Starlette threadpool (sync handlers) capacity, busy and waiting
+- password hash pool workers, in flight and waiting, and hashes by outcome
+- background job runs by outcome
+- outbound HTTP latency per host, via http_client.latency_hooks
+
+Routes are labelled by their template (`/logs/{log_date}`), never the raw
+path, so label cardinality stays bounded.
+"""
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+import anyio.to_thread
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import Engine, event
+from sqlalchemy.pool import QueuePool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+import database, hashing, http_client, jobs
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+REQUEST_SECONDS = Histogram(
+    "vegfuel_http_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of its response.",
+    ["method", "route", "status"],
+)
+REQUEST_STATEMENTS = Histogram(
+    "vegfuel_http_request_db_statements",
+    "SQL statements executed while serving one request.",
+    ["route"],
+    buckets=STATEMENT_BUCKETS,
+)
+REQUEST_DB_SECONDS = Histogram(
+    "vegfuel_http_request_db_seconds",
+    "Time spent executing SQL while serving one request.",
+    ["route"],
+)
+STATEMENT_SECONDS = Histogram(
+    "vegfuel_db_statement_duration_seconds",
+    "Duration of each SQL statement.",
+)
+STATEMENT_ERRORS = Counter(
+    "vegfuel_db_statement_errors_total",
+    "SQL statements that raised.",
+)
+CHECKOUT_SECONDS = Histogram(
+    "vegfuel_db_pool_checkout_seconds",
+    "Time to get a connection from the pool, including waiting for a free one and pre-ping.",
+    ["driver"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+OUTBOUND_SECONDS = Histogram(
+    "vegfuel_outbound_request_duration_seconds",
+    "Outbound HTTP request latency per attempt.",
+    ["host", "outcome"],
+)
+
+
+# ── Per-request accounting ────────────────────────────────────────────────────
+
+class _Usage:
+    __slots__ = ("statements", "db_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+
+
+# Set by the middleware for the duration of a request. Threadpool calls copy
+# the context, so sync handlers and streaming bodies add to the same object.
+_usage: ContextVar[Optional[_Usage]] = ContextVar("request_usage", default=None)
+
+
+def route_label(scope: Scope) -> str:
+    """The matched route template, once routing has run."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """Records latency and SQL usage per request; outermost, so it sees the whole response."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        usage = _Usage()
+        token = _usage.set(usage)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _usage.reset(token)
+            route = route_label(scope)
+            REQUEST_SECONDS.labels(scope["method"], route, str(status)).observe(time.perf_counter() - start)
+            REQUEST_STATEMENTS.labels(route).observe(usage.statements)
+            REQUEST_DB_SECONDS.labels(route).observe(usage.db_seconds)
+
+
+# ── SQLAlchemy ────────────────────────────────────────────────────────────────
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    _finish(conn)
+
+
+def _on_error(exception_context):
+    if exception_context.connection is not None and exception_context.connection.info.get("query_start"):
+        _finish(exception_context.connection)
+        STATEMENT_ERRORS.inc()
+
+
+def _finish(conn) -> None:
+    seconds = time.perf_counter() - conn.info["query_start"].pop()
+    STATEMENT_SECONDS.observe(seconds)
+    usage = _usage.get()
+    if usage is not None:
+        usage.statements += 1
+        usage.db_seconds += seconds
+
+
+_engines: list[Engine] = []
+
+
+def _instrument_engine(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_execute)
+    event.listen(engine, "after_cursor_execute", _after_execute)
+    event.listen(engine, "handle_error", _on_error)
+
+    # Pool events don't say how long a checkout waited, so time the call itself
+    pool, driver = engine.pool, engine.dialect.driver
+    connect = pool.connect
+    observe = CHECKOUT_SECONDS.labels(driver).observe
+
+    def timed_connect():
+        start = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            observe(time.perf_counter() - start)
+
+    pool.connect = timed_connect
+    _engines.append(engine)
+
+
+# ── Gauges read at scrape time ────────────────────────────────────────────────
+
+class _RuntimeCollector:
+    def collect(self):
+        size = GaugeMetricFamily("vegfuel_db_pool_size", "Configured pool size.", labels=["driver"])
+        out = GaugeMetricFamily("vegfuel_db_pool_checked_out", "Connections currently in use.", labels=["driver"])
+        idle = GaugeMetricFamily("vegfuel_db_pool_checked_in", "Idle pooled connections.", labels=["driver"])
+        overflow = GaugeMetricFamily(
+            "vegfuel_db_pool_overflow", "Connections beyond pool_size (negative: unopened slots).", labels=["driver"],
+        )
+        for engine in _engines:
+            pool = engine.pool
+            if isinstance(pool, QueuePool):
+                driver = engine.dialect.driver
+                size.add_metric([driver], pool.size())
+                out.add_metric([driver], pool.checkedout())
+                idle.add_metric([driver], pool.checkedin())
+                overflow.add_metric([driver], pool.overflow())
+        yield from (size, out, idle, overflow)
+
+        pool = hashing.stats()
+        yield GaugeMetricFamily("vegfuel_password_hash_workers", "Password hash worker processes.",
+                                value=pool["workers"])
+        yield GaugeMetricFamily("vegfuel_password_hash_in_flight", "Password hashes running.",
+                                value=pool["in_flight"])
+        yield GaugeMetricFamily("vegfuel_password_hash_waiting", "Password hashes queued for a worker.",
+                                value=pool["waiting"])
+        hashes = CounterMetricFamily(
+            "vegfuel_password_hashes", "Password hashes by outcome (rejected: shed with 503).", labels=["outcome"],
+        )
+        for outcome in ("completed", "failed", "rejected"):
+            hashes.add_metric([outcome], pool[outcome])
+        yield hashes
+
+        runs = CounterMetricFamily(
+            "vegfuel_jobs", "Background job runs by outcome (failed: will be retried; dead: gave up).",
+            labels=["outcome"],
+        )
+        job_stats = jobs.stats()
+        for outcome in ("succeeded", "failed", "dead"):
+            runs.add_metric([outcome], job_stats[outcome])
+        yield runs
+
+        # Only readable from the event loop; /metrics is async, so it is
+        try:
+            stats = anyio.to_thread.current_default_thread_limiter().statistics()
+        except RuntimeError:
+            return
+        yield GaugeMetricFamily("vegfuel_threadpool_capacity", "Threadpool slots for sync handlers.",
+                                value=stats.total_tokens)
+        yield GaugeMetricFamily("vegfuel_threadpool_busy", "Threadpool slots in use.",
+                                value=stats.borrowed_tokens)
+        yield GaugeMetricFamily("vegfuel_threadpool_waiting", "Calls queued for a free threadpool slot.",
+                                value=stats.tasks_waiting)
+
+
+# ── Outbound HTTP ─────────────────────────────────────────────────────────────
+
+def _outbound(host: str, seconds: float, status: Optional[int]) -> None:
+    outcome = "error" if status is None else f"{status // 100}xx"
+    OUTBOUND_SECONDS.labels(host, outcome).observe(seconds)
+
+
+# ── Setup ─────────────────────────────────────────────────────────────────────
+
+_installed = False
+
+
+def install() -> None:
+    """Hook into the engines and the HTTP client; call before the first engine is created."""
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    database.engine_hooks.append(_instrument_engine)
+    http_client.latency_hooks.append(_outbound)
+    REGISTRY.register(_RuntimeCollector())
+
+
+def render() -> bytes:
+    return generate_latest(REGISTRY)
@@ -0,0 +1,95 @@
+"""baseline: schema as created by Base.metadata.create_all before migrations
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16
+
+Databases that were created by create_all should be stamped at this
+revision (`alembic stamp 0001`) rather than upgraded through it.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("email", sa.String(), nullable=True),
+        sa.Column("display_name", sa.String(), nullable=True),
+        sa.Column("password_hash", sa.String(), nullable=True),
+        sa.Column("provider", sa.String(), nullable=True),
+        sa.Column("provider_id", sa.String(), nullable=True),
+        sa.Column("body_weight", sa.Float(), nullable=True),
+        sa.Column("weight_unit", sa.String(), nullable=True),
+        sa.Column("goal_cal", sa.Integer(), nullable=True),
+        sa.Column("goal_protein", sa.Float(), nullable=True),
+        sa.Column("goal_carbs", sa.Float(), nullable=True),
+        sa.Column("goal_fat", sa.Float(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "food_logs",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("user_id", sa.String(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("log_date", sa.Date(), nullable=False),
+        sa.Column("ingredient_name", sa.String(), nullable=False),
+        sa.Column("amount", sa.Float(), nullable=False),
+        sa.Column("display_amount", sa.Float(), nullable=False),
+        sa.Column("unit", sa.String(), nullable=False),
+        sa.Column("position", sa.Integer(), nullable=True),
+        sa.Column("synced_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint("id", "user_id", name="uq_log_user"),
+    )
+    op.create_index("ix_food_logs_user_id", "food_logs", ["user_id"])
+    op.create_index("ix_food_logs_log_date", "food_logs", ["log_date"])
+
+    op.create_table(
+        "mixtures",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("user_id", sa.String(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("yield_g", sa.Float(), nullable=False),
+        sa.Column("yield_unit", sa.String(), nullable=True),
+        sa.Column("per100g", sa.JSON(), nullable=False),
+        sa.Column("ingredients", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.UniqueConstraint("user_id", "name", name="uq_mixture_user_name"),
+    )
+    op.create_index("ix_mixtures_user_id", "mixtures", ["user_id"])
+
+    op.create_table(
+        "custom_ingredients",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("user_id", sa.String(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("nutrition", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.UniqueConstraint("user_id", "name", name="uq_ingredient_user_name"),
+    )
+    op.create_index("ix_custom_ingredients_user_id", "custom_ingredients", ["user_id"])
+
+    op.create_table(
+        "password_reset_tokens",
+        sa.Column("token", sa.String(), primary_key=True),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("used", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_password_reset_tokens_email", "password_reset_tokens", ["email"])
+
+
+def downgrade():
+    for table in ("password_reset_tokens", "custom_ingredients", "mixtures", "food_logs", "users"):
+        op.drop_table(table)
@@ -0,0 +1,60 @@
+"""composite indexes for the hot read paths
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16
+
+- food_logs (user_id, log_date, position) INCLUDE (ingredient_name, amount):
+  day reads, range pages and rollup refreshes become index(-only) scans that
+  already come back in display order. Replaces the single-column user_id and
+  log_date indexes, which it makes redundant.
+- mixtures (user_id, created_at): the list endpoint's filter + sort.
+- users (provider, provider_id): social sign-in lookup.
+- The single-column user_id index on custom_ingredients is dropped; the
+  (user_id, name) unique constraint already leads with user_id.
+
+On Postgres the indexes are built CONCURRENTLY so the upgrade does not block
+writes; that needs to run outside a transaction, hence autocommit_block.
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def _concurrently() -> dict:
+    return {"postgresql_concurrently": True} if op.get_bind().dialect.name == "postgresql" else {}
+
+
+def upgrade():
+    kw = _concurrently()
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_food_logs_user_date_pos", "food_logs", ["user_id", "log_date", "position"],
+            postgresql_include=["ingredient_name", "amount"], if_not_exists=True, **kw,
+        )
+        op.create_index("ix_mixtures_user_created", "mixtures", ["user_id", "created_at"],
+                        if_not_exists=True, **kw)
+        op.create_index("ix_users_provider", "users", ["provider", "provider_id"],
+                        if_not_exists=True, **kw)
+
+        op.drop_index("ix_food_logs_user_id", table_name="food_logs", if_exists=True, **kw)
+        op.drop_index("ix_food_logs_log_date", table_name="food_logs", if_exists=True, **kw)
+        op.drop_index("ix_mixtures_user_id", table_name="mixtures", if_exists=True, **kw)
+        op.drop_index("ix_custom_ingredients_user_id", table_name="custom_ingredients", if_exists=True, **kw)
+
+
+def downgrade():
+    kw = _concurrently()
+    with op.get_context().autocommit_block():
+        op.create_index("ix_food_logs_user_id", "food_logs", ["user_id"], if_not_exists=True, **kw)
+        op.create_index("ix_food_logs_log_date", "food_logs", ["log_date"], if_not_exists=True, **kw)
+        op.create_index("ix_mixtures_user_id", "mixtures", ["user_id"], if_not_exists=True, **kw)
+        op.create_index("ix_custom_ingredients_user_id", "custom_ingredients", ["user_id"],
+                        if_not_exists=True, **kw)
+
+        op.drop_index("ix_users_provider", table_name="users", if_exists=True, **kw)
+        op.drop_index("ix_mixtures_user_created", table_name="mixtures", if_exists=True, **kw)
+        op.drop_index("ix_food_logs_user_date_pos", table_name="food_logs", if_exists=True, **kw)
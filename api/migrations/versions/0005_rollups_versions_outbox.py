@@ -0,0 +1,66 @@
+"""daily rollups, collection versions and the job outbox
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-16
+
+Tables the app gained after the baseline:
+- daily_summaries: per-day nutrition rollups, whose `version` is the day's
+  change counter for delta sync.
+- collection_versions: per-user change counters behind the ETags.
+- outbox_jobs: background jobs (e.g. password-reset email).
+
+Fill in rollups for days logged before this revision with
+`python -m scripts.backfill_summaries`.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "daily_summaries",
+        sa.Column("user_id", sa.String(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("log_date", sa.Date(), primary_key=True),
+        sa.Column("entry_count", sa.Integer(), nullable=False),
+        sa.Column("cal", sa.Float(), nullable=False),
+        sa.Column("protein", sa.Float(), nullable=False),
+        sa.Column("carbs", sa.Float(), nullable=False),
+        sa.Column("fat", sa.Float(), nullable=False),
+        sa.Column("fiber", sa.Float(), nullable=False),
+        sa.Column("micros", sa.JSON(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+    op.create_table(
+        "collection_versions",
+        sa.Column("user_id", sa.String(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("collection", sa.String(), primary_key=True),
+        sa.Column("version", sa.Integer(), nullable=False),
+    )
+
+    op.create_table(
+        "outbox_jobs",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("max_attempts", sa.Integer(), nullable=False),
+        sa.Column("run_after", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_outbox_jobs_due", "outbox_jobs", ["status", "run_after"])
+
+
+def downgrade():
+    op.drop_index("ix_outbox_jobs_due", table_name="outbox_jobs")
+    for table in ("outbox_jobs", "collection_versions", "daily_summaries"):
+        op.drop_table(table)
@@ -1,6 +1,6 @@
 from sqlalchemy import (
     Column, String, Float, Integer, Boolean,
-    DateTime, Date, ForeignKey, JSON, Text, UniqueConstraint
+    DateTime, Date, ForeignKey, JSON, Text, LargeBinary, UniqueConstraint, Index
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -33,6 +33,12 @@ class User(Base):
     logs        = relationship("FoodLog",         back_populates="user", cascade="all, delete-orphan")
     mixtures    = relationship("Mixture",         back_populates="user", cascade="all, delete-orphan")
     ingredients = relationship("CustomIngredient",back_populates="user", cascade="all, delete-orphan")
+    summaries   = relationship("DailySummary",    back_populates="user", cascade="all, delete-orphan")
+    versions    = relationship("CollectionVersion", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        Index("ix_users_provider", "provider", "provider_id"),   # social login lookup
+    )
 
 
 class FoodLog(Base):
@@ -40,8 +46,8 @@ class FoodLog(Base):
     __tablename__ = "food_logs"
 
     id             = Column(String, primary_key=True, default=gen_uuid)
-    user_id        = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
-    log_date       = Column(Date, nullable=False, index=True)
+    user_id        = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    log_date       = Column(Date, nullable=False)
     ingredient_name= Column(String, nullable=False)
     amount         = Column(Float, nullable=False)          # always in grams
     display_amount = Column(Float, nullable=False)
@@ -53,14 +59,50 @@ class FoodLog(Base):
 
     __table_args__ = (
         UniqueConstraint("id", "user_id", name="uq_log_user"),
+        # Every log query filters on (user_id, log_date) and orders by position;
+        # INCLUDE lets rollup refreshes read name/amount from the index alone
+        Index("ix_food_logs_user_date_pos", "user_id", "log_date", "position",
+              postgresql_include=["ingredient_name", "amount"]),
     )
 
 
+class DailySummary(Base):
+    """
+    Per-user, per-day nutrition rollup, maintained by the log endpoints.
+    Doubles as the day's version counter for delta sync, so a cleared day
+    keeps its row (with zero totals) rather than losing its version.
+    """
+    __tablename__ = "daily_summaries"
+
+    user_id     = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    log_date    = Column(Date, primary_key=True)
+    entry_count = Column(Integer, nullable=False, default=0)
+    cal         = Column(Float, nullable=False, default=0)
+    protein     = Column(Float, nullable=False, default=0)
+    carbs       = Column(Float, nullable=False, default=0)
+    fat         = Column(Float, nullable=False, default=0)
+    fiber       = Column(Float, nullable=False, default=0)
+    micros      = Column(JSON, nullable=False)         # {iron, calcium, potassium, ...}
+    version     = Column(Integer, nullable=False, default=1)   # bumped on every write to the day
+    updated_at  = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    user = relationship("User", back_populates="summaries")
+
+
+class CollectionVersion(Base):
+    """Per-user change counter for a collection (mixtures, ingredients); backs ETags."""
+    __tablename__ = "collection_versions"
+
+    user_id    = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    collection = Column(String, primary_key=True)
+    version    = Column(Integer, nullable=False, default=1)
+
+
 class Mixture(Base):
     __tablename__ = "mixtures"
 
     id          = Column(String, primary_key=True, default=gen_uuid)
-    user_id     = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id     = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     name        = Column(String, nullable=False)
     yield_g     = Column(Float, nullable=False)
     yield_unit  = Column(String, default="g")
@@ -73,6 +115,7 @@ class Mixture(Base):
 
     __table_args__ = (
         UniqueConstraint("user_id", "name", name="uq_mixture_user_name"),
+        Index("ix_mixtures_user_created", "user_id", "created_at"),
     )
 
 
@@ -80,7 +123,7 @@ class CustomIngredient(Base):
     __tablename__ = "custom_ingredients"
 
     id          = Column(String, primary_key=True, default=gen_uuid)
-    user_id     = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id     = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     name        = Column(String, nullable=False)
     nutrition   = Column(JSON, nullable=False)         # per-100g nutrition object
     created_at  = Column(DateTime(timezone=True), server_default=func.now())
@@ -101,3 +144,49 @@ class PasswordResetToken(Base):
     expires_at = Column(DateTime(timezone=True), nullable=False)
     used       = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class OutboxJob(Base):
+    """A side effect (e.g. an email) committed with the request, run later by jobs.py."""
+    __tablename__ = "outbox_jobs"
+
+    id           = Column(String, primary_key=True, default=gen_uuid)
+    kind         = Column(String, nullable=False)
+    payload      = Column(JSON, nullable=False)
+    status       = Column(String, nullable=False, default="pending")  # pending | running | dead
+    attempts     = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=6)
+    run_after    = Column(DateTime(timezone=True), nullable=False, server_default=func.now())  # also the running lease
+    last_error   = Column(Text, nullable=True)
+    created_at   = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_outbox_jobs_due", "status", "run_after"),
+    )
+
+
+class UsdaSearchCache(Base):
+    """Shared cache of USDA FoodData Central searches, nutrients pre-extracted (see usda.py)."""
+    __tablename__ = "usda_search_cache"
+
+    query      = Column(String, primary_key=True)      # normalized search text
+    results    = Column(JSON, nullable=False)          # [{fdc_id, name, nutrition}]
+    fetched_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class IdempotencyKey(Base):
+    """The response to a write sent with an Idempotency-Key, replayed on retries (see idempotency.py)."""
+    __tablename__ = "idempotency_keys"
+
+    user_id     = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    key         = Column(String, primary_key=True)
+    status      = Column(String, nullable=False, default="in_progress")   # in_progress | done
+    fingerprint = Column(String, nullable=True)        # sha256 of method, path, query and body
+    status_code = Column(Integer, nullable=True)
+    headers     = Column(JSON, nullable=True)          # [[name, value], ...]
+    body        = Column(LargeBinary, nullable=True)
+    expires_at  = Column(DateTime(timezone=True), nullable=False)   # lease while in progress, then the TTL
+
+    __table_args__ = (
+        Index("ix_idempotency_keys_expires", "expires_at"),
+    )
@@ -0,0 +1,185 @@
+"""
+Server-side nutrition math over FoodLog entries.
+
+Names resolve the same way the client's `DB` lookup does: the user's
+mixtures and custom ingredients shadow the built-in food table.
+
+Totals are computed with NumPy: each distinct food name is resolved once
+to a row of a small (foods x nutrients) matrix, and the entries are then
+summed per day as whole-array operations instead of per entry in dicts.
+"""
+from datetime import date
+from typing import Hashable, Iterable, Optional, Sequence
+import numpy as np
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from database import dialect_insert
+from food_table import FOODS, NUTRIENT_KEYS, MACRO_KEYS, MICRO_KEYS
+import models
+
+
+# ── Resolution ────────────────────────────────────────────────────────────────
+
+def load_user_foods(db: Session, user_id: str, names: Iterable[str]) -> dict[str, dict]:
+    """Per-100 g nutrition for the user's own foods among `names`."""
+    names = set(names)
+    if not names:
+        return {}
+    foods = dict(
+        db.query(models.CustomIngredient.name, models.CustomIngredient.nutrition)
+        .filter(
+            models.CustomIngredient.user_id == user_id,
+            models.CustomIngredient.name.in_(names),
+        )
+        .all()
+    )
+    foods.update(
+        db.query(models.Mixture.name, models.Mixture.per100g)
+        .filter(models.Mixture.user_id == user_id, models.Mixture.name.in_(names))
+        .all()
+    )
+    return foods
+
+
+# ── Nutrient matrix ───────────────────────────────────────────────────────────
+
+def _vector(food: dict) -> list[float]:
+    row = []
+    for key in NUTRIENT_KEYS:
+        try:
+            row.append(float(food.get(key) or 0))
+        except (TypeError, ValueError):
+            row.append(0.0)     # client-entered nutrition can hold junk
+    return row
+
+
+# Built-in foods, per 100 g (or per unit), in NUTRIENT_KEYS column order
+_BUILTIN = np.array([_vector(food) for food in FOODS.values()], dtype=np.float64)
+_BUILTIN_PER_UNIT = np.array([bool(food.get("_perUnit")) for food in FOODS.values()])
+_BUILTIN_INDEX = {name: i for i, name in enumerate(FOODS)}
+
+
+def _food_rows(names: Sequence[str], user_foods: dict[str, dict]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Nutrient rows and per-unit flags for `names`: the user's food, else the
+    built-in food by exact then lowercased name, else a zero row.
+    """
+    rows = np.zeros((len(names), len(NUTRIENT_KEYS)))
+    per_unit = np.zeros(len(names), dtype=bool)
+    for i, name in enumerate(names):
+        if food := user_foods.get(name):
+            rows[i] = _vector(food)
+            per_unit[i] = bool(food.get("_perUnit"))
+            continue
+        j = _BUILTIN_INDEX.get(name)
+        if j is None:
+            j = _BUILTIN_INDEX.get(name.lower())
+        if j is not None:
+            rows[i] = _BUILTIN[j]
+            per_unit[i] = _BUILTIN_PER_UNIT[j]
+    return rows, per_unit
+
+
+# ── Totals ────────────────────────────────────────────────────────────────────
+
+def grouped_totals(
+    entries: Sequence[tuple[Hashable, str, float]],
+    user_foods: dict[str, dict],
+) -> dict[Hashable, dict]:
+    """
+    Sum nutrients over (group, ingredient_name, amount) triples, e.g. with
+    the log date as the group, in one pass. Unknown names count as zero.
+    """
+    groups: dict[Hashable, int] = {}
+    names: dict[str, int] = {}
+    group_idx = np.fromiter((groups.setdefault(g, len(groups)) for g, _, _ in entries), np.intp, len(entries))
+    name_idx = np.fromiter((names.setdefault(n, len(names)) for _, n, _ in entries), np.intp, len(entries))
+    amounts = np.fromiter((a for _, _, a in entries), np.float64, len(entries))
+
+    rows, per_unit = _food_rows(list(names), user_foods)
+    mult = np.where(per_unit[name_idx], amounts, amounts / 100)
+    contrib = rows[name_idx] * mult[:, None]            # entries x nutrients
+
+    sums = np.zeros((len(groups), len(NUTRIENT_KEYS)))
+    np.add.at(sums, group_idx, contrib)
+    return {g: dict(zip(NUTRIENT_KEYS, sums[i].tolist())) for g, i in groups.items()}
+
+
+def day_totals(entries: Iterable[tuple[str, float]], user_foods: dict[str, dict]) -> dict:
+    """Sum nutrients over (ingredient_name, amount) pairs. Unknown names count as zero."""
+    totals = grouped_totals([(None, name, amount) for name, amount in entries], user_foods)
+    return totals.get(None) or dict.fromkeys(NUTRIENT_KEYS, 0.0)
+
+
+# ── Daily rollups ─────────────────────────────────────────────────────────────
+
+def refresh_daily_summary(
+    db: Session,
+    user_id: str,
+    log_date: date,
+    entries: Optional[list[tuple[str, float]]] = None,
+) -> int:
+    """
+    Rewrite one day's rollup inside the caller's transaction and bump the
+    day's version; returns the new version.
+    Pass `entries` when the day's (name, amount) pairs are already in hand;
+    otherwise they are read back with one narrow query.
+
+    Rollups reflect mixture/ingredient nutrition as of the last write to
+    that day; editing a mixture later does not rewrite past days.
+    """
+    if entries is None:
+        entries = (
+            db.query(models.FoodLog.ingredient_name, models.FoodLog.amount)
+            .filter(models.FoodLog.user_id == user_id, models.FoodLog.log_date == log_date)
+            .all()
+        )
+
+    totals = day_totals(entries, load_user_foods(db, user_id, (n for n, _ in entries)))
+    values = {key: totals[key] for key in MACRO_KEYS}
+    values["micros"] = {key: totals[key] for key in MICRO_KEYS}
+    values["entry_count"] = len(entries)
+
+    insert = dialect_insert(db)
+    stmt = insert(models.DailySummary).values(user_id=user_id, log_date=log_date, version=1, **values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "log_date"],
+        set_={
+            **values,
+            "version": models.DailySummary.version + 1,
+            "updated_at": func.now(),
+        },
+    ).returning(models.DailySummary.version)
+    return db.execute(stmt).scalar_one()
+
+
+def lock_daily_summary(db: Session, user_id: str, log_date: date) -> models.DailySummary:
+    """
+    The day's rollup row, locked for the rest of the transaction. A day
+    without one gets an empty row at version 0 first, so that concurrent
+    writers to a new day still queue on the same lock.
+    """
+    insert = dialect_insert(db)
+    db.execute(
+        insert(models.DailySummary).values(
+            user_id=user_id, log_date=log_date, version=0, entry_count=0,
+            **dict.fromkeys(MACRO_KEYS, 0.0), micros={},
+        ).on_conflict_do_nothing(index_elements=["user_id", "log_date"])
+    )
+    return db.query(models.DailySummary).filter(
+        models.DailySummary.user_id == user_id,
+        models.DailySummary.log_date == log_date,
+    ).with_for_update().populate_existing().one()
+
+
+def clear_daily_summary(db: Session, user_id: str, log_date: date) -> int:
+    return refresh_daily_summary(db, user_id, log_date, entries=[])
+
+
+def day_version(db: Session, user_id: str, log_date: date) -> int:
+    """Current version of a day's log; 0 if it has never been written."""
+    return db.query(models.DailySummary.version).filter(
+        models.DailySummary.user_id == user_id,
+        models.DailySummary.log_date == log_date,
+    ).scalar() or 0
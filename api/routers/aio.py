@@ -0,0 +1,313 @@
+"""
+Async-mode (DB_MODE=async) versions of the data routers.
+
+Each endpoint is `async def` on an AsyncSession and runs the sync handler's
+body through `AsyncSession.run_sync`: the ORM code is shared with the sync
+routers, but its IO goes over asyncpg on the event loop instead of holding
+one of Starlette's threadpool slots for the whole request.
+"""
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_async_db
+from auth import get_current_profile_async, get_current_user_id_async
+from routers import logs, mixtures, ingredients, users, sync, bootstrap, transfer, foods
+import models, schemas, usda
+
+
+async def _run(db: AsyncSession, handler, **kwargs):
+    return await db.run_sync(lambda session: handler(db=session, **kwargs))
+
+
+# ── Logs ──────────────────────────────────────────────────────────────────────
+
+logs_router = APIRouter(prefix="/logs", tags=["logs"])
+
+
+@logs_router.get("", response_model=schemas.LogRange)
+async def get_log_range(
+    from_date: date = Query(..., alias="from"),
+    to_date: date = Query(..., alias="to"),
+    cursor: Optional[date] = None,
+    limit: int = Query(31, ge=1, le=logs.MAX_RANGE_PAGE_DAYS),
+    totals: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: str = Depends(get_current_user_id_async),
+):
+    return await _run(db, logs.get_log_range, from_date=from_date, to_date=to_date,
+                      cursor=cursor, limit=limit, totals=totals, user_id=user_id)
+
+
+@logs_router.get("/summary", response_model=list[schemas.DaySummary])
+async def get_summary(
+    from_date: date = Query(..., alias="from"),
+    to_date: date = Query(..., alias="to"),
+    db: AsyncSession = Depends(get_async_db),
+    user_id: str = Depends(get_current_user_id_async),
+):
+    return await _run(db, logs.get_summary, from_date=from_date, to_date=to_date, user_id=user_id)
+
+
+@logs_router.get("/{log_date}", response_model=schemas.LogDay)
+async def get_log(
+    log_date: date,
+    request: Request,
+    response: Response,
+    totals: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: str = Depends(get_current_user_id_async),
+):
+    return await _run(db, logs.get_log, log_date=log_date, request=request,
+                      response=response, totals=totals, user_id=user_id)
+
+
+@logs_router.post("/sync", response_model=schemas.LogDay)
+async def sync_log(
+    body: schemas.BulkSyncRequest,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: str = Depends(get_current_user_id_async),
+):
+    return await _run(db, logs.sync_log, body=body, user_id=user_id)
+
+
+@logs_router.post("/sync/delta", response_model=schemas.DeltaSyncResult)
+async def sync_log_delta(
+    body: schemas.DeltaSyncRequest,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: str = Depends(get_current_user_id_async),
+):
+    return await _run(db, logs.sync_log_delta, body=body, user_id=user_id)
+
+
+@logs_router.delete("/{log_date}/{entry_id}", status_code=204)
+async def delete_entry(
+    log_date: date,
+    entry_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: str = Depends(get_current_user_id_async),
+):
+    await _run(db, logs.delete_entry, log_date=log_date, entry_id=entry_id, user_id=user_id)
+
+
+@logs_router.delete("/{log_date}", status_code=204)
+async def clear_day(
+    log_date: date,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: str = Depends(get_current_user_id_async),
+):
+    await _run(db, logs.clear_day, log_date=log_date, user_id=user_id)
+
+
+# ── Mixtures ──────────────────────────────────────────────────────────────────
+
+mixtures_router = APIRouter(prefix="/mixtures", tags=["mixtures"])
+
+
+@mixtures_router.get("/", response_model=list[schemas.MixtureOut])
+async def list_mixtures(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: str = Depends(get_current_user_id_async),
+):
+    return await _run(db, mixtures.list_mixtures, request=request, response=response, user_id=user_id)
+
+
+@mixtures_router.post("/", response_model=schemas.MixtureOut, status_code=201)
+async def create_mixture(
+    body: schemas.MixtureIn,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: str = Depends(get_current_user_id_async),
+):
+    return await _run(db, mixtures.create_mixture, body=body, user_id=user_id)
+
+
+@mixtures_router.post("/bulk", response_model=list[schemas.MixtureOut])
+async def bulk_upsert_mixtures(
+    body: list[schemas.MixtureIn],
+    db: AsyncSession = Depends(get_async_db),
+    user_id: str = Depends(get_current_user_id_async),
+):
+    return await _run(db, mixtures.bulk_upsert_mixtures, body=body, user_id=user_id)
+
+
+@mixtures_router.put("/{mixture_id}", response_model=schemas.MixtureOut)
+async def update_mixture(
+    mixture_id: str,
+    body: schemas.MixtureIn,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: str = Depends(get_current_user_id_async),
+):
+    return await _run(db, mixtures.update_mixture, mixture_id=mixture_id, body=body, user_id=user_id)
+
+
+@mixtures_router.delete("/{mixture_id}", status_code=204)
+async def delete_mixture(
+    mixture_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: str = Depends(get_current_user_id_async),
+):
+    await _run(db, mixtures.delete_mixture, mixture_id=mixture_id, user_id=user_id)
+
+
+# ── Custom ingredients ────────────────────────────────────────────────────────
+
+ingredients_router = APIRouter(prefix="/ingredients", tags=["ingredients"])
+
+
+@ingredients_router.get("/", response_model=list[schemas.CustomIngredientOut])
+async def list_ingredients(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: str = Depends(get_current_user_id_async),
+):
+    return await _run(db, ingredients.list_ingredients, request=request, response=response, user_id=user_id)
+
+
+@ingredients_router.post("/", response_model=schemas.CustomIngredientOut, status_code=201)
+async def create_ingredient(
+    body: schemas.CustomIngredientIn,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: str = Depends(get_current_user_id_async),
+):
+    return await _run(db, ingredients.create_ingredient, body=body, user_id=user_id)
+
+
+@ingredients_router.post("/bulk", response_model=list[schemas.CustomIngredientOut])
+async def bulk_upsert_ingredients(
+    body: list[schemas.CustomIngredientIn],
+    db: AsyncSession = Depends(get_async_db),
+    user_id: str = Depends(get_current_user_id_async),
+):
+    return await _run(db, ingredients.bulk_upsert_ingredients, body=body, user_id=user_id)
+
+
+@ingredients_router.delete("/{ingredient_id}", status_code=204)
+async def delete_ingredient(
+    ingredient_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: str = Depends(get_current_user_id_async),
+):
+    await _run(db, ingredients.delete_ingredient, ingredient_id=ingredient_id, user_id=user_id)
+
+
+# ── Users ─────────────────────────────────────────────────────────────────────
+
+users_router = APIRouter(prefix="/users", tags=["users"])
+
+
+@users_router.get("/me", response_model=schemas.UserOut)
+async def get_me(
+    request: Request,
+    response: Response,
+    profile: dict = Depends(get_current_profile_async),
+):
+    return users.get_me(request=request, response=response, profile=profile)
+
+
+@users_router.patch("/me", response_model=schemas.UserOut)
+async def update_me(
+    body: schemas.UserUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: str = Depends(get_current_user_id_async),
+):
+    user = await db.get(models.User, user_id)
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+    return await _run(db, users.update_me, body=body, current_user=user)
+
+
+@users_router.delete("/me", status_code=204)
+async def delete_me(
+    db: AsyncSession = Depends(get_async_db),
+    user_id: str = Depends(get_current_user_id_async),
+):
+    await _run(db, users.delete_me, user_id=user_id)
+
+
+# ── Batch sync ────────────────────────────────────────────────────────────────
+
+sync_router = APIRouter(prefix="/sync", tags=["sync"])
+
+
+@sync_router.post("/batch", response_model=schemas.BatchSyncResult)
+async def sync_batch(
+    body: schemas.BatchSyncRequest,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: str = Depends(get_current_user_id_async),
+):
+    return await _run(db, sync.sync_batch, body=body, user_id=user_id)
+
+
+# ── Bootstrap ─────────────────────────────────────────────────────────────────
+
+bootstrap_router = APIRouter(prefix="/bootstrap", tags=["bootstrap"])
+
+
+@bootstrap_router.get("", response_model=schemas.Bootstrap)
+async def get_bootstrap(
+    request: Request,
+    response: Response,
+    log_date: Optional[date] = Query(None, alias="date"),
+    summary_days: int = Query(0, ge=0, le=bootstrap.MAX_SUMMARY_DAYS),
+    db: AsyncSession = Depends(get_async_db),
+    profile: dict = Depends(get_current_profile_async),
+):
+    return await _run(db, bootstrap.bootstrap, request=request, response=response,
+                      log_date=log_date, summary_days=summary_days, profile=profile)
+
+
+# ── Export / import ───────────────────────────────────────────────────────────
+
+transfer_router = APIRouter(tags=["transfer"])
+
+
+@transfer_router.get("/export")
+async def export_account(
+    format: str = Depends(transfer._format),
+    profile: dict = Depends(get_current_profile_async),
+):
+    return transfer.export_response(profile["id"], profile, format)
+
+
+@transfer_router.post("/import", response_model=schemas.ImportResult)
+async def import_account(
+    request: Request,
+    format: str = Depends(transfer._format),
+    db: AsyncSession = Depends(get_async_db),
+    user_id: str = Depends(get_current_user_id_async),
+):
+    return await transfer.run_import(request, user_id, format, db.run_sync)
+
+
+# ── Foods ─────────────────────────────────────────────────────────────────────
+
+foods_router = APIRouter(prefix="/foods", tags=["foods"])
+
+
+@foods_router.get("/search", response_model=list[schemas.FoodMatch])
+async def search_foods(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    user_id: str = Depends(get_current_user_id_async),
+):
+    return await _run(db, foods.search_foods, q=q, limit=limit, user_id=user_id)
+
+
+@foods_router.get("/usda", response_model=list[schemas.UsdaFood])
+async def search_usda(
+    q: str = Query(..., min_length=2, max_length=100),
+    limit: int = Query(usda.PAGE_SIZE, ge=1, le=usda.PAGE_SIZE),
+    user_id: str = Depends(get_current_user_id_async),
+):
+    return await foods.search_usda(q=q, limit=limit, user_id=user_id)
+
+
+routers = [
+    logs_router, mixtures_router, ingredients_router, users_router,
+    sync_router, bootstrap_router, transfer_router, foods_router,
+]
@@ -0,0 +1,118 @@
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+from datetime import date, timedelta
+from typing import Optional
+
+from database import get_db
+from auth import get_current_profile
+import etag, models, schemas
+
+router = APIRouter(prefix="/bootstrap", tags=["bootstrap"])
+
+MAX_SUMMARY_DAYS = 31
+
+
+def _versions(db: Session, user_id: str, log_date: date, since: date) -> tuple[int, int, int, int]:
+    """
+    Day, mixtures and ingredients versions plus a fingerprint of the summary
+    window, in one round trip. Day versions only ever go up, so their sum
+    changes whenever any day in the window is written.
+    """
+    def collection(name: str):
+        return select(models.CollectionVersion.version).where(
+            models.CollectionVersion.user_id == user_id,
+            models.CollectionVersion.collection == name,
+        ).scalar_subquery()
+
+    day = select(models.DailySummary.version).where(
+        models.DailySummary.user_id == user_id,
+        models.DailySummary.log_date == log_date,
+    ).scalar_subquery()
+    window = select(func.sum(models.DailySummary.version)).where(
+        models.DailySummary.user_id == user_id,
+        models.DailySummary.log_date >= since,
+        models.DailySummary.log_date < log_date,
+    ).scalar_subquery()
+
+    row = db.execute(select(
+        func.coalesce(day, 0),
+        func.coalesce(collection("mixtures"), 0),
+        func.coalesce(collection("ingredients"), 0),
+        func.coalesce(window, 0),
+    )).one()
+    return tuple(row)
+
+
+@router.get("", response_model=schemas.Bootstrap)
+def bootstrap(
+    request: Request,
+    response: Response,
+    log_date: Optional[date] = Query(None, alias="date"),
+    summary_days: int = Query(0, ge=0, le=MAX_SUMMARY_DAYS),
+    db: Session = Depends(get_db),
+    profile: dict = Depends(get_current_profile),
+):
+    """
+    Profile, one day's log (default: today on the server; clients should
+    send their local date), mixtures, custom ingredients and, optionally,
+    the rollups for the `summary_days` days before `date`.
+
+    The ETag combines the version of every part, so a warm client that sends
+    If-None-Match gets a 304 after a single query.
+    """
+    user_id = profile["id"]
+    log_date = log_date or date.today()
+    since = log_date - timedelta(days=summary_days)
+    day_v, mixtures_v, ingredients_v, window_v = _versions(db, user_id, log_date, since)
+
+    etags = {
+        "user": etag.of_content(profile),
+        "log": etag.make(user_id, f"log-{log_date}", day_v),
+        "mixtures": etag.make(user_id, "mixtures", mixtures_v),
+        "ingredients": etag.make(user_id, "ingredients", ingredients_v),
+    }
+    combined = etag.of_content({**etags, "summaries": [summary_days, window_v]})
+    if not_modified := etag.check(request, response, combined):
+        return not_modified
+
+    entries = (
+        db.query(models.FoodLog)
+        .filter(models.FoodLog.user_id == user_id, models.FoodLog.log_date == log_date)
+        .order_by(models.FoodLog.position)
+        .all()
+    )
+    mixtures = (
+        db.query(models.Mixture)
+        .filter(models.Mixture.user_id == user_id)
+        .order_by(models.Mixture.created_at)
+        .all()
+    )
+    ingredients = (
+        db.query(models.CustomIngredient)
+        .filter(models.CustomIngredient.user_id == user_id)
+        .order_by(models.CustomIngredient.name)
+        .all()
+    )
+    summaries = []
+    if summary_days:
+        summaries = (
+            db.query(models.DailySummary)
+            .filter(
+                models.DailySummary.user_id == user_id,
+                models.DailySummary.log_date >= since,
+                models.DailySummary.log_date < log_date,
+                models.DailySummary.entry_count > 0,
+            )
+            .order_by(models.DailySummary.log_date)
+            .all()
+        )
+
+    return {
+        "user": profile,
+        "log": {"log_date": log_date, "entries": entries, "version": day_v},
+        "mixtures": mixtures,
+        "ingredients": ingredients,
+        "summaries": summaries,
+        "etags": etags,
+    }
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from database import get_db
+from auth import get_current_user_id
+import food_index, schemas, usda
+
+router = APIRouter(prefix="/foods", tags=["foods"])
+
+
+@router.get("/search", response_model=list[schemas.FoodMatch])
+def search_foods(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    user_id: str = Depends(get_current_user_id),
+):
+    """
+    Ranked, typo-tolerant name search over the built-in foods, cached USDA
+    foods and the caller's own ingredients and mixtures.
+    """
+    return food_index.search(db, user_id, q, limit)
+
+
+@router.get("/usda", response_model=list[schemas.UsdaFood])
+async def search_usda(
+    q: str = Query(..., min_length=2, max_length=100),
+    limit: int = Query(usda.PAGE_SIZE, ge=1, le=usda.PAGE_SIZE),
+    user_id: str = Depends(get_current_user_id),
+):
+    """USDA FoodData Central search through the shared server-side cache."""
+    return (await usda.search(q))[:limit]
@@ -1,68 +1,152 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import Select, delete, select
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.sql import func
 
-from database import get_db
-from auth import get_current_user
-import models, schemas
+from database import get_db, dialect_insert
+from auth import get_current_user_id
+import etag, fastjson, food_index, models, schemas, streaming
+from models import gen_uuid
 
 router = APIRouter(prefix="/ingredients", tags=["ingredients"])
 
 
+MAX_BULK = 1000     # ingredients per POST /ingredients/bulk
+
+
+def upsert_ingredients(
+    db: Session, user_id: str, items: list[schemas.CustomIngredientIn],
+) -> list[models.CustomIngredient]:
+    """
+    Insert-or-update custom ingredients by name in one INSERT ... ON
+    CONFLICT ... RETURNING, inside the caller's transaction. Returns the
+    stored rows, one per distinct name in first-seen order; later duplicates
+    of a name win.
+    The caller adds the names to food_index once it has committed.
+    """
+    by_name = {item.name: item for item in items}
+    if not by_name:
+        return []
+    insert = dialect_insert(db)
+    stmt = insert(models.CustomIngredient).values([
+        {
+            "id": gen_uuid(),
+            "user_id": user_id,
+            "name": item.name,
+            "nutrition": item.nutrition,
+        }
+        for item in by_name.values()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "name"],
+        set_={
+            "nutrition": stmt.excluded.nutrition,
+            "updated_at": func.now(),
+        },
+    ).returning(models.CustomIngredient)
+    rows = db.scalars(stmt, execution_options={"populate_existing": True}).all()
+    etag.bump(db, user_id, "ingredients")
+    stored = {ingredient.name: ingredient for ingredient in rows}
+    return [stored[name] for name in by_name]
+
+
+def delete_ingredients(db: Session, user_id: str, ids: list[str]) -> dict[str, str]:
+    """Delete custom ingredients by ID in one statement; returns {id: name} of those that existed."""
+    if not ids:
+        return {}
+    result = db.execute(
+        delete(models.CustomIngredient)
+        .where(models.CustomIngredient.user_id == user_id, models.CustomIngredient.id.in_(ids))
+        .returning(models.CustomIngredient.id, models.CustomIngredient.name)
+    )
+    gone = dict(result.all())
+    if gone:
+        etag.bump(db, user_id, "ingredients")
+    return gone
+
+
+def ingredient_rows(user_id: str) -> Select:
+    """The list endpoint's rows as plain columns, for the fast and streamed paths."""
+    return (
+        select(
+            models.CustomIngredient.id, models.CustomIngredient.name,
+            fastjson.raw(models.CustomIngredient.nutrition), models.CustomIngredient.created_at,
+        )
+        .where(models.CustomIngredient.user_id == user_id)
+        .order_by(models.CustomIngredient.name)
+    )
+
+
 @router.get("/", response_model=list[schemas.CustomIngredientOut])
 def list_ingredients(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    user_id: str = Depends(get_current_user_id),
 ):
-    return db.query(models.CustomIngredient).filter(
-        models.CustomIngredient.user_id == current_user.id
-    ).order_by(models.CustomIngredient.name).all()
+    tag = etag.make(user_id, "ingredients", etag.current(db, user_id, "ingredients"))
+    if not_modified := etag.check(request, response, tag):
+        return not_modified
+    if streaming.wants_ndjson(request):
+        return streaming.respond(request, response, ingredient_rows(user_id))
+
+    # Read at most one row past the threshold; a bigger collection is streamed
+    limit = streaming.threshold() + 1
+    if fastjson.enabled():
+        rows = db.execute(ingredient_rows(user_id).limit(limit)).all()
+        if len(rows) < limit:
+            return fastjson.respond(response, fastjson.records(rows))
+    else:
+        ingredients = db.query(models.CustomIngredient).filter(
+            models.CustomIngredient.user_id == user_id
+        ).order_by(models.CustomIngredient.name).limit(limit).all()
+        if len(ingredients) < limit:
+            return ingredients
+    return streaming.respond(request, response, ingredient_rows(user_id))
 
 
 @router.post("/", response_model=schemas.CustomIngredientOut, status_code=201)
 def create_ingredient(
     body: schemas.CustomIngredientIn,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    user_id: str = Depends(get_current_user_id),
 ):
     # Upsert by name
-    existing = db.query(models.CustomIngredient).filter(
-        models.CustomIngredient.user_id == current_user.id,
-        models.CustomIngredient.name == body.name,
-    ).first()
+    [ingredient] = upsert_ingredients(db, user_id, [body])
+    result = schemas.CustomIngredientOut.model_validate(ingredient)     # before commit expires the row
+    db.commit()
+    food_index.user_added(user_id, [result.name], "ingredient")
+    return result
 
-    if existing:
-        existing.nutrition = body.nutrition
-        db.commit()
-        db.refresh(existing)
-        return existing
 
-    ingredient = models.CustomIngredient(
-        user_id=current_user.id,
-        name=body.name,
-        nutrition=body.nutrition,
-    )
-    db.add(ingredient)
-    try:
-        db.commit()
-        db.refresh(ingredient)
-    except IntegrityError:
-        db.rollback()
-        raise HTTPException(status_code=409, detail="Ingredient name conflict")
-    return ingredient
+@router.post("/bulk", response_model=list[schemas.CustomIngredientOut])
+def bulk_upsert_ingredients(
+    body: list[schemas.CustomIngredientIn],
+    db: Session = Depends(get_db),
+    user_id: str = Depends(get_current_user_id),
+):
+    """Upsert many custom ingredients by name in one statement; one result per distinct name."""
+    if len(body) > MAX_BULK:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BULK} ingredients per request")
+    results = [schemas.CustomIngredientOut.model_validate(i) for i in upsert_ingredients(db, user_id, body)]
+    db.commit()
+    food_index.user_added(user_id, [r.name for r in results], "ingredient")
+    return results
 
 
 @router.delete("/{ingredient_id}", status_code=204)
 def delete_ingredient(
     ingredient_id: str,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    user_id: str = Depends(get_current_user_id),
 ):
     ingredient = db.query(models.CustomIngredient).filter(
         models.CustomIngredient.id == ingredient_id,
-        models.CustomIngredient.user_id == current_user.id,
+        models.CustomIngredient.user_id == user_id,
     ).first()
     if not ingredient:
         raise HTTPException(status_code=404, detail="Ingredient not found")
     db.delete(ingredient)
+    etag.bump(db, user_id, "ingredients")
     db.commit()
+    food_index.user_removed(user_id, [ingredient.name], "ingredient")
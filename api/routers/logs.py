@@ -1,38 +1,226 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import delete, select, insert
 from sqlalchemy.orm import Session
-from datetime import date
+from sqlalchemy.sql import func
+from datetime import date, datetime, timezone
+from itertools import groupby
+from typing import Optional
 
-from database import get_db
-from auth import get_current_user
-import models, schemas
+from database import get_db, dialect_insert
+from auth import get_current_user_id
+from nutrition import (refresh_daily_summary, clear_daily_summary, day_version,
+                       lock_daily_summary,
+                       day_totals, grouped_totals, load_user_foods)
+import etag, fastjson, models, schemas
 from models import gen_uuid
 
 router = APIRouter(prefix="/logs", tags=["logs"])
 
+MAX_RANGE_PAGE_DAYS = 366
 
-@router.get("/{log_date}", response_model=schemas.LogDay)
-def get_log(
-    log_date: date,
+
+def replace_days(
+    db: Session,
+    user_id: str,
+    days: list[schemas.BulkSyncRequest],
+) -> dict[date, tuple[list[dict], int]]:
+    """
+    Replace whole days of entries in the caller's transaction: one DELETE
+    for all dates, one executemany INSERT, then each day's rollup.
+    Returns {log_date: (rows written, new day version)}; later duplicates
+    of a date win.
+    """
+    by_date = {day.log_date: day for day in days}
+    if not by_date:
+        return {}
+
+    # Queue behind delta syncs to the same days, which hold these locks from
+    # read to rollup; sorted, so two multi-day writers can't deadlock
+    for log_date in sorted(by_date):
+        lock_daily_summary(db, user_id, log_date)
+
+    db.query(models.FoodLog).filter(
+        models.FoodLog.user_id == user_id,
+        models.FoodLog.log_date.in_(by_date),
+    ).delete(synchronize_session=False)
+
+    # The response is built from the values we wrote rather than re-read
+    synced_at = datetime.now(timezone.utc)
+    written = {
+        log_date: [
+            {
+                "id": entry.id or gen_uuid(),
+                "user_id": user_id,
+                "log_date": log_date,
+                "ingredient_name": entry.ingredient_name,
+                "amount": entry.amount,
+                "display_amount": entry.display_amount,
+                "unit": entry.unit,
+                "position": entry.position if entry.position else i,
+                "synced_at": synced_at,
+            }
+            for i, entry in enumerate(day.entries)
+        ]
+        for log_date, day in by_date.items()
+    }
+    all_rows = [row for rows in written.values() for row in rows]
+    if all_rows:
+        db.execute(insert(models.FoodLog), all_rows)
+
+    return {
+        log_date: (rows, refresh_daily_summary(
+            db, user_id, log_date,
+            entries=[(r["ingredient_name"], r["amount"]) for r in rows],
+        ))
+        for log_date, rows in written.items()
+    }
+
+
+def entry_totals(db: Session, user_id: str, entries: list[tuple[date, str, float]]) -> dict[date, dict]:
+    """Nutrient totals per date for (log_date, ingredient_name, amount) triples."""
+    user_foods = load_user_foods(db, user_id, (name for _, name, _ in entries))
+    return grouped_totals(entries, user_foods)
+
+
+@router.get("", response_model=schemas.LogRange)
+def get_log_range(
+    from_date: date = Query(..., alias="from"),
+    to_date: date = Query(..., alias="to"),
+    cursor: Optional[date] = None,
+    limit: int = Query(31, ge=1, le=MAX_RANGE_PAGE_DAYS),
+    totals: bool = False,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    user_id: str = Depends(get_current_user_id),
 ):
+    """
+    Every logged day in [from, to], oldest first, in one query.
+    Days without entries are omitted. Pages hold at most `limit` days;
+    when more remain, `next_cursor` is the last date returned.
+    With `totals`, each day also carries its nutrient totals, computed for
+    the whole page at once.
+    """
+    if from_date > to_date:
+        raise HTTPException(status_code=422, detail="'from' must not be after 'to'")
+
+    window = [
+        models.FoodLog.user_id == user_id,
+        models.FoodLog.log_date >= from_date,
+        models.FoodLog.log_date <= to_date,
+    ]
+    if cursor:
+        window.append(models.FoodLog.log_date > cursor)
+
+    # Pick the page's dates in a subquery so a page never splits a day
+    page_dates = (
+        db.query(models.FoodLog.log_date)
+        .filter(*window)
+        .distinct()
+        .order_by(models.FoodLog.log_date)
+        .limit(limit)
+        .subquery()
+    )
     entries = (
         db.query(models.FoodLog)
         .filter(
-            models.FoodLog.user_id == current_user.id,
-            models.FoodLog.log_date == log_date,
+            models.FoodLog.user_id == user_id,
+            models.FoodLog.log_date.in_(select(page_dates.c.log_date)),
         )
-        .order_by(models.FoodLog.position)
+        .order_by(models.FoodLog.log_date, models.FoodLog.position)
         .all()
     )
-    return {"log_date": log_date, "entries": entries}
+
+    days = [
+        {"log_date": day, "entries": list(rows)}
+        for day, rows in groupby(entries, key=lambda e: e.log_date)
+    ]
+    if totals:
+        by_day = entry_totals(db, user_id, [(e.log_date, e.ingredient_name, e.amount) for e in entries])
+        for day in days:
+            day["totals"] = by_day[day["log_date"]]
+    next_cursor = None
+    if len(days) == limit and days[-1]["log_date"] < to_date:
+        next_cursor = days[-1]["log_date"]
+    return {"days": days, "next_cursor": next_cursor}
+
+
+@router.get("/summary", response_model=list[schemas.DaySummary])
+def get_summary(
+    from_date: date = Query(..., alias="from"),
+    to_date: date = Query(..., alias="to"),
+    db: Session = Depends(get_db),
+    user_id: str = Depends(get_current_user_id),
+):
+    """Daily nutrition totals for every logged day in [from, to], oldest first."""
+    if from_date > to_date:
+        raise HTTPException(status_code=422, detail="'from' must not be after 'to'")
+    return (
+        db.query(models.DailySummary)
+        .filter(
+            models.DailySummary.user_id == user_id,
+            models.DailySummary.log_date >= from_date,
+            models.DailySummary.log_date <= to_date,
+            models.DailySummary.entry_count > 0,
+        )
+        .order_by(models.DailySummary.log_date)
+        .all()
+    )
+
+
+@router.get("/{log_date}", response_model=schemas.LogDay)
+def get_log(
+    log_date: date,
+    request: Request,
+    response: Response,
+    totals: bool = False,
+    db: Session = Depends(get_db),
+    user_id: str = Depends(get_current_user_id),
+):
+    version = day_version(db, user_id, log_date)
+    if totals:
+        # Totals also move when a mixture or custom ingredient is edited
+        foods = f"{etag.current(db, user_id, 'mixtures')}.{etag.current(db, user_id, 'ingredients')}"
+        tag = etag.make(user_id, f"log-{log_date}-totals", f"{version}.{foods}")
+    else:
+        tag = etag.make(user_id, f"log-{log_date}", version)
+    if not_modified := etag.check(request, response, tag):
+        return not_modified
+
+    if fastjson.enabled():
+        entries = fastjson.records(db.execute(
+            select(
+                models.FoodLog.id, models.FoodLog.ingredient_name, models.FoodLog.amount,
+                models.FoodLog.display_amount, models.FoodLog.unit, models.FoodLog.position,
+                models.FoodLog.synced_at,
+            )
+            .where(models.FoodLog.user_id == user_id, models.FoodLog.log_date == log_date)
+            .order_by(models.FoodLog.position)
+        ))
+        pairs = [(e["ingredient_name"], e["amount"]) for e in entries]
+    else:
+        entries = (
+            db.query(models.FoodLog)
+            .filter(
+                models.FoodLog.user_id == user_id,
+                models.FoodLog.log_date == log_date,
+            )
+            .order_by(models.FoodLog.position)
+            .all()
+        )
+        pairs = [(e.ingredient_name, e.amount) for e in entries]
+
+    day = {"log_date": log_date, "entries": entries, "version": version}
+    if totals:
+        day["totals"] = day_totals(pairs, load_user_foods(db, user_id, (n for n, _ in pairs)))
+    if fastjson.enabled():
+        return fastjson.respond(response, day)
+    return day
 
 
 @router.post("/sync", response_model=schemas.LogDay)
 def sync_log(
     body: schemas.BulkSyncRequest,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    user_id: str = Depends(get_current_user_id),
 ):
     """
     Offline-first sync: client sends its full local list for a date.
@@ -42,33 +230,80 @@ def sync_log(
     Strategy: last-write-wins per day. Good enough for a single-user
     nutrition tracker; upgrade to CRDT if multi-device conflicts matter.
     """
-    # Delete existing entries for that day
-    db.query(models.FoodLog).filter(
-        models.FoodLog.user_id == current_user.id,
-        models.FoodLog.log_date == body.log_date,
-    ).delete()
+    rows, version = replace_days(db, user_id, [body])[body.log_date]
+    db.commit()
+    return {"log_date": body.log_date, "entries": rows, "version": version}
+
 
-    # Insert new entries
-    new_entries = []
-    for i, entry in enumerate(body.entries):
-        log = models.FoodLog(
-            id=entry.id or gen_uuid(),
-            user_id=current_user.id,
-            log_date=body.log_date,
-            ingredient_name=entry.ingredient_name,
-            amount=entry.amount,
-            display_amount=entry.display_amount,
-            unit=entry.unit,
-            position=entry.position if entry.position else i,
+@router.post("/sync/delta", response_model=schemas.DeltaSyncResult)
+def sync_log_delta(
+    body: schemas.DeltaSyncRequest,
+    db: Session = Depends(get_db),
+    user_id: str = Depends(get_current_user_id),
+):
+    """
+    Apply only the entries that changed since `base_version`: one bulk
+    DELETE for removals and one INSERT ... ON CONFLICT for upserts. The
+    day's rollup is then recounted (entries logged before a mixture edit
+    can't be subtracted exactly), and the response carries only the new
+    version.
+    An upserted ID that belongs to another day or account is a 409.
+    """
+    summary = lock_daily_summary(db, user_id, body.log_date)
+    if body.base_version != summary.version:
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "Day changed on server; full sync required", "version": summary.version},
         )
-        db.add(log)
-        new_entries.append(log)
 
-    db.commit()
-    for e in new_entries:
-        db.refresh(e)
+    if body.removed:
+        db.execute(
+            delete(models.FoodLog).where(
+                models.FoodLog.user_id == user_id,
+                models.FoodLog.log_date == body.log_date,
+                models.FoodLog.id.in_(body.removed),
+            )
+        )
+
+    upserts = {entry.id: entry for entry in body.upserts}     # later duplicates of an ID win
+    if upserts:
+        insert_stmt = dialect_insert(db)(models.FoodLog)
+        stmt = insert_stmt.on_conflict_do_update(
+            index_elements=["id"],
+            set_={
+                "ingredient_name": insert_stmt.excluded.ingredient_name,
+                "amount": insert_stmt.excluded.amount,
+                "display_amount": insert_stmt.excluded.display_amount,
+                "unit": insert_stmt.excluded.unit,
+                "position": insert_stmt.excluded.position,
+                "synced_at": func.now(),
+            },
+            # Never touch another user's row, or move an entry between days
+            where=(models.FoodLog.user_id == user_id)
+                  & (models.FoodLog.log_date == body.log_date),
+        ).returning(models.FoodLog.id)
+        written = set(db.scalars(stmt, [
+            {
+                "id": entry.id,
+                "user_id": user_id,
+                "log_date": body.log_date,
+                "ingredient_name": entry.ingredient_name,
+                "amount": entry.amount,
+                "display_amount": entry.display_amount,
+                "unit": entry.unit,
+                "position": entry.position,
+            }
+            for entry in upserts.values()
+        ]).all())
+        if conflicts := [entry_id for entry_id in upserts if entry_id not in written]:
+            raise HTTPException(
+                status_code=409,
+                detail={"message": "Entry IDs belong to another day or account", "ids": conflicts},
+            )
 
-    return {"log_date": body.log_date, "entries": new_entries}
+    version = refresh_daily_summary(db, user_id, body.log_date)
+    db.commit()
+    return {"log_date": body.log_date, "version": version}
 
 
 @router.delete("/{log_date}/{entry_id}", status_code=204)
@@ -76,16 +311,23 @@ def delete_entry(
     log_date: date,
     entry_id: str,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    user_id: str = Depends(get_current_user_id),
 ):
-    entry = db.query(models.FoodLog).filter(
-        models.FoodLog.id == entry_id,
-        models.FoodLog.user_id == current_user.id,
-        models.FoodLog.log_date == log_date,
+    lock_daily_summary(db, user_id, log_date)
+    removed = db.execute(
+        delete(models.FoodLog)
+        .where(
+            models.FoodLog.id == entry_id,
+            models.FoodLog.user_id == user_id,
+            models.FoodLog.log_date == log_date,
+        )
+        .returning(models.FoodLog.id)
     ).first()
-    if not entry:
+    if removed is None:
         raise HTTPException(status_code=404, detail="Entry not found")
-    db.delete(entry)
+    # Recount rather than subtract: the entry may have been priced with
+    # mixture/ingredient nutrition that has been edited since
+    refresh_daily_summary(db, user_id, log_date)
     db.commit()
 
 
@@ -93,10 +335,12 @@ def delete_entry(
 def clear_day(
     log_date: date,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    user_id: str = Depends(get_current_user_id),
 ):
+    lock_daily_summary(db, user_id, log_date)
     db.query(models.FoodLog).filter(
-        models.FoodLog.user_id == current_user.id,
+        models.FoodLog.user_id == user_id,
         models.FoodLog.log_date == log_date,
     ).delete()
+    clear_daily_summary(db, user_id, log_date)
     db.commit()
@@ -1,61 +1,142 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import Select, delete, select
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.sql import func
 
-from database import get_db
-from auth import get_current_user
-import models, schemas
+from database import get_db, dialect_insert
+from auth import get_current_user_id
+import etag, fastjson, food_index, models, schemas, streaming
+from models import gen_uuid
 
 router = APIRouter(prefix="/mixtures", tags=["mixtures"])
 
 
+MAX_BULK = 1000     # mixtures per POST /mixtures/bulk
+
+
+def upsert_mixtures(db: Session, user_id: str, items: list[schemas.MixtureIn]) -> list[models.Mixture]:
+    """
+    Insert-or-update mixtures by name in one INSERT ... ON CONFLICT ...
+    RETURNING, inside the caller's transaction. Returns the stored rows, one
+    per distinct name in first-seen order; later duplicates of a name win.
+    The caller adds the names to food_index once it has committed.
+    """
+    by_name = {item.name: item for item in items}
+    if not by_name:
+        return []
+    insert = dialect_insert(db)
+    stmt = insert(models.Mixture).values([
+        {
+            "id": gen_uuid(),
+            "user_id": user_id,
+            "name": item.name,
+            "yield_g": item.yield_g,
+            "yield_unit": item.yield_unit,
+            "per100g": item.per100g,
+            "ingredients": item.ingredients,
+        }
+        for item in by_name.values()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "name"],
+        set_={
+            "yield_g": stmt.excluded.yield_g,
+            "yield_unit": stmt.excluded.yield_unit,
+            "per100g": stmt.excluded.per100g,
+            "ingredients": stmt.excluded.ingredients,
+            "updated_at": func.now(),
+        },
+    ).returning(models.Mixture)
+    rows = db.scalars(stmt, execution_options={"populate_existing": True}).all()
+    etag.bump(db, user_id, "mixtures")
+    stored = {mixture.name: mixture for mixture in rows}
+    return [stored[name] for name in by_name]
+
+
+def delete_mixtures(db: Session, user_id: str, ids: list[str]) -> dict[str, str]:
+    """Delete mixtures by ID in one statement; returns {id: name} of those that existed."""
+    if not ids:
+        return {}
+    result = db.execute(
+        delete(models.Mixture)
+        .where(models.Mixture.user_id == user_id, models.Mixture.id.in_(ids))
+        .returning(models.Mixture.id, models.Mixture.name)
+    )
+    gone = dict(result.all())
+    if gone:
+        etag.bump(db, user_id, "mixtures")
+    return gone
+
+
+def mixture_rows(user_id: str) -> Select:
+    """The list endpoint's rows as plain columns, for the fast and streamed paths."""
+    return (
+        select(
+            models.Mixture.id, models.Mixture.name,
+            models.Mixture.yield_g, models.Mixture.yield_unit,
+            fastjson.raw(models.Mixture.per100g), fastjson.raw(models.Mixture.ingredients),
+            models.Mixture.created_at,
+        )
+        .where(models.Mixture.user_id == user_id)
+        .order_by(models.Mixture.created_at)
+    )
+
+
 @router.get("/", response_model=list[schemas.MixtureOut])
 def list_mixtures(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    user_id: str = Depends(get_current_user_id),
 ):
-    return db.query(models.Mixture).filter(
-        models.Mixture.user_id == current_user.id
-    ).order_by(models.Mixture.created_at).all()
+    tag = etag.make(user_id, "mixtures", etag.current(db, user_id, "mixtures"))
+    if not_modified := etag.check(request, response, tag):
+        return not_modified
+    if streaming.wants_ndjson(request):
+        return streaming.respond(request, response, mixture_rows(user_id))
+
+    # Read at most one row past the threshold; a bigger collection is streamed
+    limit = streaming.threshold() + 1
+    if fastjson.enabled():
+        rows = db.execute(mixture_rows(user_id).limit(limit)).all()
+        if len(rows) < limit:
+            return fastjson.respond(response, fastjson.records(rows))
+    else:
+        mixtures = db.query(models.Mixture).filter(
+            models.Mixture.user_id == user_id
+        ).order_by(models.Mixture.created_at).limit(limit).all()
+        if len(mixtures) < limit:
+            return mixtures
+    return streaming.respond(request, response, mixture_rows(user_id))
 
 
 @router.post("/", response_model=schemas.MixtureOut, status_code=201)
 def create_mixture(
     body: schemas.MixtureIn,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    user_id: str = Depends(get_current_user_id),
 ):
     # Upsert by name — if a mixture with this name exists, update it
-    existing = db.query(models.Mixture).filter(
-        models.Mixture.user_id == current_user.id,
-        models.Mixture.name == body.name,
-    ).first()
+    [mixture] = upsert_mixtures(db, user_id, [body])
+    result = schemas.MixtureOut.model_validate(mixture)     # before commit expires the row
+    db.commit()
+    food_index.user_added(user_id, [result.name], "mixture")
+    return result
 
-    if existing:
-        existing.yield_g     = body.yield_g
-        existing.yield_unit  = body.yield_unit
-        existing.per100g     = body.per100g
-        existing.ingredients = body.ingredients
-        db.commit()
-        db.refresh(existing)
-        return existing
-
-    mixture = models.Mixture(
-        user_id=current_user.id,
-        name=body.name,
-        yield_g=body.yield_g,
-        yield_unit=body.yield_unit,
-        per100g=body.per100g,
-        ingredients=body.ingredients,
-    )
-    db.add(mixture)
-    try:
-        db.commit()
-        db.refresh(mixture)
-    except IntegrityError:
-        db.rollback()
-        raise HTTPException(status_code=409, detail="Mixture name conflict")
-    return mixture
+
+@router.post("/bulk", response_model=list[schemas.MixtureOut])
+def bulk_upsert_mixtures(
+    body: list[schemas.MixtureIn],
+    db: Session = Depends(get_db),
+    user_id: str = Depends(get_current_user_id),
+):
+    """Upsert many mixtures by name in one statement; one result per distinct name."""
+    if len(body) > MAX_BULK:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BULK} mixtures per request")
+    results = [schemas.MixtureOut.model_validate(m) for m in upsert_mixtures(db, user_id, body)]
+    db.commit()
+    food_index.user_added(user_id, [r.name for r in results], "mixture")
+    return results
 
 
 @router.put("/{mixture_id}", response_model=schemas.MixtureOut)
@@ -63,22 +144,27 @@ def update_mixture(
     mixture_id: str,
     body: schemas.MixtureIn,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    user_id: str = Depends(get_current_user_id),
 ):
     mixture = db.query(models.Mixture).filter(
         models.Mixture.id == mixture_id,
-        models.Mixture.user_id == current_user.id,
+        models.Mixture.user_id == user_id,
     ).first()
     if not mixture:
         raise HTTPException(status_code=404, detail="Mixture not found")
 
+    old_name = mixture.name
     mixture.name        = body.name
     mixture.yield_g     = body.yield_g
     mixture.yield_unit  = body.yield_unit
     mixture.per100g     = body.per100g
     mixture.ingredients = body.ingredients
+    etag.bump(db, user_id, "mixtures")
     db.commit()
     db.refresh(mixture)
+    if mixture.name != old_name:
+        food_index.user_removed(user_id, [old_name], "mixture")
+        food_index.user_added(user_id, [mixture.name], "mixture")
     return mixture
 
 
@@ -86,13 +172,15 @@ def update_mixture(
 def delete_mixture(
     mixture_id: str,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    user_id: str = Depends(get_current_user_id),
 ):
     mixture = db.query(models.Mixture).filter(
         models.Mixture.id == mixture_id,
-        models.Mixture.user_id == current_user.id,
+        models.Mixture.user_id == user_id,
     ).first()
     if not mixture:
         raise HTTPException(status_code=404, detail="Mixture not found")
     db.delete(mixture)
+    etag.bump(db, user_id, "mixtures")
     db.commit()
+    food_index.user_removed(user_id, [mixture.name], "mixture")
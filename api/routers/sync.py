@@ -0,0 +1,69 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+
+from database import get_db
+from auth import get_current_user_id
+from routers.logs import replace_days
+from routers.mixtures import upsert_mixtures, delete_mixtures
+from routers.ingredients import upsert_ingredients, delete_ingredients
+import food_index, schemas
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+
+@router.post("/batch", response_model=schemas.BatchSyncResult)
+def sync_batch(
+    body: schemas.BatchSyncRequest,
+    db: Session = Depends(get_db),
+    user_id: str = Depends(get_current_user_id),
+):
+    """
+    Drain an offline queue in one request and one transaction.
+    Each kind of write is a single bulk statement; deletions run before
+    upserts so a delete-then-recreate of the same name lands correctly.
+    Either everything applies or nothing does.
+    """
+    results = []
+    try:
+        gone_mixtures = delete_mixtures(db, user_id, body.deleted_mixtures)
+        results += [
+            {"kind": "mixture_delete", "key": i, "status": "ok" if i in gone_mixtures else "not_found"}
+            for i in body.deleted_mixtures
+        ]
+        gone_ingredients = delete_ingredients(db, user_id, body.deleted_ingredients)
+        results += [
+            {"kind": "ingredient_delete", "key": i, "status": "ok" if i in gone_ingredients else "not_found"}
+            for i in body.deleted_ingredients
+        ]
+
+        ids = {m.name: m.id for m in upsert_mixtures(db, user_id, body.mixtures)}
+        results += [
+            {"kind": "mixture", "key": m.name, "status": "ok", "id": ids[m.name]}
+            for m in body.mixtures
+        ]
+        ids = {i.name: i.id for i in upsert_ingredients(db, user_id, body.ingredients)}
+        results += [
+            {"kind": "ingredient", "key": i.name, "status": "ok", "id": ids[i.name]}
+            for i in body.ingredients
+        ]
+
+        # Rollups are refreshed after the mixture/ingredient upserts so the
+        # days see the nutrition that arrived in the same batch
+        days = replace_days(db, user_id, body.logs)
+        results += [
+            {"kind": "log", "key": d.log_date.isoformat(), "status": "ok", "version": days[d.log_date][1]}
+            for d in body.logs
+        ]
+
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Batch conflicts with existing data")
+
+    # Only once committed, so a rolled-back batch leaves search untouched
+    food_index.user_removed(user_id, gone_mixtures.values(), "mixture")
+    food_index.user_removed(user_id, gone_ingredients.values(), "ingredient")
+    food_index.user_added(user_id, [m.name for m in body.mixtures], "mixture")
+    food_index.user_added(user_id, [i.name for i in body.ingredients], "ingredient")
+    return {"results": results}
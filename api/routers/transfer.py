@@ -0,0 +1,348 @@
+"""
+Whole-account export and import.
+
+Both directions use the same record stream, one record per line, as NDJSON
+or CSV (`?format=`). Each record has a `type`: profile, ingredient, mixture
+or log (one food log entry). Export reads every table through a server-side
+cursor and import writes in batches as lines arrive, so memory per request
+stays flat however many years of data an account holds.
+"""
+import csv
+import io
+import json
+from typing import AsyncIterator, Awaitable, Callable, Optional, Union
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import Text, cast, insert, select
+from sqlalchemy.orm import Session
+
+from database import get_db, stream_partitions
+from auth import get_current_profile, get_current_user_id, invalidate_user
+from nutrition import lock_daily_summary, refresh_daily_summary
+from routers.mixtures import upsert_mixtures
+from routers.ingredients import upsert_ingredients
+import food_index, models, schemas
+from models import gen_uuid
+
+router = APIRouter(tags=["transfer"])
+
+BATCH       = 1000               # rows per cursor fetch on export, records per write on import
+CHUNK_BYTES = 64 * 1024          # export body chunk size
+MAX_LINE    = 1024 * 1024        # longest record accepted on import
+MAX_ERRORS  = 50                 # validation errors reported before giving up
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+JSON_FIELDS = ("per100g", "ingredients", "nutrition")
+PROFILE_FIELDS = (
+    "email", "display_name", "body_weight", "weight_unit",
+    "goal_cal", "goal_protein", "goal_carbs", "goal_fat",
+)
+# The email is exported for reference but never imported: it is the sign-in
+# identity, and the one in a file may belong to another account by now
+IMPORTED_PROFILE_FIELDS = tuple(field for field in PROFILE_FIELDS if field != "email")
+CSV_FIELDS = (
+    "type", "id", "name", "log_date", "ingredient_name", "amount", "display_amount", "unit",
+    "position", "yield_g", "yield_unit", *JSON_FIELDS, *PROFILE_FIELDS,
+)
+
+
+def _format(format: str = Query("ndjson", pattern="^(ndjson|csv)$")) -> str:
+    return format
+
+
+# ── Export ────────────────────────────────────────────────────────────────────
+
+async def _records(user_id: str, profile: dict) -> AsyncIterator[dict]:
+    """Every record of the account, JSON columns as their stored text."""
+    yield {"type": "profile", **{key: profile.get(key) for key in PROFILE_FIELDS}}
+
+    queries = (
+        ("ingredient", select(
+            models.CustomIngredient.id, models.CustomIngredient.name,
+            cast(models.CustomIngredient.nutrition, Text).label("nutrition"),
+        ).where(models.CustomIngredient.user_id == user_id).order_by(models.CustomIngredient.name)),
+        ("mixture", select(
+            models.Mixture.id, models.Mixture.name, models.Mixture.yield_g, models.Mixture.yield_unit,
+            cast(models.Mixture.per100g, Text).label("per100g"),
+            cast(models.Mixture.ingredients, Text).label("ingredients"),
+        ).where(models.Mixture.user_id == user_id).order_by(models.Mixture.created_at)),
+        ("log", select(
+            models.FoodLog.id, models.FoodLog.log_date, models.FoodLog.ingredient_name,
+            models.FoodLog.amount, models.FoodLog.display_amount, models.FoodLog.unit,
+            models.FoodLog.position,
+        ).where(models.FoodLog.user_id == user_id)
+         .order_by(models.FoodLog.log_date, models.FoodLog.position)),
+    )
+    # The get_db session is gone by the time the body streams, so each query
+    # reads through a session of its own
+    for kind, stmt in queries:
+        async for rows in stream_partitions(stmt, BATCH):
+            for row in rows:
+                yield {"type": kind, **row._asdict()}
+
+
+async def _ndjson_lines(records: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    async for record in records:
+        for key in JSON_FIELDS:
+            if record.get(key) is not None:
+                record[key] = orjson.Fragment(record[key])
+        yield orjson.dumps(record) + b"\n"
+
+
+async def _csv_lines(records: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=CSV_FIELDS, extrasaction="ignore", lineterminator="\n")
+    writer.writeheader()
+    async for record in records:
+        writer.writerow(record)
+        yield buf.getvalue().encode()
+        buf.seek(0)
+        buf.truncate()
+
+
+async def _chunked(lines: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    buf, size = [], 0
+    async for line in lines:
+        buf.append(line)
+        size += len(line)
+        if size >= CHUNK_BYTES:
+            yield b"".join(buf)
+            buf, size = [], 0
+    if buf:
+        yield b"".join(buf)
+
+
+def export_response(user_id: str, profile: dict, format: str) -> StreamingResponse:
+    encode = _csv_lines if format == "csv" else _ndjson_lines
+    return StreamingResponse(
+        _chunked(encode(_records(user_id, profile))),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="vegfuel-export.{format}"'},
+    )
+
+
+@router.get("/export")
+def export_account(
+    format: str = Depends(_format),
+    profile: dict = Depends(get_current_profile),
+):
+    """Stream the whole account: profile, custom ingredients, mixtures, then every log entry."""
+    return export_response(profile["id"], profile, format)
+
+
+# ── Import ────────────────────────────────────────────────────────────────────
+
+class Importer:
+    """
+    Validates records one at a time and writes them in batches inside the
+    caller's transaction. A day that appears in the import replaces that
+    day on the server, as /logs/sync would; mixtures and ingredients are
+    upserted by name.
+    """
+
+    def __init__(self, user_id: str):
+        self.user_id = user_id
+        self.profile: Optional[schemas.UserUpdate] = None
+        self.mixtures: list[schemas.MixtureIn] = []
+        self.ingredients: list[schemas.CustomIngredientIn] = []
+        self.logs: list[schemas.ExportLogEntry] = []
+        self.days: set = set()          # days cleared so far; rollups rebuilt at the end
+        self.names = {"mixture": [], "ingredient": []}     # indexed for search after the commit
+        self.counts = {"mixtures": 0, "ingredients": 0, "log_entries": 0}
+
+    def add(self, record: dict) -> None:
+        """Validate one record and queue it; raises ValueError or ValidationError."""
+        if not isinstance(record, dict):
+            raise ValueError("a record must be a JSON object")
+        record = {k: v for k, v in record.items() if v is not None and v != ""}
+        kind = record.pop("type", None)
+        if kind == "profile":
+            self.profile = schemas.UserUpdate.model_validate(
+                {key: value for key, value in record.items() if key in IMPORTED_PROFILE_FIELDS}
+            )
+        elif kind == "mixture":
+            self.mixtures.append(schemas.MixtureIn.model_validate(record))
+        elif kind == "ingredient":
+            self.ingredients.append(schemas.CustomIngredientIn.model_validate(record))
+        elif kind == "log":
+            self.logs.append(schemas.ExportLogEntry.model_validate(record))
+        else:
+            raise ValueError(f"unknown record type {kind!r}")
+
+    @property
+    def pending(self) -> int:
+        return len(self.mixtures) + len(self.ingredients) + len(self.logs)
+
+    def flush(self, db: Session) -> None:
+        if self.profile is not None:
+            values = self.profile.model_dump(exclude_unset=True, include=set(IMPORTED_PROFILE_FIELDS))
+            if values:
+                db.query(models.User).filter(models.User.id == self.user_id).update(values)
+        if self.mixtures:
+            upsert_mixtures(db, self.user_id, self.mixtures)
+            self.counts["mixtures"] += len(self.mixtures)
+            self.names["mixture"] += [m.name for m in self.mixtures]
+        if self.ingredients:
+            upsert_ingredients(db, self.user_id, self.ingredients)
+            self.counts["ingredients"] += len(self.ingredients)
+            self.names["ingredient"] += [i.name for i in self.ingredients]
+        if self.logs:
+            new_days = {entry.log_date for entry in self.logs} - self.days
+            if new_days:
+                # Lock before deleting, in date order, as replace_days does, so
+                # a concurrent delta can't interleave entries into these days
+                for log_date in sorted(new_days):
+                    lock_daily_summary(db, self.user_id, log_date)
+                db.query(models.FoodLog).filter(
+                    models.FoodLog.user_id == self.user_id,
+                    models.FoodLog.log_date.in_(new_days),
+                ).delete(synchronize_session=False)
+                self.days |= new_days
+            db.execute(insert(models.FoodLog), [
+                {
+                    "id": gen_uuid(),
+                    "user_id": self.user_id,
+                    "log_date": entry.log_date,
+                    "ingredient_name": entry.ingredient_name,
+                    "amount": entry.amount,
+                    "display_amount": entry.display_amount,
+                    "unit": entry.unit,
+                    "position": entry.position,
+                }
+                for entry in self.logs
+            ])
+            self.counts["log_entries"] += len(self.logs)
+        self.mixtures, self.ingredients, self.logs = [], [], []
+
+    def finish(self, db: Session) -> dict:
+        """Write what's left, rebuild the touched days' rollups and commit."""
+        self.flush(db)
+        for log_date in sorted(self.days):
+            refresh_daily_summary(db, self.user_id, log_date)
+        db.commit()
+        for source, names in self.names.items():
+            food_index.user_added(self.user_id, names, source)
+        return {**self.counts, "profile": self.profile is not None, "days": len(self.days)}
+
+
+async def _lines(request: Request) -> AsyncIterator[bytes]:
+    """The request body split into (undecoded) lines as it arrives."""
+    buf = b""
+    async for chunk in request.stream():
+        buf += chunk
+        *lines, buf = buf.split(b"\n")
+        if len(buf) > MAX_LINE:
+            raise HTTPException(status_code=413, detail=f"Import lines are limited to {MAX_LINE} bytes")
+        for line in lines:
+            yield line
+    if buf:
+        yield buf
+
+
+async def _decoded(request: Request) -> AsyncIterator[tuple[int, Union[str, UnicodeDecodeError]]]:
+    """(line number, text) pairs; a line that isn't UTF-8 comes back as the decode error."""
+    n = 0
+    async for line in _lines(request):
+        n += 1
+        try:
+            yield n, line.decode()
+        except UnicodeDecodeError as e:
+            yield n, e
+
+
+async def _parsed(request: Request, format: str) -> AsyncIterator[tuple[int, Union[dict, str]]]:
+    """(line number, record) pairs; parse failures come back as the error message."""
+    if format == "ndjson":
+        async for n, line in _decoded(request):
+            if isinstance(line, UnicodeDecodeError):
+                yield n, f"not UTF-8: {line}"
+            elif line.strip():
+                try:
+                    yield n, json.loads(line)
+                except ValueError as e:
+                    yield n, f"invalid JSON: {e}"
+        return
+
+    header, pending, start = None, "", 0
+    async for n, line in _decoded(request):
+        if isinstance(line, UnicodeDecodeError):
+            pending = ""    # can't tell where the broken record ends; the import is rejected anyway
+            yield n, f"not UTF-8: {line}"
+            continue
+        if not pending:
+            start = n
+        pending += line + "\n"
+        if pending.count('"') % 2:
+            if len(pending) > MAX_LINE:
+                raise HTTPException(status_code=413, detail=f"Import lines are limited to {MAX_LINE} bytes")
+            continue    # a quoted cell spans lines; wait for the rest
+        row, pending = next(csv.reader([pending])), ""
+        if header is None:
+            header = row
+            continue
+        if not any(row):
+            continue
+        record = dict(zip(header, row))
+        try:
+            for key in JSON_FIELDS:
+                if record.get(key):
+                    record[key] = json.loads(record[key])
+            yield n, record
+        except ValueError as e:
+            yield n, f"invalid JSON in CSV cell: {e}"
+    if pending:
+        yield start, "quoted cell is never closed"
+
+
+async def run_import(
+    request: Request,
+    user_id: str,
+    format: str,
+    call: Callable[[Callable[[Session], object]], Awaitable],
+) -> dict:
+    """
+    Stream-parse and apply an import. `call(fn)` runs fn(session) off the
+    event loop, so the sync and async routers can share this.
+    """
+    importer = Importer(user_id)
+    errors = []
+    async for n, record in _parsed(request, format):
+        try:
+            if isinstance(record, str):
+                raise ValueError(record)
+            importer.add(record)
+        except (ValueError, ValidationError) as e:
+            errors.append({"line": n, "detail": str(e)})
+            if len(errors) >= MAX_ERRORS:
+                break
+            continue
+        # Once anything is invalid the import will be rejected; just keep validating
+        if not errors and importer.pending >= BATCH:
+            await call(importer.flush)
+
+    if errors:
+        await call(lambda db: db.rollback())
+        raise HTTPException(status_code=422, detail={"message": "Import rejected", "errors": errors})
+    result = await call(importer.finish)
+    if importer.profile is not None:
+        invalidate_user(user_id)
+    return result
+
+
+@router.post("/import", response_model=schemas.ImportResult)
+async def import_account(
+    request: Request,
+    format: str = Depends(_format),
+    db: Session = Depends(get_db),
+    user_id: str = Depends(get_current_user_id),
+):
+    """
+    Apply an export (NDJSON or CSV) to this account in one transaction.
+    Records are validated as they stream in; any invalid record rejects the
+    whole import with 422 and the offending line numbers.
+    """
+    return await run_import(request, user_id, format, lambda fn: run_in_threadpool(fn, db))
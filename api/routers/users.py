@@ -1,16 +1,23 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.orm import Session
 
 from database import get_db
-from auth import get_current_user
-import models, schemas
+from auth import get_current_user, get_current_profile, get_current_user_id, cache_user, invalidate_user
+import etag, food_index, models, schemas
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.get("/me", response_model=schemas.UserOut)
-def get_me(current_user: models.User = Depends(get_current_user)):
-    return current_user
+def get_me(
+    request: Request,
+    response: Response,
+    profile: dict = Depends(get_current_profile),
+):
+    # The profile is already in memory, so its ETag is a hash of the body
+    if not_modified := etag.check(request, response, etag.of_content(profile)):
+        return not_modified
+    return profile
 
 
 @router.patch("/me", response_model=schemas.UserOut)
@@ -23,4 +30,16 @@ def update_me(
         setattr(current_user, field, value)
     db.commit()
     db.refresh(current_user)
-    return current_user
+    return cache_user(current_user)
+
+
+@router.delete("/me", status_code=204)
+def delete_me(
+    db: Session = Depends(get_db),
+    user_id: str = Depends(get_current_user_id),
+):
+    """Delete the account and, through ON DELETE CASCADE, all of its data."""
+    db.query(models.User).filter(models.User.id == user_id).delete()
+    db.commit()
+    invalidate_user(user_id)
+    food_index.forget_user(user_id)
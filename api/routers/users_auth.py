@@ -1,68 +1,88 @@
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
-from database import get_db
-import models, schemas, auth as auth_utils
+from config import get_settings
+from database import get_db_call
+import models, schemas, auth as auth_utils, hashing, http_client, jobs, mailer
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
-@router.post("/register", response_model=schemas.TokenResponse)
-def register(body: schemas.RegisterRequest, db: Session = Depends(get_db)):
-    if db.query(models.User).filter(models.User.email == body.email).first():
-        raise HTTPException(status_code=409, detail="Email already registered")
+# ── Email sign-in ─────────────────────────────────────────────────────────────
+# These handlers are async to await the bcrypt pool and the identity
+# providers; their database work goes through `call` (get_db_call), so it
+# never blocks the event loop and uses the engine DB_MODE selects.
+
+async def _hashing(fn, *args):
+    """Run a hashing call, answering 503 when the hash pool is shedding load."""
+    try:
+        return await fn(*args)
+    except hashing.Overloaded:
+        raise HTTPException(status_code=503, detail="Too many sign-in attempts, try again shortly")
+
+
+def _email_user(db: Session, email: str) -> Optional[models.User]:
+    return db.query(models.User).filter(
+        models.User.email == email,
+        models.User.provider == "email"
+    ).first()
+
+
+def _email_taken(db: Session, email: str) -> bool:
+    return db.query(models.User.id).filter(models.User.email == email).first() is not None
+
 
+def _create_email_user(db: Session, body: schemas.RegisterRequest, password_hash: str) -> models.User:
     user = models.User(
         email=body.email,
         display_name=body.display_name or body.email.split("@")[0],
-        password_hash=auth_utils.hash_password(body.password),
+        password_hash=password_hash,
         provider="email",
     )
     db.add(user)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Email already registered")
     db.refresh(user)
+    return user
+
+
+@router.post("/register", response_model=schemas.TokenResponse)
+async def register(body: schemas.RegisterRequest, call=Depends(get_db_call)):
+    if await call(_email_taken, body.email):
+        raise HTTPException(status_code=409, detail="Email already registered")
+
+    password_hash = await _hashing(hashing.hash_password_async, body.password)
+    user = await call(_create_email_user, body, password_hash)
 
     token = auth_utils.create_access_token(user.id)
     return {"access_token": token, "token_type": "bearer", "user": user}
 
 
 @router.post("/login", response_model=schemas.TokenResponse)
-def login(body: schemas.LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(
-        models.User.email == body.email,
-        models.User.provider == "email"
-    ).first()
+async def login(body: schemas.LoginRequest, call=Depends(get_db_call)):
+    user = await call(_email_user, body.email)
 
-    if not user or not auth_utils.verify_password(body.password, user.password_hash):
+    if not user or not await _hashing(hashing.verify_password_async, body.password, user.password_hash):
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
     token = auth_utils.create_access_token(user.id)
     return {"access_token": token, "token_type": "bearer", "user": user}
 
 
-@router.post("/social", response_model=schemas.TokenResponse)
-async def social_auth(body: schemas.SocialAuthRequest, db: Session = Depends(get_db)):
-    """
-    Exchange a Google or Apple ID token for a VegFuel JWT.
-    Creates a new user account on first login.
-    """
-    if body.provider == "google":
-        payload = await auth_utils.verify_google_token(body.id_token)
-        provider_id = payload["sub"]
-        email       = payload.get("email")
-        name        = payload.get("name")
-    elif body.provider == "apple":
-        payload = await auth_utils.verify_apple_token(body.id_token)
-        provider_id = payload["sub"]
-        email       = payload.get("email")   # only provided on first Apple login
-        name        = None
-    else:
-        raise HTTPException(status_code=400, detail="Unsupported provider")
-
+def _social_user(
+    db: Session, provider: str, provider_id: str, email: Optional[str], name: Optional[str],
+) -> models.User:
+    """The provider account's user, linking an email account or creating one on first login."""
     # Look up by provider + provider_id first (most reliable)
     user = db.query(models.User).filter(
-        models.User.provider == body.provider,
+        models.User.provider == provider,
         models.User.provider_id == provider_id,
     ).first()
 
@@ -70,16 +90,18 @@ async def social_auth(body: schemas.SocialAuthRequest, db: Session = Depends(get
         # Check if they registered with email first — link accounts
         user = db.query(models.User).filter(models.User.email == email).first()
         if user:
-            user.provider    = body.provider
+            user.provider    = provider
             user.provider_id = provider_id
             db.commit()
+            db.refresh(user)
+            auth_utils.invalidate_user(user.id)
 
     if not user:
         # New user — create account
         user = models.User(
             email=email,
             display_name=name or (email.split("@")[0] if email else "Athlete"),
-            provider=body.provider,
+            provider=provider,
             provider_id=provider_id,
         )
         db.add(user)
@@ -89,26 +111,46 @@ async def social_auth(body: schemas.SocialAuthRequest, db: Session = Depends(get
         except IntegrityError:
             db.rollback()
             raise HTTPException(status_code=409, detail="Account conflict")
+    return user
+
+
+@router.post("/social", response_model=schemas.TokenResponse)
+async def social_auth(body: schemas.SocialAuthRequest, call=Depends(get_db_call)):
+    """
+    Exchange a Google or Apple ID token for a VegFuel JWT.
+    Creates a new user account on first login.
+    """
+    if body.provider == "google":
+        payload = await auth_utils.verify_google_token(body.id_token)
+        provider_id = payload["sub"]
+        email       = payload.get("email")
+        name        = payload.get("name")
+    elif body.provider == "apple":
+        payload = await auth_utils.verify_apple_token(body.id_token)
+        provider_id = payload["sub"]
+        email       = payload.get("email")   # only provided on first Apple login
+        name        = None
+    else:
+        raise HTTPException(status_code=400, detail="Unsupported provider")
+
+    user = await call(_social_user, body.provider, provider_id, email, name)
 
     token = auth_utils.create_access_token(user.id)
     return {"access_token": token, "token_type": "bearer", "user": user}
 
 
-import os, secrets, resend
-
 @router.post("/google-callback", response_model=schemas.TokenResponse)
-async def google_callback(body: schemas.GoogleCallbackRequest, db: Session = Depends(get_db)):
+async def google_callback(body: schemas.GoogleCallbackRequest, call=Depends(get_db_call)):
     """Exchange Google OAuth authorization code for a VegFuel JWT."""
-    import httpx
+    settings = get_settings()
     # Exchange code for tokens
-    async with httpx.AsyncClient() as client:
-        token_resp = await client.post('https://oauth2.googleapis.com/token', data={
-            'code': body.code,
-            'client_id': os.environ.get('GOOGLE_CLIENT_ID', ''),
-            'client_secret': os.environ.get('GOOGLE_CLIENT_SECRET', ''),
-            'redirect_uri': body.redirect_uri,
-            'grant_type': 'authorization_code',
-        })
+    token_resp = await http_client.request('POST', 'https://oauth2.googleapis.com/token', data={
+        'code': body.code,
+        'client_id': settings.google_client_id,
+        'client_secret': settings.google_client_secret,
+        'redirect_uri': body.redirect_uri,
+        'grant_type': 'authorization_code',
+    })
     if token_resp.status_code != 200:
         raise HTTPException(status_code=400, detail='Failed to exchange Google code: ' + token_resp.text)
     tokens = token_resp.json()
@@ -122,91 +164,75 @@ async def google_callback(body: schemas.GoogleCallbackRequest, db: Session = Dep
     email = payload.get('email')
     name = payload.get('name')
 
-    user = db.query(models.User).filter(
-        models.User.provider == 'google',
-        models.User.provider_id == provider_id,
-    ).first()
-
-    if not user and email:
-        user = db.query(models.User).filter(models.User.email == email).first()
-        if user:
-            user.provider = 'google'
-            user.provider_id = provider_id
-            db.commit()
-
-    if not user:
-        user = models.User(
-            email=email,
-            display_name=name or (email.split('@')[0] if email else 'Athlete'),
-            provider='google',
-            provider_id=provider_id,
-        )
-        db.add(user)
-        try:
-            db.commit()
-            db.refresh(user)
-        except Exception:
-            db.rollback()
-            raise HTTPException(status_code=409, detail='Account conflict')
+    user = await call(_social_user, 'google', provider_id, email, name)
 
     token = auth_utils.create_access_token(user.id)
     return {'access_token': token, 'token_type': 'bearer', 'user': user}
 
-from datetime import datetime, timedelta, timezone
+
+def _queue_reset_email(db: Session, email: str) -> bool:
+    """Replace the email's reset token and queue the link; False if no such email user."""
+    if not _email_user(db, email):
+        return False
+    # Clean up old tokens for this email
+    db.query(models.PasswordResetToken).filter(
+        models.PasswordResetToken.email == email
+    ).delete()
+    token = secrets.token_urlsafe(32)
+    db_token = models.PasswordResetToken(
+        token=token,
+        email=email,
+        expires_at=datetime.now(timezone.utc) + timedelta(hours=1)
+    )
+    db.add(db_token)
+    reset_url = f"https://jborcher.github.io/vegfuel/?reset={token}"
+    # Sent by a background worker: the token and the email commit together
+    mailer.queue_email(
+        db,
+        to=email,
+        subject="Reset your VegFuel password",
+        html=f"""
+            <h2>🥦 VegFuel Password Reset</h2>
+            <p>Click the link below to reset your password. This link expires in 1 hour.</p>
+            <p><a href="{reset_url}" style="background:#2d8c4e;color:white;padding:12px 24px;border-radius:8px;text-decoration:none;font-weight:bold;">Reset Password</a></p>
+            <p>If you didn't request this, you can safely ignore this email.</p>
+        """,
+    )
+    db.commit()
+    return True
+
 
 @router.post("/forgot-password")
-async def forgot_password(body: schemas.PasswordResetRequest, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(
-        models.User.email == body.email,
-        models.User.provider == "email"
-    ).first()
+async def forgot_password(body: schemas.PasswordResetRequest, call=Depends(get_db_call)):
     # Always return success to prevent email enumeration
-    if user:
-        # Clean up old tokens for this email
-        db.query(models.PasswordResetToken).filter(
-            models.PasswordResetToken.email == body.email
-        ).delete()
-        token = secrets.token_urlsafe(32)
-        db_token = models.PasswordResetToken(
-            token=token,
-            email=body.email,
-            expires_at=datetime.now(timezone.utc) + timedelta(hours=1)
-        )
-        db.add(db_token)
-        db.commit()
-        reset_url = f"https://jborcher.github.io/vegfuel/?reset={token}"
-        resend.api_key = os.environ.get("RESEND_API_KEY", "")
-        resend.Emails.send({
-            "from": "VegFuel <onboarding@resend.dev>",
-            "to": body.email,
-            "subject": "Reset your VegFuel password",
-            "html": f"""
-                <h2>🥦 VegFuel Password Reset</h2>
-                <p>Click the link below to reset your password. This link expires in 1 hour.</p>
-                <p><a href="{reset_url}" style="background:#2d8c4e;color:white;padding:12px 24px;border-radius:8px;text-decoration:none;font-weight:bold;">Reset Password</a></p>
-                <p>If you didn't request this, you can safely ignore this email.</p>
-            """
-        })
+    if await call(_queue_reset_email, body.email):
+        jobs.notify()
     return {"message": "If that email exists, a reset link has been sent."}
 
 
-@router.post("/reset-password")
-async def reset_password(body: schemas.PasswordResetConfirm, db: Session = Depends(get_db)):
+def _reset_target(db: Session, token: str) -> tuple[models.PasswordResetToken, models.User]:
     entry = db.query(models.PasswordResetToken).filter(
-        models.PasswordResetToken.token == body.token,
+        models.PasswordResetToken.token == token,
         models.PasswordResetToken.used == False
     ).first()
     if not entry or datetime.now(timezone.utc) > entry.expires_at.replace(tzinfo=timezone.utc):
         raise HTTPException(status_code=400, detail="Invalid or expired reset token")
-    
-    user = db.query(models.User).filter(
-        models.User.email == entry.email,
-        models.User.provider == "email"
-    ).first()
+
+    user = _email_user(db, entry.email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    
-    user.password_hash = auth_utils.hash_password(body.new_password)
+    return entry, user
+
+
+def _apply_reset(db: Session, entry: models.PasswordResetToken, user: models.User, password_hash: str) -> None:
+    user.password_hash = password_hash
     entry.used = True
     db.commit()
+
+
+@router.post("/reset-password")
+async def reset_password(body: schemas.PasswordResetConfirm, call=Depends(get_db_call)):
+    entry, user = await call(_reset_target, body.token)
+    password_hash = await _hashing(hashing.hash_password_async, body.new_password)
+    await call(_apply_reset, entry, user, password_hash)
     return {"message": "Password reset successfully"}
@@ -109,6 +109,28 @@ class LogEntryOut(BaseModel):
 class LogDay(BaseModel):
     log_date: date
     entries: list[LogEntryOut]
+    version: Optional[int] = None     # day version, the base for delta sync
+    totals: Optional[dict[str, float]] = None   # with ?totals=true: nutrients summed over the day
+
+
+class LogRange(BaseModel):
+    """A page of days from a date-range query. Pass next_cursor back as ?cursor= to continue."""
+    days: list[LogDay]
+    next_cursor: Optional[date] = None
+
+
+class DaySummary(BaseModel):
+    log_date: date
+    entry_count: int
+    cal: float
+    protein: float
+    carbs: float
+    fat: float
+    fiber: float
+    micros: dict[str, float]
+
+    class Config:
+        from_attributes = True
 
 
 class BulkSyncRequest(BaseModel):
@@ -117,6 +139,26 @@ class BulkSyncRequest(BaseModel):
     entries: list[LogEntryIn]
 
 
+class LogEntryDelta(LogEntryIn):
+    id: str                           # required: deltas address entries by ID
+
+
+class DeltaSyncRequest(BaseModel):
+    """
+    Only what changed in a day since `base_version`. The server rejects the
+    delta with 409 if the day has moved on; the client then does a full sync.
+    """
+    log_date: date
+    base_version: int
+    upserts: list[LogEntryDelta] = []
+    removed: list[str] = []
+
+
+class DeltaSyncResult(BaseModel):
+    log_date: date
+    version: int
+
+
 # ── Mixtures ──────────────────────────────────────────────────────────────────
 
 class MixtureIn(BaseModel):
@@ -155,3 +197,66 @@ class CustomIngredientOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+# ── Food search ───────────────────────────────────────────────────────────────
+
+class FoodMatch(BaseModel):
+    name: str
+    source: str               # builtin | usda | ingredient | mixture
+
+
+class UsdaFood(BaseModel):
+    fdc_id: Optional[int] = None
+    name: str                 # USDA description
+    nutrition: dict[str, float]   # per 100 g, in our nutrient keys
+
+
+# ── Batch sync ────────────────────────────────────────────────────────────────
+
+class BatchSyncRequest(BaseModel):
+    """Everything an offline client has queued, applied in one transaction."""
+    logs: list[BulkSyncRequest] = []
+    mixtures: list[MixtureIn] = []
+    ingredients: list[CustomIngredientIn] = []
+    deleted_mixtures: list[str] = []       # mixture IDs
+    deleted_ingredients: list[str] = []    # custom ingredient IDs
+
+
+class BatchItemResult(BaseModel):
+    kind: str                 # log | mixture | ingredient | mixture_delete | ingredient_delete
+    key: str                  # date, name or ID as sent by the client
+    status: str               # ok | not_found
+    id: Optional[str] = None
+    version: Optional[int] = None
+
+
+class BatchSyncResult(BaseModel):
+    results: list[BatchItemResult]
+
+
+# ── Bootstrap ─────────────────────────────────────────────────────────────────
+
+class Bootstrap(BaseModel):
+    """Everything the client needs after sign-in, in one response."""
+    user: UserOut
+    log: LogDay
+    mixtures: list[MixtureOut]
+    ingredients: list[CustomIngredientOut]
+    summaries: list[DaySummary] = []     # the `summary_days` days before `date`, oldest first
+    etags: dict[str, str]                # per-resource ETags, for revalidating pieces later
+
+
+# ── Export / import ───────────────────────────────────────────────────────────
+
+class ExportLogEntry(LogEntryIn):
+    """One `log` record of an export; imported entries always get new IDs."""
+    log_date: date
+
+
+class ImportResult(BaseModel):
+    profile: bool                     # whether a profile record was applied
+    mixtures: int
+    ingredients: int
+    log_entries: int
+    days: int                         # days replaced by the import
@@ -0,0 +1,34 @@
+"""
+Rebuild daily_summaries from food_logs for every user.
+
+Needed once after deploying rollups, since days logged before then have no
+summary row. Safe to re-run. From the api/ directory:
+
+    python -m scripts.backfill_summaries
+"""
+from database import SessionLocal
+from nutrition import refresh_daily_summary
+import models
+
+
+def main():
+    db = SessionLocal()
+    try:
+        days = (
+            db.query(models.FoodLog.user_id, models.FoodLog.log_date)
+            .distinct()
+            .order_by(models.FoodLog.user_id, models.FoodLog.log_date)
+            .all()
+        )
+        for i, (user_id, log_date) in enumerate(days, 1):
+            refresh_daily_summary(db, user_id, log_date)
+            if i % 500 == 0:
+                db.commit()
+        db.commit()
+        print(f"Rebuilt {len(days)} daily summaries")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Streamed list responses for collections too big to build in memory.
+
+Rows come from a server-side cursor (yield_per) in batches and each batch
+is encoded and sent before the next is fetched, so a request holds about
+one batch no matter how large the collection is. The body is either NDJSON
+(one object per line, when the client sends Accept: application/x-ndjson)
+or an ordinary JSON array sent in chunks.
+
+The stream runs after the request's session has been closed, so it reads
+through a session of its own, on whichever engine DB_MODE selects.
+"""
+from typing import AsyncIterator
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+
+from config import get_settings
+from database import stream_partitions
+import fastjson
+
+NDJSON = "application/x-ndjson"
+BATCH  = 500
+
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON in request.headers.get("accept", "")
+
+
+def threshold() -> int:
+    """Collections with more rows than this are streamed instead of built in memory."""
+    return get_settings().stream_threshold
+
+
+async def _chunks(stmt: Select, ndjson: bool) -> AsyncIterator[bytes]:
+    if not ndjson:
+        yield b"["
+    first = True
+    async for rows in stream_partitions(stmt, BATCH):
+        if ndjson:
+            yield b"".join(fastjson.dumps(row._asdict()) + b"\n" for row in rows)
+        else:
+            chunk = b",".join(fastjson.dumps(row._asdict()) for row in rows)
+            yield chunk if first else b"," + chunk
+            first = False
+    if not ndjson:
+        yield b"]"
+
+
+def respond(request: Request, response: Response, stmt: Select) -> StreamingResponse:
+    """
+    Stream `stmt`'s rows (select plain columns, with fastjson.raw for JSON
+    columns), keeping headers already set on `response`.
+    """
+    ndjson = wants_ndjson(request)
+    return StreamingResponse(
+        _chunks(stmt, ndjson),
+        media_type=NDJSON if ndjson else "application/json",
+        headers=dict(response.headers),
+    )
@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pytest
+
+# Tests import the app's flat modules the way main.py does, from api/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Required settings; nothing here connects to them
+os.environ.setdefault("SUPABASE_URL", "http://supabase.invalid")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "test")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    """A fresh in-memory SQLite database behind database.SessionLocal()."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import StaticPool
+    import database, models   # models registers the tables on Base
+
+    # One shared connection, so worker threads see the same in-memory database
+    test_engine = create_engine(
+        "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False},
+    )
+    for hook in database.engine_hooks:
+        hook(test_engine)
+    database.Base.metadata.create_all(bind=test_engine)
+    monkeypatch.setattr(database, "_engine", test_engine)
+    database._session_factory.configure(bind=test_engine)
+    yield test_engine
+    test_engine.dispose()
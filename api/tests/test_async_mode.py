@@ -0,0 +1,62 @@
+"""
+With DB_MODE=async, the work outside the data routers (streamed bodies,
+account export, helper sessions) runs on the async engine and never builds
+the sync one, so a process keeps a single connection pool.
+"""
+import asyncio
+from datetime import date
+
+import orjson
+import pytest
+from fastapi import Response
+from sqlalchemy import select
+from starlette.requests import Request
+
+import database, models, streaming
+from routers import transfer
+
+
+@pytest.fixture
+def async_mode(tmp_path, monkeypatch):
+    monkeypatch.setattr(database.settings, "db_mode", "async")
+    monkeypatch.setattr(database.settings, "database_url", f"sqlite:///{tmp_path / 'async.db'}")
+    monkeypatch.setattr(database, "_engine", None)
+    monkeypatch.setattr(database, "_async_engine", None)
+    monkeypatch.setattr(database, "_AsyncSessionLocal", None)
+    yield
+    if database._async_engine is not None:
+        asyncio.run(database._async_engine.dispose())
+
+
+def _seed(db) -> None:
+    db.add(models.User(id="runner", email="runner@example.com", provider="email"))
+    db.add_all([
+        models.FoodLog(id=f"e{i}", user_id="runner", log_date=date(2026, 3, 1), ingredient_name="tofu",
+                       amount=100, display_amount=100, unit="g", position=i)
+        for i in range(7)
+    ])
+    db.commit()
+
+
+async def _body(response) -> bytes:
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
+def test_streams_and_export_use_only_the_async_engine(async_mode, monkeypatch):
+    monkeypatch.setattr(streaming, "BATCH", 3)
+    monkeypatch.setattr(transfer, "BATCH", 3)
+    request = Request({"type": "http", "method": "GET", "headers": [], "query_string": b""})
+    stmt = select(models.FoodLog.id, models.FoodLog.position).order_by(models.FoodLog.position)
+
+    async def run():
+        await database.create_all()
+        await database.run_in_session(_seed)
+        streamed = await _body(streaming.respond(request, Response(), stmt))
+        exported = await _body(transfer.export_response("runner", {"email": "runner@example.com"}, "ndjson"))
+        return streamed, exported
+
+    streamed, exported = asyncio.run(run())
+    assert [row["id"] for row in orjson.loads(streamed)] == [f"e{i}" for i in range(7)]
+    records = [orjson.loads(line) for line in exported.splitlines()]
+    assert [record["type"] for record in records] == ["profile"] + ["log"] * 7
+    assert database._engine is None
@@ -0,0 +1,71 @@
+"""
+The hash pool's counters, load shedding and metrics, on a thread pool
+standing in for the worker processes: a hash that raises counts as failed,
+not completed, a full queue raises Overloaded, which sign-in answers as
+503, and /metrics exports the pool's load.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+
+import hashing, schemas
+from routers import users_auth
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(hashing, "_executor", executor)
+    monkeypatch.setattr(hashing, "_slots", asyncio.Semaphore(1))
+    monkeypatch.setattr(hashing, "_stats", dict.fromkeys(hashing._stats, 0))
+    yield
+    executor.shutdown(wait=True)
+
+
+def _broken(*args):
+    raise ValueError("malformed hash")
+
+
+def test_counts_completed_and_failed_hashes(pool):
+    assert asyncio.run(hashing._run(str.upper, "pw")) == "PW"
+    with pytest.raises(ValueError):
+        asyncio.run(hashing._run(_broken, "pw"))
+    stats = hashing.stats()
+    assert (stats["completed"], stats["failed"], stats["in_flight"]) == (1, 1, 0)
+
+
+def test_full_queue_is_shed(pool, monkeypatch):
+    monkeypatch.setattr(hashing.get_settings(), "password_hash_max_waiting", 0)
+    with pytest.raises(hashing.Overloaded):
+        asyncio.run(hashing.hash_password_async("pw"))
+    assert hashing.stats()["rejected"] == 1
+
+
+def test_register_answers_503_when_shedding(pool, monkeypatch):
+    async def overloaded(*args):
+        raise hashing.Overloaded()
+
+    async def call(fn, *args):
+        return False    # the email is free
+
+    monkeypatch.setattr(hashing, "hash_password_async", overloaded)
+    body = schemas.RegisterRequest(email="runner@example.com", password="correct horse battery")
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(users_auth.register(body, call))
+    assert exc.value.status_code == 503
+
+
+def test_pool_load_is_exported(pool):
+    import metrics
+
+    hashing._stats.update(in_flight=2, waiting=5, rejected=3)
+    samples = {
+        (sample.name, sample.labels.get("outcome")): sample.value
+        for family in metrics._RuntimeCollector().collect() for sample in family.samples
+    }
+    assert samples[("vegfuel_password_hash_in_flight", None)] == 2
+    assert samples[("vegfuel_password_hash_waiting", None)] == 5
+    assert samples[("vegfuel_password_hashes_total", "rejected")] == 3
+    assert samples[("vegfuel_password_hashes_total", "failed")] == 0
@@ -0,0 +1,75 @@
+"""
+Idempotency-Key replay through the middleware: a retried write runs once,
+a token for a deleted user gets the endpoint's 401, and a slow request
+keeps its key past the initial lease.
+"""
+import asyncio
+from datetime import timedelta
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+import database, idempotency, models
+from auth import create_access_token, get_current_user_id
+
+
+@pytest.fixture
+def app(engine) -> FastAPI:
+    db = database.SessionLocal()
+    db.add(models.User(id="runner", email="runner@example.com", provider="email"))
+    db.commit()
+    db.close()
+
+    app = FastAPI()
+    app.add_middleware(idempotency.IdempotencyMiddleware)
+    app.state.calls = 0
+    app.state.takeover = None
+
+    @app.post("/things")
+    def create_thing(user_id: str = Depends(get_current_user_id)):
+        app.state.calls += 1
+        return {"n": app.state.calls}
+
+    @app.post("/slow")
+    async def slow_import(user_id: str = Depends(get_current_user_id)):
+        await asyncio.sleep(idempotency.LEASE.total_seconds() * 2)
+        # A retry reaching another process now must not take the key over
+        app.state.takeover = await database.run_in_session(idempotency._claim, (user_id, "slow-key"))
+        return {"ok": True}
+
+    return app
+
+
+def _headers(key: str, user_id: str = "runner") -> dict:
+    return {"Authorization": f"Bearer {create_access_token(user_id)}", "Idempotency-Key": key}
+
+
+def test_retry_is_replayed(app):
+    client = TestClient(app)
+    first = client.post("/things", json={"a": 1}, headers=_headers("k1"))
+    again = client.post("/things", json={"a": 1}, headers=_headers("k1"))
+    assert first.json() == again.json() == {"n": 1}
+    assert again.headers["idempotent-replayed"] == "true"
+    assert app.state.calls == 1
+
+
+def test_key_reused_for_another_request(app):
+    client = TestClient(app)
+    client.post("/things", json={"a": 1}, headers=_headers("k1"))
+    assert client.post("/things", json={"a": 2}, headers=_headers("k1")).status_code == 422
+
+
+def test_deleted_user_gets_401(app):
+    client = TestClient(app, raise_server_exceptions=False)
+    resp = client.post("/things", json={}, headers=_headers("k1", user_id="deleted-user"))
+    assert resp.status_code == 401
+    assert app.state.calls == 0
+
+
+def test_running_request_renews_its_lease(app, monkeypatch):
+    monkeypatch.setattr(idempotency, "LEASE", timedelta(seconds=0.3))
+    monkeypatch.setattr(idempotency, "RENEW_SECONDS", 0.05)
+    resp = TestClient(app).post("/slow", headers=_headers("slow-key"))
+    assert resp.status_code == 200
+    assert app.state.takeover == {"status": "in_progress"}
@@ -0,0 +1,170 @@
+"""
+The outbox worker against a stub email sender: a sent job is removed, a
+failed one is retried with exponential backoff until it runs out of
+attempts, outcomes are exported to /metrics, and forgot-password only
+queues the email.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import database, jobs, mailer, models, schemas
+from routers import users_auth
+
+
+class StubSender:
+    """Stands in for mailer.send_email; fails while `failing` is set."""
+
+    def __init__(self):
+        self.sent = []
+        self.failing = False
+
+    async def send(self, to: str, subject: str, html: str) -> None:
+        if self.failing:
+            raise ConnectionError("mail server unavailable")
+        self.sent.append((to, subject))
+
+
+@pytest.fixture
+def sender(engine, monkeypatch) -> StubSender:
+    stub = StubSender()
+    monkeypatch.setattr(mailer, "send_email", stub.send)
+    monkeypatch.setattr(jobs, "_stats", {"succeeded": 0, "failed": 0, "dead": 0})
+    return stub
+
+
+def _queue(max_attempts: int = 6) -> str:
+    db = database.SessionLocal()
+    try:
+        jobs.enqueue(db, "email", {"to": "a@example.com", "subject": "Hi", "html": "<p>Hi</p>"},
+                     max_attempts=max_attempts)
+        db.commit()
+        return db.query(models.OutboxJob.id).scalar()
+    finally:
+        db.close()
+
+
+def _job(job_id: str) -> models.OutboxJob:
+    db = database.SessionLocal()
+    try:
+        return db.get(models.OutboxJob, job_id)
+    finally:
+        db.close()
+
+
+def _make_due(job_id: str) -> None:
+    """Skip the backoff wait so the next run picks the job up."""
+    db = database.SessionLocal()
+    try:
+        db.get(models.OutboxJob, job_id).run_after = datetime(2000, 1, 1, tzinfo=timezone.utc)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _delay(job: models.OutboxJob) -> timedelta:
+    """How far in the future the job is scheduled (SQLite hands back naive UTC)."""
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return job.run_after.replace(tzinfo=None) - now
+
+
+# ── Worker ────────────────────────────────────────────────────────────────────
+
+def test_sent_job_is_done(sender):
+    job_id = _queue()
+    assert asyncio.run(jobs._run_one()) is True
+    assert sender.sent == [("a@example.com", "Hi")]
+    assert _job(job_id) is None
+    assert jobs.stats()["succeeded"] == 1
+
+
+def test_nothing_due(sender):
+    assert asyncio.run(jobs._run_one()) is False
+
+
+def test_failure_backs_off_exponentially(sender):
+    sender.failing = True
+    job_id = _queue()
+
+    asyncio.run(jobs._run_one())
+    job = _job(job_id)
+    assert (job.status, job.attempts) == ("pending", 1)
+    assert "mail server unavailable" in job.last_error
+    assert abs(_delay(job) - jobs.BACKOFF_BASE) < timedelta(seconds=2)
+
+    _make_due(job_id)
+    asyncio.run(jobs._run_one())
+    job = _job(job_id)
+    assert job.attempts == 2
+    assert abs(_delay(job) - 2 * jobs.BACKOFF_BASE) < timedelta(seconds=2)
+
+    # Not due yet, so the worker leaves it alone
+    assert asyncio.run(jobs._run_one()) is False
+    assert jobs.stats()["failed"] == 2
+
+
+def test_attempt_limit_parks_job_as_dead(sender):
+    sender.failing = True
+    job_id = _queue(max_attempts=2)
+
+    asyncio.run(jobs._run_one())
+    _make_due(job_id)
+    asyncio.run(jobs._run_one())
+
+    job = _job(job_id)
+    assert (job.status, job.attempts) == ("dead", 2)
+    assert asyncio.run(jobs._run_one()) is False
+    assert jobs.stats()["dead"] == 1
+    assert sender.sent == []
+
+
+
+def test_outcomes_are_exported(sender):
+    import metrics
+
+    sender.failing = True
+    _queue()
+    asyncio.run(jobs._run_one())
+    samples = {
+        (sample.name, sample.labels.get("outcome")): sample.value
+        for family in metrics._RuntimeCollector().collect() for sample in family.samples
+    }
+    assert samples[("vegfuel_jobs_total", "failed")] == 1
+    assert samples[("vegfuel_jobs_total", "succeeded")] == 0
+
+
+# ── Forgot password ───────────────────────────────────────────────────────────
+
+def test_forgot_password_only_queues_the_email(sender):
+    db = database.SessionLocal()
+    try:
+        db.add(models.User(email="runner@example.com", provider="email"))
+        db.commit()
+    finally:
+        db.close()
+    body = schemas.PasswordResetRequest(email="runner@example.com")
+    asyncio.run(users_auth.forgot_password(body, database.run_in_session))
+
+    assert sender.sent == []
+    db = database.SessionLocal()
+    try:
+        job = db.query(models.OutboxJob).one()
+        assert job.payload["to"] == "runner@example.com"
+        assert db.query(models.PasswordResetToken).filter_by(email="runner@example.com").count() == 1
+    finally:
+        db.close()
+
+    asyncio.run(jobs._run_one())
+    assert sender.sent == [("runner@example.com", "Reset your VegFuel password")]
+
+
+def test_forgot_password_unknown_email(sender):
+    db = database.SessionLocal()
+    try:
+        body = schemas.PasswordResetRequest(email="nobody@example.com")
+        result = asyncio.run(users_auth.forgot_password(body, database.run_in_session))
+        assert "reset link" in result["message"]
+        assert db.query(models.OutboxJob).count() == 0
+    finally:
+        db.close()
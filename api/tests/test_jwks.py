@@ -0,0 +1,144 @@
+"""
+Google ID-token verification against a fake JWKS endpoint: signature, kid,
+expiry and audience are all checked locally, and a malformed key in the set
+doesn't break the others.
+"""
+import asyncio
+import time
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+from jose import jwk, jwt
+
+import auth
+import http_client
+from jwks import JWKSCache
+
+CLIENT_ID = "test-client.apps.googleusercontent.com"
+CERTS_URL = "https://certs.test/oauth2/v3/certs"
+
+
+def _private_pem() -> bytes:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption(),
+    )
+
+
+SIGNING_KEY = _private_pem()
+OTHER_KEY   = _private_pem()
+
+
+def _public_jwk(pem: bytes, kid: str) -> dict:
+    public = jwk.construct(pem, algorithm="RS256").public_key().to_dict()
+    return {**public, "kid": kid, "use": "sig"}
+
+
+def _token(pem: bytes = SIGNING_KEY, kid: str = "key-1", **claims) -> str:
+    now = int(time.time())
+    payload = {
+        "iss": "https://accounts.google.com",
+        "aud": CLIENT_ID,
+        "sub": "google-user-1",
+        "email": "someone@example.com",
+        "iat": now,
+        "exp": now + 3600,
+        **claims,
+    }
+    return jwt.encode(payload, pem, algorithm="RS256", headers={"kid": kid})
+
+
+class FakeCerts:
+    """Stands in for Google's certs endpoint."""
+
+    def __init__(self):
+        self.keys = [_public_jwk(SIGNING_KEY, "key-1")]
+        self.fetches = 0
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        self.fetches += 1
+        return httpx.Response(
+            200,
+            json={"keys": self.keys},
+            headers={"cache-control": "public, max-age=3600"},
+            request=httpx.Request(method, url),
+        )
+
+
+@pytest.fixture
+def certs(monkeypatch) -> FakeCerts:
+    fake = FakeCerts()
+    monkeypatch.setattr(http_client, "request", fake.request)
+    monkeypatch.setattr(auth, "google_keys", JWKSCache(CERTS_URL))
+    monkeypatch.setattr(auth.settings, "google_client_id", CLIENT_ID)
+    return fake
+
+
+def _verify(token: str) -> dict:
+    return asyncio.run(auth.verify_google_token(token))
+
+
+def _rejected(token: str) -> HTTPException:
+    with pytest.raises(HTTPException) as exc:
+        _verify(token)
+    return exc.value
+
+
+# ── Accepted ──────────────────────────────────────────────────────────────────
+
+def test_valid_token(certs):
+    payload = _verify(_token())
+    assert payload["sub"] == "google-user-1"
+    assert payload["email"] == "someone@example.com"
+
+
+def test_keys_are_cached(certs):
+    async def twice():
+        await auth.verify_google_token(_token())
+        await auth.verify_google_token(_token())
+
+    asyncio.run(twice())
+    assert certs.fetches == 1
+
+
+@pytest.mark.parametrize("bad_key", [
+    {"kty": "EC", "kid": "wrong-type", "alg": "RS256"},
+    {"kty": "RSA", "kid": "bad-modulus", "alg": "RS256", "n": "!!", "e": "AQAB"},
+    {"kty": "RSA", "kid": "no-modulus", "alg": "RS256", "e": "AQAB"},
+    {"kty": "RSA", "alg": "RS256", "n": "AQAB", "e": "AQAB"},
+])
+def test_malformed_key_is_skipped(certs, bad_key):
+    certs.keys.insert(0, bad_key)
+    assert _verify(_token())["sub"] == "google-user-1"
+
+
+# ── Rejected ──────────────────────────────────────────────────────────────────
+
+def test_wrong_signature(certs):
+    assert _rejected(_token(pem=OTHER_KEY)).status_code == 401
+
+
+def test_unknown_kid(certs):
+    assert _rejected(_token(kid="key-2")).status_code == 401
+
+
+def test_expired(certs):
+    now = int(time.time())
+    assert _rejected(_token(iat=now - 7200, exp=now - 3600)).status_code == 401
+
+
+def test_wrong_audience(certs):
+    assert _rejected(_token(aud="someone-elses-app")).status_code == 401
+
+
+def test_wrong_issuer(certs):
+    assert _rejected(_token(iss="https://evil.example.com")).status_code == 401
+
+
+def test_refused_without_client_id(certs, monkeypatch):
+    monkeypatch.setattr(auth.settings, "google_client_id", "")
+    assert _rejected(_token()).status_code == 503
+    assert certs.fetches == 0
@@ -0,0 +1,126 @@
+"""
+Daily rollups stay equal to a full recount of the day as entries are
+synced and deleted, even after the nutrition of a logged mixture changes.
+"""
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+
+import database, models, schemas
+from nutrition import refresh_daily_summary
+from routers import logs, mixtures
+
+DAY = date(2026, 3, 1)
+
+
+@pytest.fixture
+def db(engine):
+    session = database.SessionLocal()
+    user = models.User(id="runner", email="runner@example.com", provider="email")
+    session.add(user)
+    session.commit()
+    yield session
+    session.close()
+
+
+def _entry(name: str, amount: float, entry_id: str) -> schemas.LogEntryIn:
+    return schemas.LogEntryIn(id=entry_id, ingredient_name=name, amount=amount, display_amount=amount, unit="g")
+
+
+def _summary(db) -> models.DailySummary:
+    return db.query(models.DailySummary).filter_by(user_id="runner", log_date=DAY).populate_existing().one()
+
+
+def _recounted(db) -> dict:
+    """The day's totals as a full refresh computes them (rolled back afterwards)."""
+    with db.begin_nested() as savepoint:
+        refresh_daily_summary(db, "runner", DAY)
+        summary = _summary(db)
+        totals = {"cal": summary.cal, "protein": summary.protein, "entry_count": summary.entry_count}
+        savepoint.rollback()
+    return totals
+
+
+def test_delete_entry_updates_the_rollup(db):
+    logs.sync_log(schemas.BulkSyncRequest(log_date=DAY, entries=[
+        _entry("tofu", 150, "e1"), _entry("oats", 80, "e2"), _entry("lentils", 200, "e3"),
+    ]), db=db, user_id="runner")
+    version = _summary(db).version
+
+    logs.delete_entry(log_date=DAY, entry_id="e2", db=db, user_id="runner")
+
+    summary = _summary(db)
+    assert summary.version == version + 1
+    assert summary.entry_count == 2
+    assert summary.cal > 0
+    expected = _recounted(db)
+    assert summary.cal == pytest.approx(expected["cal"])
+    assert summary.protein == pytest.approx(expected["protein"])
+
+
+def _log_shake_then_edit_it(db) -> None:
+    """Log a mixture and tofu, then change the mixture's nutrition."""
+    def shake(cal: float) -> schemas.MixtureIn:
+        return schemas.MixtureIn(name="shake", yield_g=100, per100g={"cal": cal},
+                                 ingredients=[{"name": "oats", "amount": 100}])
+
+    mixtures.create_mixture(shake(300), db=db, user_id="runner")
+    logs.sync_log(schemas.BulkSyncRequest(log_date=DAY, entries=[
+        _entry("shake", 100, "e1"), _entry("tofu", 100, "e2"),
+    ]), db=db, user_id="runner")
+    mixtures.create_mixture(shake(100), db=db, user_id="runner")
+
+
+def test_delete_after_a_mixture_edit_matches_a_recount(db):
+    _log_shake_then_edit_it(db)
+
+    logs.delete_entry(log_date=DAY, entry_id="e1", db=db, user_id="runner")
+
+    summary = _summary(db)
+    assert summary.entry_count == 1
+    assert summary.cal == pytest.approx(_recounted(db)["cal"])
+
+
+def test_delta_after_a_mixture_edit_matches_a_recount(db):
+    _log_shake_then_edit_it(db)
+    version = _summary(db).version
+
+    result = logs.sync_log_delta(schemas.DeltaSyncRequest(
+        log_date=DAY, base_version=version, removed=["e1"],
+        upserts=[schemas.LogEntryDelta(**_entry("tofu", 200, "e2").model_dump()),
+                 schemas.LogEntryDelta(**_entry("shake", 50, "e3").model_dump())],
+    ), db=db, user_id="runner")
+
+    summary = _summary(db)
+    assert result["version"] == summary.version == version + 1
+    assert summary.entry_count == 2
+    assert summary.cal == pytest.approx(_recounted(db)["cal"])
+
+
+def test_delete_last_entry_leaves_an_empty_day(db):
+    logs.sync_log(schemas.BulkSyncRequest(log_date=DAY, entries=[_entry("tofu", 150, "e1")]),
+                  db=db, user_id="runner")
+    logs.delete_entry(log_date=DAY, entry_id="e1", db=db, user_id="runner")
+    summary = _summary(db)
+    assert (summary.entry_count, summary.cal) == (0, 0)
+
+
+def test_delete_before_any_rollup_recounts(db):
+    # Entries written before rollups existed have no summary row yet
+    db.add_all([
+        models.FoodLog(id=i, user_id="runner", log_date=DAY, ingredient_name="tofu",
+                       amount=100, display_amount=100, unit="g")
+        for i in ("old1", "old2")
+    ])
+    db.commit()
+    logs.delete_entry(log_date=DAY, entry_id="old1", db=db, user_id="runner")
+    summary = _summary(db)
+    assert (summary.version, summary.entry_count) == (1, 1)
+    assert summary.cal == pytest.approx(_recounted(db)["cal"])
+
+
+def test_delete_unknown_entry(db):
+    with pytest.raises(HTTPException) as exc:
+        logs.delete_entry(log_date=DAY, entry_id="missing", db=db, user_id="runner")
+    assert exc.value.status_code == 404
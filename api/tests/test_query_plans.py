@@ -0,0 +1,171 @@
+"""
+No query on the hot read/write paths may scan a table without using an index.
+
+Runs the log, mixture, ingredient and bootstrap handlers against a seeded
+user on Postgres, captures every SQL statement they send, and EXPLAINs each
+one with `enable_seqscan = off`, so a Seq Scan in a plan means no usable
+index exists, not that the table is merely small. With sequential scans
+off, Postgres walks a whole unrelated index instead, so an index scan whose
+condition skips the index's leading column counts as a regression too.
+Everything happens in one transaction that is rolled back. Needs a scratch
+Postgres database, e.g. one that `alembic upgrade head` has just run against:
+
+    TEST_DATABASE_URL=postgresql://localhost/vegfuel_test python -m pytest tests/test_query_plans.py
+"""
+import os
+import re
+from datetime import date, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session
+from starlette.requests import Request
+from starlette.responses import Response
+
+import models, schemas
+
+DATABASE_URL = os.environ.get("TEST_DATABASE_URL", "")
+
+pytestmark = pytest.mark.skipif(
+    not DATABASE_URL.startswith("postgres"), reason="needs a Postgres TEST_DATABASE_URL",
+)
+
+HOT_TABLES  = ("food_logs", "mixtures", "custom_ingredients", "users")
+EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE")
+SEED_DAYS   = 30
+
+INDEX_SCAN = re.compile(r"(?:Index Scan|Index Only Scan) using (\S+)|Bitmap Index Scan on (\S+)")
+
+
+def _request() -> Request:
+    return Request({"type": "http", "method": "GET", "headers": [], "query_string": b""})
+
+
+def _seed(db: Session, user_id: str) -> list[date]:
+    """A month of logs, plus a mixture and an ingredient, written through the handlers."""
+    from routers import logs, mixtures, ingredients
+
+    today = date.today()
+    days = [today - timedelta(days=i) for i in range(SEED_DAYS)]
+    for day in days:
+        logs.sync_log(body=schemas.BulkSyncRequest(log_date=day, entries=[
+            schemas.LogEntryIn(ingredient_name=name, amount=100, display_amount=100, unit="g", position=i)
+            for i, name in enumerate(["tofu", "oats", "lentils"])
+        ]), db=db, user_id=user_id)
+    mixtures.create_mixture(body=schemas.MixtureIn(
+        name="plan check mix", yield_g=200, per100g={"cal": 100},
+        ingredients=[{"name": "oats", "amount": 200}],
+    ), db=db, user_id=user_id)
+    ingredients.create_ingredient(body=schemas.CustomIngredientIn(
+        name="plan check food", nutrition={"cal": 50},
+    ), db=db, user_id=user_id)
+    return days
+
+
+def _exercise(db: Session, user_id: str, days: list[date]) -> None:
+    """Call the read paths the way their routes would."""
+    from routers import logs, mixtures, ingredients, bootstrap
+
+    today = days[0]
+    logs.get_log(log_date=today, request=_request(), response=Response(), db=db, user_id=user_id)
+    logs.get_log_range(from_date=days[-1], to_date=today, cursor=None, limit=31, db=db, user_id=user_id)
+    logs.get_summary(from_date=days[-1], to_date=today, db=db, user_id=user_id)
+    mixtures.list_mixtures(request=_request(), response=Response(), db=db, user_id=user_id)
+    ingredients.list_ingredients(request=_request(), response=Response(), db=db, user_id=user_id)
+    bootstrap.bootstrap(request=_request(), response=Response(), log_date=today, summary_days=7,
+                        db=db, profile={"id": user_id})
+    try:
+        logs.delete_entry(log_date=today, entry_id="does-not-exist", db=db, user_id=user_id)
+    except HTTPException:
+        pass    # 404 expected; only the lookup's plan matters
+
+
+@pytest.fixture(scope="module")
+def plans() -> tuple[list[tuple[str, list[str]]], dict[str, tuple[str, str]]]:
+    """
+    (statement, EXPLAIN output) for every statement the handlers sent, and
+    each index's table and leading column.
+    """
+    pytest.importorskip("psycopg2")
+    engine = create_engine(DATABASE_URL)
+    models.Base.metadata.create_all(bind=engine)    # no-op on a migrated database
+    captured: list[tuple[str, object]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(EXPLAINABLE):
+            params = parameters[0] if executemany and parameters else parameters
+            captured.append((statement, params))
+
+    try:
+        with engine.connect() as conn:
+            outer = conn.begin()
+            conn.execute(text("SET LOCAL enable_seqscan = off"))
+            # Handler commits only release a savepoint; the outer rollback undoes everything
+            db = Session(bind=conn, join_transaction_mode="create_savepoint")
+            try:
+                user = models.User(email="plan-check@example.invalid", provider="email")
+                db.add(user)
+                db.flush()
+                event.listen(conn, "before_cursor_execute", capture)
+                try:
+                    _exercise(db, user.id, _seed(db, user.id))
+                finally:
+                    event.remove(conn, "before_cursor_execute", capture)
+                indexes = {
+                    index: (table, column) for index, table, column in conn.execute(text("""
+                        SELECT i.relname, t.relname, a.attname
+                        FROM pg_index x
+                        JOIN pg_class i ON i.oid = x.indexrelid
+                        JOIN pg_class t ON t.oid = x.indrelid
+                        JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = x.indkey[0]
+                    """))
+                }
+                explained = [
+                    (statement, [row[0] for row in conn.exec_driver_sql("EXPLAIN " + statement, params)])
+                    for statement, params in captured
+                ]
+                return explained, indexes
+            finally:
+                db.close()
+                outer.rollback()
+    finally:
+        engine.dispose()
+
+
+def _unindexed(plan: list[str], indexes: dict[str, tuple[str, str]]) -> set[str]:
+    """Tables the plan reads without an index lookup: seq scans, and full scans of an index."""
+    tables = set()
+    for i, line in enumerate(plan):
+        if "Seq Scan on" in line:
+            tables.add(line.split("Seq Scan on", 1)[1].split()[0])
+            continue
+        match = INDEX_SCAN.search(line)
+        if not match or (match[1] or match[2]) not in indexes:
+            continue
+        table, column = indexes[match[1] or match[2]]
+        # The node's own detail lines run until the next child node ("->")
+        details = []
+        for detail in plan[i + 1:]:
+            if "->" in detail:
+                break
+            details.append(detail)
+        cond = next((d for d in details if "Index Cond:" in d), "")
+        if not re.search(rf"\b{column}\b", cond):
+            tables.add(table)
+    return tables
+
+
+def test_statements_were_checked(plans):
+    explained, _ = plans
+    assert len(explained) > 10
+
+
+@pytest.mark.parametrize("table", HOT_TABLES)
+def test_lookups_use_an_index(plans, table):
+    explained, indexes = plans
+    failures = [
+        statement.strip() + "\n" + "\n".join(plan)
+        for statement, plan in explained if table in _unindexed(plan, indexes)
+    ]
+    assert not failures, f"Unindexed scan of {table} in:\n\n" + "\n\n".join(failures)
@@ -0,0 +1,67 @@
+"""
+Account import: a valid file replaces the days it names, and malformed
+input of any kind is rejected with 422 and the offending line, never a 500
+or a silently partial import.
+"""
+from datetime import date
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import database, models
+from auth import create_access_token
+from routers import transfer
+
+LOG = '{"type":"log","log_date":"2026-03-01","ingredient_name":"tofu","amount":100,"display_amount":100,"unit":"g"}'
+CSV_HEADER = ",".join(transfer.CSV_FIELDS)
+
+
+@pytest.fixture
+def client(engine) -> TestClient:
+    db = database.SessionLocal()
+    db.add(models.User(id="runner", email="runner@example.com", provider="email"))
+    db.commit()
+    db.close()
+    app = FastAPI()
+    app.include_router(transfer.router)
+    return TestClient(app, headers={"Authorization": f"Bearer {create_access_token('runner')}"})
+
+
+def _import(client: TestClient, body: bytes, format: str = "ndjson"):
+    return client.post(f"/import?format={format}", content=body)
+
+
+def _errors(resp) -> list[dict]:
+    assert resp.status_code == 422, resp.text
+    return resp.json()["detail"]["errors"]
+
+
+def test_import_replaces_the_day(client):
+    resp = _import(client, (LOG + "\n" + LOG + "\n").encode())
+    assert resp.status_code == 200
+    assert (resp.json()["log_entries"], resp.json()["days"]) == (2, 1)
+    db = database.SessionLocal()
+    try:
+        summary = db.get(models.DailySummary, ("runner", date(2026, 3, 1)))
+        assert summary.entry_count == 2
+    finally:
+        db.close()
+
+
+def test_non_utf8_line(client):
+    errors = _errors(_import(client, LOG.encode() + b"\n" + b'{"type":"log","ingredient_name":"caf\xe9"}\n'))
+    assert [e["line"] for e in errors] == [2]
+    assert "UTF-8" in errors[0]["detail"]
+
+
+def test_json_line_that_is_not_an_object(client):
+    errors = _errors(_import(client, f"{LOG}\n[1,2]\nnull\n".encode()))
+    assert [e["line"] for e in errors] == [2, 3]
+
+
+def test_csv_with_an_unterminated_quote(client):
+    body = f'{CSV_HEADER}\nlog,,,2026-03-01,"tofu\n'.encode()
+    errors = _errors(_import(client, body, format="csv"))
+    assert [e["line"] for e in errors] == [2]
+    assert "never closed" in errors[0]["detail"]
@@ -0,0 +1,143 @@
+"""
+The USDA proxy against a stub of FoodData Central on http_client's
+transport: memory and table hits stay local, concurrent misses share one
+upstream call, expired entries are refetched, and an expired entry is
+served when USDA is down.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+import database, http_client, models, usda
+from cache import TTLCache
+from food_table import FOODS, USDA_NUTRIENT_IDS
+
+NUTRIENT_IDS = {key: nutrient_id for nutrient_id, key in USDA_NUTRIENT_IDS.items()}
+
+
+class FakeUsda:
+    """Answers /fdc/v1/foods/search in USDA's response shape from the built-in food table."""
+
+    def __init__(self):
+        self.calls = 0
+        self.failing = False
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        await asyncio.sleep(0.01)     # long enough for concurrent searches to pile up
+        if self.failing:
+            return httpx.Response(500)
+        query = request.url.params["query"].lower()
+        page_size = int(request.url.params["pageSize"])
+        foods = [
+            {
+                "fdcId": 100000 + i,
+                "description": name.title(),
+                "dataType": "SR Legacy",
+                "foodNutrients": [
+                    {"nutrientId": NUTRIENT_IDS[key], "value": value}
+                    for key, value in food.items() if key in NUTRIENT_IDS
+                ],
+            }
+            for i, (name, food) in enumerate(FOODS.items()) if query in name
+        ]
+        return httpx.Response(200, json={"totalHits": len(foods), "foods": foods[:page_size]})
+
+
+@pytest.fixture
+def upstream(engine, monkeypatch) -> FakeUsda:
+    fake = FakeUsda()
+    monkeypatch.setattr(http_client, "_client", httpx.AsyncClient(transport=httpx.MockTransport(fake.handle)))
+    monkeypatch.setattr(http_client, "_host_slots", {})
+    monkeypatch.setattr(http_client, "BACKOFF_BASE", 0)
+    monkeypatch.setattr(usda, "_memory", TTLCache(100, usda.settings.usda_cache_ttl))
+    monkeypatch.setattr(usda, "_inflight", {})
+    return fake
+
+
+def _search(query: str) -> list[dict]:
+    return asyncio.run(usda.search(query))
+
+
+def _expire(query: str) -> None:
+    """Age the shared-table row past USDA_CACHE_TTL and drop the in-process copy."""
+    db = database.SessionLocal()
+    try:
+        row = db.get(models.UsdaSearchCache, query)
+        row.fetched_at = datetime.now(timezone.utc) - timedelta(seconds=usda.settings.usda_cache_ttl + 60)
+        db.commit()
+    finally:
+        db.close()
+    usda._memory.clear()
+
+
+# ── Cache tiers ───────────────────────────────────────────────────────────────
+
+def test_results_are_extracted(upstream):
+    results = _search("lentils")
+    assert [food["name"] for food in results] == ["Lentils", "Green Lentils"]
+    assert results[0]["nutrition"]["protein"] == FOODS["lentils"]["protein"]
+
+
+def test_memory_hit_skips_upstream(upstream):
+    first = _search("lentils")
+    assert _search("  Lentils ") == first
+    assert upstream.calls == 1
+
+
+def test_table_hit_skips_upstream(upstream):
+    first = _search("lentils")
+    usda._memory.clear()      # as in another process: only the shared table has it
+    assert _search("lentils") == first
+    assert upstream.calls == 1
+    assert usda._memory.get("lentils") == first
+
+
+def test_concurrent_searches_share_one_call(upstream):
+    async def many():
+        return await asyncio.gather(*(usda.search("tofu") for _ in range(10)))
+
+    results = asyncio.run(many())
+    assert upstream.calls == 1
+    assert all(r == results[0] for r in results)
+    assert usda._inflight == {}
+
+
+# ── Expiry and failure ────────────────────────────────────────────────────────
+
+def test_memory_expiry_falls_back_to_table(upstream, monkeypatch):
+    monkeypatch.setattr(usda, "_memory", TTLCache(100, 0.01))
+    _search("tofu")
+    asyncio.run(asyncio.sleep(0.02))
+    assert usda._memory.get("tofu") is None
+    _search("tofu")
+    assert upstream.calls == 1
+
+
+def test_expired_entry_is_refetched(upstream):
+    _search("tofu")
+    _expire("tofu")
+    _search("tofu")
+    assert upstream.calls == 2
+
+
+def test_expired_entry_served_when_upstream_fails(upstream):
+    first = _search("tofu")
+    _expire("tofu")
+    upstream.failing = True
+    assert _search("tofu") == first
+    assert upstream.calls > 1
+    # Kept briefly in memory so a USDA outage isn't hammered on every search
+    calls = upstream.calls
+    _search("tofu")
+    assert upstream.calls == calls
+
+
+def test_unavailable_without_a_cached_entry(upstream):
+    upstream.failing = True
+    with pytest.raises(HTTPException) as exc:
+        _search("tofu")
+    assert exc.value.status_code == 503
@@ -0,0 +1,42 @@
+"""Deleting an account removes everything that belongs to it."""
+from datetime import date, datetime, timedelta, timezone
+
+import database, models
+from routers import users
+
+CHILD_TABLES = (
+    models.FoodLog, models.DailySummary, models.Mixture, models.CustomIngredient,
+    models.CollectionVersion, models.IdempotencyKey,
+)
+
+
+def _seed(db, user_id: str) -> None:
+    day = date(2026, 3, 1)
+    db.add(models.User(id=user_id, email=f"{user_id}@example.com", provider="email"))
+    db.flush()
+    db.add_all([
+        models.FoodLog(user_id=user_id, log_date=day, ingredient_name="tofu",
+                       amount=100, display_amount=100, unit="g"),
+        models.DailySummary(user_id=user_id, log_date=day, micros={}),
+        models.Mixture(user_id=user_id, name="oat mix", yield_g=200, per100g={}, ingredients=[]),
+        models.CustomIngredient(user_id=user_id, name="bar", nutrition={}),
+        models.CollectionVersion(user_id=user_id, collection="mixtures"),
+        models.IdempotencyKey(user_id=user_id, key="k1",
+                              expires_at=datetime.now(timezone.utc) + timedelta(hours=1)),
+    ])
+    db.commit()
+
+
+def test_delete_me_removes_the_accounts_data(engine):
+    db = database.SessionLocal()
+    try:
+        _seed(db, "leaving")
+        _seed(db, "staying")
+        users.delete_me(db=db, user_id="leaving")
+
+        assert db.get(models.User, "leaving") is None
+        for model in CHILD_TABLES:
+            assert db.query(model).filter_by(user_id="leaving").count() == 0, model.__tablename__
+            assert db.query(model).filter_by(user_id="staying").count() == 1, model.__tablename__
+    finally:
+        db.close()
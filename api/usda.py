@@ -0,0 +1,140 @@
+"""
+Shared proxy for USDA FoodData Central food search (GET /foods/usda).
+
+Searches go through two cache tiers: an in-process TTLCache, then the
+usda_search_cache table shared by every process. Only a miss in both, or a
+row older than USDA_CACHE_TTL, goes upstream, and concurrent identical
+misses in a process share that one request. Results are stored with the
+nutrients already extracted into our keys (the client's NUTRIENT_MAP), and
+their names feed the /foods/search index. If USDA is unreachable an
+expired row is served rather than nothing.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from fastapi import HTTPException
+import httpx
+from sqlalchemy.orm import Session
+
+from cache import TTLCache
+from config import get_settings
+from database import dialect_insert, run_in_session
+from food_table import NUTRIENT_KEYS, USDA_NUTRIENT_IDS
+import food_index, http_client, models
+
+log = logging.getLogger("vegfuel.usda")
+
+DATA_TYPES = "Foundation,SR Legacy"
+PAGE_SIZE  = 8
+STALE_TTL  = 60          # seconds to serve an expired row from memory while upstream is down
+
+settings = get_settings()
+_memory = TTLCache(settings.usda_memory_size, settings.usda_cache_ttl)
+_inflight: dict[str, asyncio.Task] = {}
+
+
+def extract_nutrition(food: dict) -> dict:
+    nutrition = dict.fromkeys(NUTRIENT_KEYS, 0)
+    for nutrient in food.get("foodNutrients") or []:
+        key = USDA_NUTRIENT_IDS.get(nutrient.get("nutrientId"))
+        if key:
+            nutrition[key] = nutrient.get("value") or 0
+    return nutrition
+
+
+# ── Persistent tier (sync, run through run_in_session) ────────────────────────
+
+def _read(db: Session, query: str) -> Optional[tuple[list, datetime]]:
+    row = db.get(models.UsdaSearchCache, query)
+    if row is None:
+        return None
+    fetched_at = row.fetched_at
+    if fetched_at.tzinfo is None:       # SQLite hands back naive UTC
+        fetched_at = fetched_at.replace(tzinfo=timezone.utc)
+    return row.results, fetched_at
+
+
+def _write(db: Session, query: str, results: list) -> None:
+    insert = dialect_insert(db)
+    stmt = insert(models.UsdaSearchCache).values(query=query, results=results)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["query"],
+        set_={"results": stmt.excluded.results, "fetched_at": datetime.now(timezone.utc)},
+    ))
+    db.commit()
+
+
+def _cached_names(db: Session) -> list[str]:
+    rows = db.query(models.UsdaSearchCache.results).execution_options(yield_per=500)
+    return [food["name"] for (results,) in rows for food in results]
+
+
+# ── Upstream ──────────────────────────────────────────────────────────────────
+
+async def _fetch(query: str) -> list[dict]:
+    resp = await http_client.request("GET", settings.usda_api_url, params={
+        "query": query,
+        "dataType": DATA_TYPES,
+        "pageSize": PAGE_SIZE,
+        "api_key": settings.usda_api_key,
+    })
+    resp.raise_for_status()
+    return [
+        {"fdc_id": food.get("fdcId"), "name": food["description"], "nutrition": extract_nutrition(food)}
+        for food in resp.json().get("foods", [])[:PAGE_SIZE]
+    ]
+
+
+async def _load(query: str) -> list[dict]:
+    ttl = timedelta(seconds=settings.usda_cache_ttl)
+    cached = await run_in_session(_read, query)
+    if cached is not None:
+        results, fetched_at = cached
+        remaining = fetched_at + ttl - datetime.now(timezone.utc)
+        if remaining.total_seconds() > 0:
+            _memory.set(query, results, ttl=remaining.total_seconds())
+            return results
+
+    try:
+        results = await _fetch(query)
+    except (httpx.HTTPError, ValueError, KeyError) as e:
+        if cached is not None:
+            log.warning("USDA search failed, serving expired results for %r: %s", query, e)
+            _memory.set(query, cached[0], ttl=STALE_TTL)
+            return cached[0]
+        raise HTTPException(status_code=503, detail="USDA search unavailable, try again shortly")
+
+    await run_in_session(_write, query, results)
+    _memory.set(query, results)
+    food_index.add_global(food["name"] for food in results)
+    return results
+
+
+def _done(query: str, task: asyncio.Task) -> None:
+    _inflight.pop(query, None)
+    if not task.cancelled():
+        task.exception()    # mark retrieved; waiters (if any) got it already
+
+
+async def search(query: str) -> list[dict]:
+    """Foods matching `query`, from memory, the shared table, or USDA."""
+    key = food_index.normalize(query)
+    results = _memory.get(key)
+    if results is not None:
+        return results
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_load(key))
+        _inflight[key] = task
+        task.add_done_callback(lambda t: _done(key, t))
+    # shield: one caller giving up must not cancel the fetch for the others
+    return await asyncio.shield(task)
+
+
+async def warm_index() -> None:
+    """Add every cached USDA food name to the /foods/search index."""
+    try:
+        food_index.add_global(await run_in_session(_cached_names))
+    except Exception:
+        log.exception("could not load cached USDA names into the search index")